@@ -0,0 +1,200 @@
+"""
+File: bench_asgi_uploads.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Benchmark comparing concurrent slow-upload throughput of one WSGI worker with a fixed thread pool
+against one ASGI worker running the async submission view. Requests are driven in-process against the Django
+handlers, with the request body arriving in delayed chunks to stand in for slow clients.
+Run with: python benchmarks/bench_asgi_uploads.py [--clients 64] [--threads 8] [--delay 0.025]
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'conf.settings')
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.core.handlers.asgi import ASGIHandler  # noqa: E402
+from django.core.handlers.wsgi import WSGIHandler  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.core.files.uploadedfile import SimpleUploadedFile  # noqa: E402
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart  # noqa: E402
+from django.urls import clear_url_caches, include, path  # noqa: E402
+from PIL import Image  # noqa: E402
+
+from submission import views  # noqa: E402
+from submission.models import Submission  # noqa: E402
+
+
+CHUNKS = 16
+
+
+def _urlconf(view):
+    return type('URLConf', (), {'urlpatterns': [
+        path('', view, name='submit_announcement'),
+        path('', include('submission.urls')),
+    ]})
+
+
+def _use_view(view):
+    settings.ROOT_URLCONF = _urlconf(view)
+    clear_url_caches()
+
+
+def _make_body(slides):
+    image_io = io.BytesIO()
+    Image.new('RGB', (1920, 1080), color=(25, 44, 83)).save(image_io, format='PNG')
+    data = {
+        'title': 'Benchmark Announcement',
+        'start_date': '2025-07-16',
+        'end_date': '2025-07-23',
+        'is_praise': 'on',
+        'slides': [
+            SimpleUploadedFile(f'slide{index}.png', image_io.getvalue(), content_type='image/png')
+            for index in range(slides)
+        ],
+    }
+    return encode_multipart(BOUNDARY, data)
+
+
+def _chunks(body):
+    size = -(-len(body) // CHUNKS)
+    return [body[start:start + size] for start in range(0, len(body), size)]
+
+
+class SlowInput:
+    """wsgi.input that hands over the body one chunk at a time, sleeping before each chunk."""
+
+    def __init__(self, body, delay):
+        self.chunks = _chunks(body)
+        self.buffer = b''
+        self.delay = delay
+
+    def read(self, size=-1):
+        while self.chunks and (size < 0 or len(self.buffer) < size):
+            time.sleep(self.delay)
+            self.buffer += self.chunks.pop(0)
+        if size < 0:
+            size = len(self.buffer)
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+    def readline(self, size=-1):
+        while self.chunks and b'\n' not in self.buffer:
+            time.sleep(self.delay)
+            self.buffer += self.chunks.pop(0)
+        end = self.buffer.find(b'\n') + 1 or len(self.buffer)
+        return self.read(end if size < 0 else min(size, end))
+
+
+def run_wsgi(body, clients, threads, delay):
+    _use_view(views.submit_announcement)
+    application = WSGIHandler()
+
+    def request(_):
+        environ = {
+            'REQUEST_METHOD': 'POST',
+            'PATH_INFO': '/',
+            'SERVER_NAME': 'testserver',
+            'SERVER_PORT': '80',
+            'CONTENT_TYPE': MULTIPART_CONTENT,
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.input': SlowInput(body, delay),
+            'wsgi.url_scheme': 'http',
+        }
+        statuses = []
+        application(environ, lambda status, headers: statuses.append(status))
+        return statuses[0].startswith('302')
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        return list(executor.map(request, range(clients)))
+
+
+def run_asgi(body, clients, delay):
+    _use_view(views.submit_announcement_async)
+    application = ASGIHandler()
+
+    async def request():
+        chunks = _chunks(body)
+        statuses = []
+        scope = {
+            'type': 'http',
+            'method': 'POST',
+            'path': '/',
+            'query_string': b'',
+            'headers': [
+                (b'host', b'testserver'),
+                (b'content-type', MULTIPART_CONTENT.encode()),
+                (b'content-length', str(len(body)).encode()),
+            ],
+        }
+
+        async def receive():
+            if not chunks:
+                # Body is done; wait like a server does until the client disconnects
+                await asyncio.Event().wait()
+            await asyncio.sleep(delay)
+            return {'type': 'http.request', 'body': chunks.pop(0), 'more_body': bool(chunks)}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                statuses.append(message['status'])
+
+        await application(scope, receive, send)
+        return statuses[0] == 302
+
+    async def main():
+        return await asyncio.gather(*(request() for _ in range(clients)))
+
+    return asyncio.run(main())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('Description: ')[1].split('\n')[0])
+    parser.add_argument('--clients', type=int, default=64, help='Concurrent uploads')
+    parser.add_argument('--threads', type=int, default=8, help='Threads of the WSGI worker')
+    parser.add_argument('--delay', type=float, default=0.025, help=f'Seconds before each of the {CHUNKS} body chunks')
+    parser.add_argument('--slides', type=int, default=2, help='Slides per upload')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    try:
+        settings.DATABASES['default']['NAME'] = os.path.join(workdir, 'bench.sqlite3')
+        settings.MEDIA_ROOT = os.path.join(workdir, 'media')
+        settings.ALLOWED_HOSTS = ['testserver']
+        # Benchmark clients have no CSRF cookie
+        settings.MIDDLEWARE = [name for name in settings.MIDDLEWARE if 'csrf' not in name.lower()]
+        call_command('migrate', verbosity=0)
+
+        body = _make_body(args.slides)
+        print(f"{len(body) / 1024:.0f} KiB per upload in {CHUNKS} chunks, {args.delay * CHUNKS:.2f}s to send each")
+        print(f"{'server':<28} {'clients':>8} {'ok':>5} {'seconds':>8} {'uploads/s':>10}")
+        runs = [
+            (f'WSGI ({args.threads} threads)', lambda: run_wsgi(body, args.clients, args.threads, args.delay)),
+            ('ASGI (async view)', lambda: run_asgi(body, args.clients, args.delay)),
+        ]
+        for name, run in runs:
+            started = time.perf_counter()
+            results = run()
+            elapsed = time.perf_counter() - started
+            print(f"{name:<28} {args.clients:>8} {sum(results):>5} {elapsed:>8.2f} {args.clients / elapsed:>10.1f}")
+
+        assert Submission.objects.count() == 2 * args.clients, "Every upload should have been saved"
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == '__main__':
+    main()
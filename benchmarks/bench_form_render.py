@@ -0,0 +1,77 @@
+"""
+File: bench_form_render.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Benchmark comparing per-request form field rendering through the add_class template filter against CSS classes declared once on SubmissionForm, with the default and the precompiled form renderer.
+Run with: python benchmarks/bench_form_render.py
+"""
+
+import os
+import sys
+import timeit
+from pathlib import Path
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'conf.settings')
+django.setup()
+
+from django.forms.renderers import DjangoTemplates  # noqa: E402
+from django.template import engines  # noqa: E402
+
+from submission.forms import INPUT_CLASSES, SubmissionForm  # noqa: E402
+from submission.renderers import PrecompiledFormRenderer  # noqa: E402
+
+
+FIELDS = ['title', 'email', 'description', 'start_date', 'end_date']
+
+FILTER_TEMPLATE = '{% load form_extras %}' + ''.join(
+    f'{{{{ form.{field}|add_class:"{INPUT_CLASSES}" }}}}{{{{ form.{field}.errors }}}}' for field in FIELDS
+)
+DECLARED_TEMPLATE = ''.join(
+    f'{{{{ form.{field} }}}}{{{{ form.{field}.errors }}}}' for field in FIELDS
+)
+
+INVALID_DATA = {
+    'title': '',
+    'email': 'not-an-email',
+    'description': 'Notes',
+    'start_date': '2025-07-16',
+    'end_date': '2025-07-23',
+}
+
+
+def main():
+    engine = engines['django']
+    templates = {
+        'add_class filter': engine.from_string(FILTER_TEMPLATE),
+        'declared classes': engine.from_string(DECLARED_TEMPLATE),
+    }
+    renderers = {
+        'default': DjangoTemplates(),
+        'precompiled': PrecompiledFormRenderer(),
+    }
+    forms = {
+        'empty form': lambda renderer: SubmissionForm(renderer=renderer),
+        'form with errors': lambda renderer: SubmissionForm(data=INVALID_DATA, renderer=renderer),
+    }
+    number = 2000
+
+    print(f"{'case':<20} {'template':<18} {'renderer':<12} {'us/render':>10}")
+    for form_name, make_form in forms.items():
+        outputs = set()
+        for template_name, template in templates.items():
+            for renderer_name, renderer in renderers.items():
+                def render():
+                    form = make_form(renderer)
+                    form.is_bound and form.is_valid()
+                    return template.render({'form': form})
+                outputs.add(' '.join(sorted(render().split())))
+                elapsed = timeit.timeit(render, number=number) / number * 1e6
+                print(f"{form_name:<20} {template_name:<18} {renderer_name:<12} {elapsed:>10.1f}")
+        assert len(outputs) == 1, "Every combination should render the same widgets"
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+File: bench_slide_probe.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Micro-benchmark comparing header-only slide probing against the previous Pillow Image.open path,
+and timing the whole per-slide check the submission views run (views._check_slide), which must stay header-only too.
+Run with: python benchmarks/bench_slide_probe.py
+"""
+
+import io
+import os
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+
+import django
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'conf.settings')
+django.setup()
+
+from django.core.files.uploadedfile import SimpleUploadedFile  # noqa: E402
+
+from submission.slide_probe import probe_slide  # noqa: E402
+from submission.views import _check_slide  # noqa: E402
+
+
+def _make_png(width, height):
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), color=(25, 44, 83)).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def _make_noise_png(width, height):
+    """A PNG of random pixels, which barely compresses: about 3 bytes per pixel on disk."""
+    buffer = io.BytesIO()
+    Image.frombytes('RGB', (width, height), os.urandom(width * height * 3)).save(buffer, format='PNG', compress_level=1)
+    return buffer.getvalue()
+
+
+def _make_jpeg(width, height, progressive=False, exif_bytes=0):
+    buffer = io.BytesIO()
+    image = Image.new('RGB', (width, height), color=(90, 157, 191))
+    options = {'format': 'JPEG', 'quality': 90, 'progressive': progressive}
+    if exif_bytes:
+        exif = Image.Exif()
+        exif[0x010E] = 'x' * exif_bytes  # ImageDescription
+        options['exif'] = exif
+    image.save(buffer, **options)
+    return buffer.getvalue()
+
+
+def _pillow_path(data):
+    """The previous validation path: Image.open followed by reading the size."""
+    with Image.open(io.BytesIO(data)) as img:
+        return img.size
+
+
+def _probe_path(data):
+    info = probe_slide(io.BytesIO(data))
+    return info.width, info.height
+
+
+def _check_path(data):
+    """What each uploaded slide costs in the views: extension, header probe and aspect ratio."""
+    upload = SimpleUploadedFile('slide.png' if data.startswith(b'\x89PNG') else 'slide.jpg', data)
+    assert _check_slide(upload, False) is None
+    return upload
+
+
+def _peak_memory(func, data):
+    tracemalloc.start()
+    func(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    cases = {
+        'PNG 1920x1080': _make_png(1920, 1080),
+        'PNG 3840x2160': _make_png(3840, 2160),
+        'JPEG 3840x2160 baseline': _make_jpeg(3840, 2160),
+        'JPEG 3840x2160 progressive': _make_jpeg(3840, 2160, progressive=True),
+        'JPEG 3840x2160 32KB EXIF': _make_jpeg(3840, 2160, exif_bytes=32 * 1024),
+        'PNG 3840x2160 noise': _make_noise_png(3840, 2160),
+    }
+    number = 2000
+
+    print(
+        f"{'case':<30} {'size':>10} {'pillow us':>10} {'probe us':>10} {'check us':>10} {'speedup':>8} "
+        f"{'pillow KB':>10} {'probe KB':>9}"
+    )
+    for name, data in cases.items():
+        assert _pillow_path(data) == _probe_path(data), name
+        pillow_time = timeit.timeit(lambda: _pillow_path(data), number=number) / number * 1e6
+        probe_time = timeit.timeit(lambda: _probe_path(data), number=number) / number * 1e6
+        # Building the upload is not part of the check, so it is timed separately and subtracted
+        upload_time = timeit.timeit(lambda: SimpleUploadedFile('slide', data), number=number) / number * 1e6
+        check_time = timeit.timeit(lambda: _check_path(data), number=number) / number * 1e6 - upload_time
+        pillow_peak = _peak_memory(_pillow_path, data) / 1024
+        probe_peak = _peak_memory(_probe_path, data) / 1024
+        print(
+            f"{name:<30} {len(data) // 1024:>8}KB {pillow_time:>10.1f} {probe_time:>10.1f} {check_time:>10.1f} "
+            f"{pillow_time / probe_time:>7.1f}x {pillow_peak:>10.1f} {probe_peak:>9.1f}"
+        )
+
+if __name__ == '__main__':
+    main()
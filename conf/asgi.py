@@ -12,5 +12,10 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'conf.settings')
+# Serve submissions with the async view, so slow uploads do not each hold a thread
+os.environ.setdefault('ASYNC_SUBMISSIONS', '1')
+# Sync code runs in a pool of worker threads here, and each thread would keep its own persistent
+# connection (and file descriptors) open; close connections at the end of each request instead
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
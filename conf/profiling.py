@@ -0,0 +1,198 @@
+"""
+File: profiling.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Opt-in request profiling middleware. Each request reports its wall time, database query count and time, and the view stages marked with submission.stage_timing.stage() in a Server-Timing header and one JSON log line. A sample of requests can also run under cProfile or tracemalloc, keeping a dump when the request turns out to be slow.
+"""
+
+import cProfile
+import json
+import logging
+import os
+import random
+import threading
+import time
+import tracemalloc
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from submission.stage_timing import collect_stage_timings
+
+
+logger = logging.getLogger(__name__)
+
+PROFILERS = ('cprofile', 'tracemalloc')
+
+_query_stats = ContextVar('query_stats', default=None)
+
+# cProfile and tracemalloc are process-wide, so only one request is sampled at a time
+_sampler_lock = threading.Lock()
+
+
+class QueryStats:
+    '''
+    Running count and total time of the database queries made during one request.
+    '''
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper that adds each query to the current request's QueryStats."""
+    stats = _query_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.count += 1
+        stats.seconds += time.perf_counter() - started
+
+
+def install_query_recorder(connection, **kwargs):
+    """Add record_query to a connection's execute wrappers once."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def server_timing(total, stats, timings):
+    """Format a Server-Timing header value; durations are in milliseconds."""
+    metrics = [
+        f'total;dur={total * 1000:.1f}',
+        f'db;dur={stats.seconds * 1000:.1f};desc="{stats.count} queries"',
+    ]
+    metrics.extend(f'{name};dur={seconds * 1000:.1f}' for name, seconds in timings.items())
+    return ', '.join(metrics)
+
+
+class _Sampler:
+    '''
+    Runs cProfile or tracemalloc around one request and writes a dump if the request was slow.
+    '''
+
+    def __init__(self, mode):
+        self.mode = mode
+        self.profile = None
+
+    @classmethod
+    def start(cls, mode, rate):
+        """Start sampling this request, or return None if it is not sampled or another request is."""
+        if mode not in PROFILERS or random.random() >= rate or not _sampler_lock.acquire(blocking=False):
+            return None
+        sampler = cls(mode)
+        if mode == 'cprofile':
+            sampler.profile = cProfile.Profile()
+            sampler.profile.enable()
+        else:
+            tracemalloc.start(settings.PROFILING_TRACEMALLOC_FRAMES)
+        return sampler
+
+    def stop(self, slow, request):
+        """Stop sampling and return the path of the dump written for a slow request, or None."""
+        try:
+            if self.mode == 'cprofile':
+                self.profile.disable()
+                snapshot = self.profile
+            else:
+                snapshot = tracemalloc.take_snapshot()
+                tracemalloc.stop()
+            if not slow:
+                return None
+            os.makedirs(settings.PROFILING_DUMP_DIR, exist_ok=True)
+            extension = 'prof' if self.mode == 'cprofile' else 'tracemalloc'
+            path = os.path.join(
+                settings.PROFILING_DUMP_DIR,
+                f"{time.strftime('%Y%m%d-%H%M%S')}-{request.method}-{request.path.strip('/').replace('/', '_') or 'root'}-{os.getpid()}.{extension}",
+            )
+            # Both Profile.dump_stats and Snapshot.dump take the target path
+            if self.mode == 'cprofile':
+                snapshot.dump_stats(path)
+            else:
+                snapshot.dump(path)
+            return path
+        finally:
+            _sampler_lock.release()
+
+
+class _RequestProfile:
+    '''
+    The measurements of one request, from the middleware to the response.
+    '''
+
+    def __init__(self, request):
+        self.request = request
+
+    def __enter__(self):
+        for connection in connections.all(initialized_only=True):
+            install_query_recorder(connection)
+        self.stats = QueryStats()
+        self.stats_token = _query_stats.set(self.stats)
+        self.collection = collect_stage_timings()
+        self.timings = self.collection.__enter__()
+        self.sampler = _Sampler.start(settings.PROFILING_SAMPLER, settings.PROFILING_SAMPLE_RATE)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.total = time.perf_counter() - self.started
+        slow = self.total * 1000 >= settings.PROFILING_SLOW_REQUEST_MS
+        self.dump = self.sampler.stop(slow, self.request) if self.sampler else None
+        self.collection.__exit__(*exc_info)
+        _query_stats.reset(self.stats_token)
+        return False
+
+    def finish(self, response):
+        """Add the Server-Timing header and log the request."""
+        response['Server-Timing'] = server_timing(self.total, self.stats, self.timings)
+        record = {
+            'method': self.request.method,
+            'path': self.request.path,
+            'status': response.status_code,
+            'total_ms': round(self.total * 1000, 1),
+            'db_queries': self.stats.count,
+            'db_ms': round(self.stats.seconds * 1000, 1),
+            'stages_ms': {name: round(seconds * 1000, 1) for name, seconds in self.timings.items()},
+        }
+        if self.dump:
+            record['profile'] = self.dump
+        slow = record['total_ms'] >= settings.PROFILING_SLOW_REQUEST_MS
+        logger.log(logging.WARNING if slow else logging.INFO, json.dumps(record))
+        return response
+
+
+class ProfilingMiddleware:
+    '''
+    Measures each request and reports it through Server-Timing and the conf.profiling logger.
+    Put it first in MIDDLEWARE so its numbers cover the rest of the stack. Timings end when the
+    view returns, so the body of a streaming response is not included.
+    '''
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        # Connections opened later, on any thread, get the query recorder as they connect
+        connection_created.connect(install_query_recorder)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        with _RequestProfile(request) as profile:
+            response = self.get_response(request)
+        return profile.finish(response)
+
+    async def __acall__(self, request):
+        with _RequestProfile(request) as profile:
+            response = await self.get_response(request)
+        return profile.finish(response)
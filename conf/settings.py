@@ -27,6 +27,10 @@ load_dotenv(BASE_DIR / ".env")
 SECRET_KEY = os.environ.get("SECRET_KEY", get_random_secret_key())
 DEBUG = os.environ.get("DEBUG", "0") == "1"
 
+# Set on each deploy; keys the rendered-page cache so a deploy never serves stale pages
+DEPLOY_VERSION = os.environ.get("DEPLOY_VERSION", "")
+PAGE_CACHE_TIMEOUT = 24 * 60 * 60
+
 ALLOWED_HOSTS = []
 
 
@@ -55,8 +59,21 @@ MIDDLEWARE = [
     "django_browser_reload.middleware.BrowserReloadMiddleware",
 ]
 
+# Opt-in request profiling: Server-Timing headers and a JSON log line per request, see conf/profiling.py.
+# A sample of requests can run under cProfile or tracemalloc; slow ones leave a dump in PROFILING_DUMP_DIR.
+if os.environ.get('REQUEST_PROFILING', '0') == '1':
+    MIDDLEWARE.insert(0, 'conf.profiling.ProfilingMiddleware')
+PROFILING_SLOW_REQUEST_MS = float(os.environ.get('PROFILING_SLOW_REQUEST_MS', 500))
+PROFILING_SAMPLER = os.environ.get('PROFILING_SAMPLER', '')  # 'cprofile', 'tracemalloc' or empty for none
+PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', 0.05))
+PROFILING_TRACEMALLOC_FRAMES = 10
+PROFILING_DUMP_DIR = BASE_DIR / "profiles"
+
 ROOT_URLCONF = 'conf.urls'
 
+# Route submissions to the async view; conf/asgi.py turns this on by default
+ASYNC_SUBMISSIONS = os.environ.get('ASYNC_SUBMISSIONS', '0') == '1'
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -72,6 +89,9 @@ TEMPLATES = [
     },
 ]
 
+# Built-in input and textarea widgets are rendered in Python instead of through the template engine
+FORM_RENDERER = 'submission.renderers.PrecompiledFormRenderer'
+
 
 WSGI_APPLICATION = 'conf.wsgi.application'
 
@@ -85,6 +105,27 @@ EMAIL_BACKEND = "anymail.backends.brevo.EmailBackend"
 DEFAULT_FROM_EMAIL = "reaganzierke@gmail.com"
 SERVER_EMAIL = "reaganzierke@gmail.com"
 
+# Notification emails are queued in the outbox and delivered by `manage.py send_outbox`
+EMAIL_OUTBOX_BATCH_SIZE = int(os.environ.get("EMAIL_OUTBOX_BATCH_SIZE", "20"))
+EMAIL_OUTBOX_WORKERS = int(os.environ.get("EMAIL_OUTBOX_WORKERS", "4"))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.environ.get("EMAIL_OUTBOX_MAX_ATTEMPTS", "6"))
+EMAIL_OUTBOX_BACKOFF_SECONDS = 30
+EMAIL_OUTBOX_MAX_BACKOFF_SECONDS = 60 * 60
+EMAIL_OUTBOX_LEASE_SECONDS = 10 * 60
+
+# Digest mode: hold each submission's notification and send one batched email per recipient each time
+# manage.py send_digest runs (e.g. daily from cron). Held notifications wait for send_digest even if this is turned off.
+EMAIL_DIGEST_MODE = os.environ.get("EMAIL_DIGEST_MODE", "0") == "1"
+
+# Slides larger than this in total are emailed as signed download links instead of attachments
+EMAIL_ATTACHMENT_BUDGET_BYTES = int(os.environ.get("EMAIL_ATTACHMENT_BUDGET_BYTES", str(15 * 1024 * 1024)))
+SLIDE_LINK_MAX_AGE = 14 * 24 * 60 * 60
+SITE_URL = os.environ.get("SITE_URL", "http://localhost:8000")
+
+# Contact changes invalidate the routing table in the process that made them; the timeout bounds
+# staleness in other processes when the cache is not shared (the default local-memory cache)
+RECIPIENT_ROUTING_CACHE_TIMEOUT = 5 * 60
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
@@ -93,9 +134,33 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Under WSGI, keep connections open for up to 10 minutes between requests, so each server
+        # thread opens its connection and runs SQLITE_PRAGMAS once rather than per request; health
+        # checks drop connections that went bad before they are reused. conf/asgi.py defaults
+        # DB_CONN_MAX_AGE to 0, since there every sync_to_async worker thread would hold its own.
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 600)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Take the write lock at BEGIN, so a transaction that reads first waits for the busy
+            # timeout instead of failing with "database is locked" when it starts writing.
+            # Every atomic block takes it, read-only ones too, so keep them short.
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
+# Applied to every new SQLite connection by submission.database, in this order
+SQLITE_PRAGMAS = {
+    # Wait up to this many milliseconds for another connection's lock
+    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 20000)),
+    # Readers and the single writer no longer block each other
+    'journal_mode': 'WAL',
+    # fsync at checkpoints only; with WAL a crash can lose the latest commits but not corrupt the file
+    'synchronous': 'NORMAL',
+    # Read up to this many bytes of the database through a memory map
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 64 * 1024 * 1024)),
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -137,9 +202,62 @@ STATICFILES_DIRS = [
 ]
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
+# collectstatic fingerprints static files and writes gzip/brotli copies; conf.staticfiles.serve_static serves them
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "conf.staticfiles.CompressedManifestStaticFilesStorage",
+    },
+}
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Let a front proxy deliver media: nginx internal location mapped to MEDIA_ROOT (X-Accel-Redirect),
+# or Apache/lighttpd mod_xsendfile (X-Sendfile). Without either, Django streams files itself.
+MEDIA_X_ACCEL_PREFIX = os.environ.get('MEDIA_X_ACCEL_PREFIX', '')
+MEDIA_X_SENDFILE = os.environ.get('MEDIA_X_SENDFILE', '0') == '1'
+
+# Uploads are hashed as they stream in so slides can be stored by content digest
+FILE_UPLOAD_HANDLERS = [
+    "submission.uploadhandlers.HashingMemoryFileUploadHandler",
+    "submission.uploadhandlers.HashingTemporaryFileUploadHandler",
+]
+
+# Chunked, resumable slide uploads are staged here until the submission form references them
+CHUNKED_UPLOAD_DIR = BASE_DIR / "upload_staging"
+CHUNKED_UPLOAD_CHUNK_SIZE = 1024 * 1024
+CHUNKED_UPLOAD_MAX_SIZE = 100 * 1024 * 1024
+# Uploads not submitted within this many seconds expire; the expire_uploads command removes them
+CHUNKED_UPLOAD_MAX_AGE = int(os.environ.get("CHUNKED_UPLOAD_MAX_AGE", str(24 * 60 * 60)))
+# New uploads are refused while the declared sizes of unexpired uploads would exceed this many bytes
+CHUNKED_UPLOAD_MAX_STAGED_BYTES = int(os.environ.get("CHUNKED_UPLOAD_MAX_STAGED_BYTES", str(2 * 1024 * 1024 * 1024)))
+
+# Uploaded slides are validated concurrently in a shared, bounded thread pool
+SLIDE_VALIDATION_WORKERS = int(os.environ.get("SLIDE_VALIDATION_WORKERS", "4"))
+
+# Optional slide normalization after validation, in a process pool: slides larger than the display are
+# downscaled, metadata is stripped and they are re-encoded (format "" keeps PNG as PNG and JPEG as JPEG).
+# The upload itself is only kept, as SubmissionSlide.original, when SLIDE_NORMALIZATION_KEEP_ORIGINALS is set.
+SLIDE_NORMALIZATION = os.environ.get("SLIDE_NORMALIZATION", "0") == "1"
+SLIDE_NORMALIZED_SIZE = (1920, 1080)
+SLIDE_NORMALIZED_FORMAT = os.environ.get("SLIDE_NORMALIZED_FORMAT", "")  # "", "PNG", "JPEG" or "WEBP"
+SLIDE_NORMALIZED_QUALITY = 85
+SLIDE_NORMALIZATION_WORKERS = int(os.environ.get("SLIDE_NORMALIZATION_WORKERS", "2"))
+SLIDE_NORMALIZATION_KEEP_ORIGINALS = os.environ.get("SLIDE_NORMALIZATION_KEEP_ORIGINALS", "0") == "1"
+
+# Admin slide previews use cached thumbnails stored under MEDIA_ROOT/thumbnails/
+SLIDE_THUMBNAIL_SIZE = (320, 180)
+SLIDE_THUMBNAIL_FORMAT = "WEBP"
+
+# manage.py archive_expired moves announcements that ended more than ARCHIVE_AFTER_DAYS ago into the
+# ArchivedSubmission table and packs their slides into ZIPs under ARCHIVE_ROOT, one short transaction per batch
+ARCHIVE_AFTER_DAYS = int(os.environ.get("ARCHIVE_AFTER_DAYS", "365"))
+ARCHIVE_BATCH_SIZE = 50
+ARCHIVE_ROOT = BASE_DIR / "archive"
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -0,0 +1,148 @@
+"""
+File: staticfiles.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Static file pipeline without a CDN. collectstatic fingerprints files through the manifest and writes gzip and brotli copies next to them; serve_static picks the best copy for the client and marks fingerprinted files immutable.
+"""
+
+import gzip
+import mimetypes
+import os
+import posixpath
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.functional import cached_property
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+from django.views.static import was_modified_since
+
+try:
+    import brotli
+except ImportError:  # A project dependency, but without it gzip copies are still written and served
+    brotli = None
+
+
+COMPRESSIBLE_EXTENSIONS = {'.css', '.js', '.mjs', '.map', '.svg', '.txt', '.html', '.json', '.xml', '.ico'}
+
+# Preferred first
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'public, max-age=0, must-revalidate'
+
+
+def _compressors():
+    compressors = [('.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        compressors.insert(0, ('.br', lambda data: brotli.compress(data, quality=11)))
+    return compressors
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    '''
+    Manifest storage that also writes .gz and .br copies of text assets during collectstatic.
+    Until collectstatic has written a manifest (development and tests), unknown names resolve to themselves.
+    '''
+
+    def post_process(self, paths, dry_run=False, **options):
+        names = []
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if not isinstance(processed, Exception) and not dry_run:
+                names.append(name)
+                if hashed_name:
+                    names.append(hashed_name)
+            yield name, hashed_name, processed
+
+        for name in dict.fromkeys(names):
+            for compressed_name in self._compress(name):
+                yield name, compressed_name, True
+
+    def _compress(self, name):
+        """Write compressed copies of a file when they are meaningfully smaller; return their names."""
+        if os.path.splitext(name)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+            return []
+        path = self.path(name)
+        with open(path, 'rb') as source:
+            data = source.read()
+
+        written = []
+        for suffix, compress in _compressors():
+            compressed = compress(data)
+            if len(compressed) < len(data) * 0.95:
+                with open(path + suffix, 'wb') as target:
+                    target.write(compressed)
+                written.append(name + suffix)
+        return written
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            if self.hashed_files:
+                raise
+            return name
+
+    @cached_property
+    def immutable_names(self):
+        """Fingerprinted names from the manifest; their contents never change."""
+        return frozenset(self.hashed_files.values())
+
+
+def _accepted_encodings(header):
+    """Return the content codings an Accept-Encoding header allows."""
+    accepted = set()
+    for part in header.split(','):
+        coding, _, params = part.partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding.strip() and quality > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+@require_safe
+def serve_static(request, path):
+    """
+    Serve a collected static file, using its brotli or gzip copy when the client accepts it.
+    Fingerprinted files are cached for a year as immutable; the rest revalidate against Last-Modified.
+    """
+    name = posixpath.normpath(path).lstrip('/')
+    try:
+        full_path = safe_join(settings.STATIC_ROOT, name)
+    except SuspiciousFileOperation:
+        raise Http404("Static file not found.")
+    if not os.path.isfile(full_path):
+        raise Http404("Static file not found.")
+
+    immutable = name in getattr(staticfiles_storage, 'immutable_names', ())
+    modified = os.stat(full_path).st_mtime
+    if not immutable and not was_modified_since(request.headers.get('If-Modified-Since'), modified):
+        response = HttpResponseNotModified()
+    else:
+        served_path, encoding = full_path, None
+        accepted = _accepted_encodings(request.headers.get('Accept-Encoding', ''))
+        for coding, suffix in ENCODINGS:
+            if (coding in accepted or '*' in accepted) and os.path.isfile(full_path + suffix):
+                served_path, encoding = full_path + suffix, coding
+                break
+
+        content_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+        response = FileResponse(open(served_path, 'rb'), content_type=content_type)
+        if encoding:
+            response['Content-Encoding'] = encoding
+
+    response['Last-Modified'] = http_date(modified)
+    response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
@@ -9,13 +9,13 @@ Description: Django URL configuration for the project, including admin routes, b
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
-from django.conf.urls.static import static
+from submission.views import serve_media
+from .staticfiles import serve_static
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path("__reload__/", include("django_browser_reload.urls")),
+    path(f"{settings.STATIC_URL.lstrip('/')}<path:path>", serve_static, name='serve_static'),
+    path(f"{settings.MEDIA_URL.lstrip('/')}<path:path>", serve_media, name='serve_media'),
     path("", include("submission.urls"))
 ]
-
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -5,10 +5,18 @@ Date: 2025-07-16
 Description: Django admin configuration for the Submission model, including inline management of SubmissionSlide objects, custom display fields, and deletion functionality.
 """
 
-from django.contrib import admin
-from .models import Submission, SubmissionSlide, Contact
+from datetime import date
+
+from django.contrib import admin, messages
+from django.http import StreamingHttpResponse
+from django.shortcuts import redirect
+from django.urls import path, reverse
+from .models import ArchivedSubmission, Submission, SubmissionSlide, Contact, OutboxEmail, SERVICES, SERVICE_CHAPEL, SERVICE_PRAISE
 from django.utils.html import format_html
 from django.utils import timezone
+from .deck_export import deck_filename, deck_slides, service_deck, stream_deck
+from .streaming import streaming_content
+from .thumbnails import thumbnail_url
 
 
 admin.site.site_header = "CUNE Announcements Admin"
@@ -19,20 +27,32 @@ admin.site.index_title = "CUNE Announcements Administration"
 class ContactAdmin(admin.ModelAdmin):
     list_display = ('name', 'email', 'is_chapel', 'is_praise')
 
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'submission', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+    readonly_fields = ('attempts', 'locked_at', 'last_error', 'created_at', 'sent_at', 'digests')
+
+@admin.register(ArchivedSubmission)
+class ArchivedSubmissionAdmin(admin.ModelAdmin):
+    list_display = ('title', 'start_date', 'end_date', 'archive_file', 'archived_at')
+    search_fields = ('title', 'email')
+    readonly_fields = [field.name for field in ArchivedSubmission._meta.fields]
+
 class SubmissionSlideInline(admin.TabularInline):
     '''
     Inline admin for SubmissionSlide model to manage slides associated with a Submission.
-    Provides fields for image upload, preview, and download link.
+    Provides fields for image upload, thumbnail preview, and download link.
     '''
 
     model = SubmissionSlide
     extra = 0
-    readonly_fields = ('image_preview', 'download_link')
-    fields = ('image', 'image_preview', 'download_link')
+    readonly_fields = ('image_preview', 'download_link', 'original')
+    fields = ('image', 'image_preview', 'download_link', 'original')
 
     def image_preview(self, obj):
         if obj.image:
-            return format_html('<img src="{}" style="max-height: 100px;"/>', obj.image.url)
+            return format_html('<img src="{}" style="max-height: 100px;"/>', thumbnail_url(obj.image))
         return "-"
     image_preview.short_description = "Preview"
 
@@ -42,6 +62,51 @@ class SubmissionSlideInline(admin.TabularInline):
         return "-"
     download_link.short_description = "Download"
 
+class StatusListFilter(admin.SimpleListFilter):
+    '''
+    Filters announcements by whether they are active today, upcoming, or expired.
+    '''
+
+    title = "status"
+    parameter_name = "status"
+
+    def lookups(self, request, model_admin):
+        return [
+            ('active', "Active"),
+            ('upcoming', "Upcoming"),
+            ('expired', "Expired"),
+        ]
+
+    def queryset(self, request, queryset):
+        if self.value() == 'active':
+            return queryset.active_on()
+        if self.value() == 'upcoming':
+            return queryset.upcoming()
+        if self.value() == 'expired':
+            return queryset.expired()
+        return queryset
+
+
+class ServiceListFilter(admin.SimpleListFilter):
+    '''
+    Filters announcements by the service they are shown at.
+    '''
+
+    title = "service"
+    parameter_name = "service"
+
+    def lookups(self, request, model_admin):
+        return [
+            (SERVICE_CHAPEL, "Chapel"),
+            (SERVICE_PRAISE, "Praise"),
+        ]
+
+    def queryset(self, request, queryset):
+        if self.value() in (SERVICE_CHAPEL, SERVICE_PRAISE):
+            return queryset.for_service(self.value())
+        return queryset
+
+
 @admin.register(Submission)
 class SubmissionAdmin(admin.ModelAdmin):
     '''
@@ -59,7 +124,17 @@ class SubmissionAdmin(admin.ModelAdmin):
         'is_active',
         'delete_announcement',  
     )
+    list_filter = (StatusListFilter, ServiceListFilter)
     inlines = [SubmissionSlideInline]
+    actions = ['export_deck']
+
+    def get_queryset(self, request):
+        '''
+        Prefetches slides and annotates whether each announcement is active today, so the
+        changelist runs a fixed number of queries and can sort on is_active in the database.
+        '''
+
+        return super().get_queryset(request).prefetch_related('slides').with_active_flag()
 
     def start_date_only(self, obj):
         return obj.start_date.date() if obj.start_date else "-"
@@ -71,7 +146,7 @@ class SubmissionAdmin(admin.ModelAdmin):
 
     def all_slides_preview(self, obj):
         '''
-        Returns a formatted HTML string with previews and download links for all slides associated with the submission.
+        Returns a formatted HTML string with thumbnail previews and download links for all slides associated with the submission.
         '''
 
         slides = obj.slides.all() if hasattr(obj, "slides") else obj.submissionslide_set.all()
@@ -81,7 +156,7 @@ class SubmissionAdmin(admin.ModelAdmin):
                 if slide.image:
                     image_html = format_html(
                         '<img src="{}" style="max-height: 100px; margin-right:10px;"/>',
-                        slide.image.url
+                        thumbnail_url(slide.image)
                     )
                     download_html = format_html(
                         '<a href="{}" download>Download</a>',
@@ -95,18 +170,15 @@ class SubmissionAdmin(admin.ModelAdmin):
     def is_active(self, obj):
         '''
         Checks if the submission is currently active based on the start and end dates.
-        Returns True if the current date is within the start and end dates, otherwise False.
+        Uses the is_active_now annotation from get_queryset when it is available.
         '''
 
-        now = timezone.now().date()
-        start = obj.start_date.date() if obj.start_date else None
-        end = obj.end_date.date() if obj.end_date else None
-        if start and end:
-            return start <= now <= end
-        return False
+        if hasattr(obj, 'is_active_now'):
+            return obj.is_active_now
+        return obj.is_active_on(timezone.localdate())
     is_active.boolean = True
     is_active.short_description = "Active"
-    is_active.admin_order_field = 'start_date'
+    is_active.admin_order_field = 'is_active_now'
 
     def delete_announcement(self, obj):
         delete_url = f"/admin/submission/submission/{obj.id}/delete/"
@@ -115,5 +187,44 @@ class SubmissionAdmin(admin.ModelAdmin):
             delete_url
         )
     delete_announcement.short_description = "Delete"
+
+    @admin.action(description="Download slide deck (ZIP) of selected announcements")
+    def export_deck(self, request, queryset):
+        '''
+        Streams the slides of the selected announcements as one ZIP, numbered in presentation order.
+        service_deck_view exports a service's deck for any service date instead.
+        '''
+
+        filename = f"deck-{timezone.localdate().isoformat()}.zip"
+        return self._deck_response(request, deck_slides(queryset), filename)
+
+    def get_urls(self):
+        return [
+            path('deck/', self.admin_site.admin_view(self.service_deck_view), name='submission_submission_deck'),
+        ] + super().get_urls()
+
+    def service_deck_view(self, request):
+        '''
+        Streams the deck of one service for a service date: ?service=chapel&date=YYYY-MM-DD.
+        The date defaults to today, like the export_deck command.
+        '''
+
+        changelist = reverse('admin:submission_submission_changelist')
+        if not self.has_view_permission(request):
+            return redirect(changelist)
+        service = request.GET.get('service')
+        try:
+            day = date.fromisoformat(request.GET['date']) if request.GET.get('date') else timezone.localdate()
+        except ValueError:
+            day = None
+        if service not in SERVICES or day is None:
+            self.message_user(request, "Choose a service and a date as YYYY-MM-DD to download its deck.", messages.ERROR)
+            return redirect(changelist)
+        return self._deck_response(request, service_deck(day, service), deck_filename(service, day))
+
+    def _deck_response(self, request, slides, filename):
+        response = StreamingHttpResponse(streaming_content(request, stream_deck(slides)), content_type='application/zip')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
     
 
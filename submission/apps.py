@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class SubmissionConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'submission'
+
+    def ready(self):
+        from . import database, signals  # noqa: F401
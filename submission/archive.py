@@ -0,0 +1,103 @@
+"""
+File: archive.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Archival of expired announcements. Each batch's slides are packed into a ZIP under ARCHIVE_ROOT first; the announcements are then recorded in ArchivedSubmission and deleted in one short transaction, and their stored files are released once it commits.
+"""
+
+import os
+import zipfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .deck_export import deck_entry_name
+from .models import ArchivedSubmission, Submission
+
+
+def archive_cutoff(days):
+    """Return the date before which an announcement must have ended to be archived."""
+    return timezone.localdate() - timedelta(days=days)
+
+
+def expired_batch(cutoff, batch_size):
+    """Return the next batch of announcements that ended before the cutoff date, oldest first."""
+    return list(Submission.objects.expired(cutoff).prefetch_related('slides').order_by('pk')[:batch_size])
+
+
+def _write_entry(archive, field_file, entry):
+    """Add a stored file to the archive, returning False if it is missing from storage."""
+    try:
+        archive.write(field_file.path, entry)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def _pack_slides(submissions):
+    """
+    Write the batch's slides to a ZIP under ARCHIVE_ROOT, returning its name and the slide records.
+    The file is named by the batch's first and last id and only appears once complete, so a
+    re-run of an interrupted batch replaces it rather than adding a second copy.
+    """
+    os.makedirs(settings.ARCHIVE_ROOT, exist_ok=True)
+    archive_file = f"slides-{submissions[0].pk}-{submissions[-1].pk}.zip"
+    path = os.path.join(settings.ARCHIVE_ROOT, archive_file)
+    partial_path = path + '.part'
+
+    records = {}
+    written = 0
+    with open(partial_path, 'wb') as file:
+        # Slides are PNG, JPEG or WebP, which deflate would only spend time on
+        with zipfile.ZipFile(file, 'w', zipfile.ZIP_STORED) as archive:
+            for submission in submissions:
+                records[submission.pk] = []
+                for position, slide in enumerate(sorted(submission.slides.all(), key=lambda slide: slide.pk), start=1):
+                    record = {'entry': '', 'original_name': slide.original_name, 'image': slide.image.name}
+                    entry = f"{submission.pk}/{deck_entry_name(position, slide)}"
+                    if _write_entry(archive, slide.image, entry):
+                        record['entry'] = entry
+                        written += 1
+                    if slide.original:
+                        entry = f"{submission.pk}/originals/{position:03d}-{os.path.basename(slide.original.name)}"
+                        if _write_entry(archive, slide.original, entry):
+                            record['original_entry'] = entry
+                    records[submission.pk].append(record)
+        file.flush()
+        os.fsync(file.fileno())
+
+    if not written:
+        os.remove(partial_path)
+        return '', records
+    os.replace(partial_path, path)
+    return archive_file, records
+
+
+def archive_submissions(submissions):
+    """
+    Archive a batch of announcements: pack their slides, then record and delete them in one transaction.
+    Returns the name of the ZIP written, or '' if the batch had no stored slides.
+    """
+    archive_file, records = _pack_slides(submissions)
+    with transaction.atomic():
+        ArchivedSubmission.objects.bulk_create([
+            ArchivedSubmission(
+                submission_id=submission.pk,
+                title=submission.title,
+                email=submission.email or '',
+                description=submission.description or '',
+                start_date=submission.start_date,
+                end_date=submission.end_date,
+                created_at=submission.created_at,
+                is_chapel=submission.is_chapel,
+                is_praise=submission.is_praise,
+                slides=records[submission.pk],
+                archive_file=archive_file if any(record['entry'] for record in records[submission.pk]) else '',
+            )
+            for submission in submissions
+        ])
+        # Deleting the slides releases their stored files once this commits
+        Submission.objects.filter(pk__in=[submission.pk for submission in submissions]).delete()
+    return archive_file
@@ -0,0 +1,119 @@
+"""
+File: blobs.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Content-addressed storage for slide images. Slides are stored under the SHA-256 digest of their contents, so identical uploads share one file that is removed once no slide references it.
+"""
+
+import hashlib
+import os
+import threading
+
+from django.apps import apps
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Q
+
+from .thumbnails import delete_thumbnail
+
+
+BLOB_DIR = 'announcements'
+
+# Held while deciding whether a blob is stored and then writing, sharing or deleting it, so a release
+# cannot delete a file a new slide has just decided to share. Reentrant: a failed save releases its
+# own files while holding it. Other processes are kept out by the write transaction taken alongside it.
+blob_write_lock = threading.RLock()
+
+
+def file_digest(file):
+    """
+    Return the SHA-256 hex digest of a file.
+    Uses the digest recorded by the hashing upload handlers when present, otherwise reads the file in chunks.
+    """
+    digest = getattr(file, 'sha256', None)
+    if digest:
+        return digest
+
+    sha256 = hashlib.sha256()
+    file.seek(0)
+    for chunk in file.chunks() if hasattr(file, 'chunks') else iter(lambda: file.read(64 * 1024), b''):
+        sha256.update(chunk)
+    file.seek(0)
+    return sha256.hexdigest()
+
+
+def blob_name(digest, filename):
+    """Return the content-addressed storage name for a digest, keeping the original extension."""
+    extension = os.path.splitext(filename)[1].lower()
+    return f"{BLOB_DIR}/{digest[:2]}/{digest}{extension}"
+
+
+def slide_upload_to(instance, filename):
+    """upload_to callable for SubmissionSlide.image that stores files by content digest."""
+    return blob_name(file_digest(instance.image.file), filename)
+
+
+def original_upload_to(instance, filename):
+    """upload_to callable for SubmissionSlide.original, the upload kept when a slide was normalized."""
+    return blob_name(file_digest(instance.original.file), filename)
+
+
+def release_blob(name):
+    """
+    Delete a stored slide image and its thumbnail once no SubmissionSlide references it.
+    Returns True if the file was deleted.
+    """
+    if not name:
+        return False
+    SubmissionSlide = apps.get_model('submission', 'SubmissionSlide')
+    with blob_write_lock, transaction.atomic():
+        if SubmissionSlide.objects.filter(Q(image=name) | Q(original=name)).exists():
+            return False
+        default_storage.delete(name)
+    delete_thumbnail(name)
+    return True
+
+
+def iter_stored_blobs(modified_before=None):
+    """
+    Yield the storage name and size of each file under BLOB_DIR, optionally only those last modified
+    before a timestamp. The tree is streamed with os.scandir, so only the directories still to visit are held.
+    """
+    pending = [(default_storage.path(BLOB_DIR), BLOB_DIR)]
+    while pending:
+        path, name = pending.pop()
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    entry_name = f"{name}/{entry.name}"
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append((entry.path, entry_name))
+                    elif entry.is_file(follow_symlinks=False):
+                        stat = entry.stat(follow_symlinks=False)
+                        if modified_before is None or stat.st_mtime < modified_before:
+                            yield entry_name, stat.st_size
+        except FileNotFoundError:
+            continue
+
+
+def _unreferenced(batch):
+    """Return the (name, size) pairs of a batch that no SubmissionSlide references, in one query."""
+    if not batch:
+        return []
+    SubmissionSlide = apps.get_model('submission', 'SubmissionSlide')
+    names = [name for name, _ in batch]
+    referenced = set()
+    for image, original in SubmissionSlide.objects.filter(Q(image__in=names) | Q(original__in=names)).values_list('image', 'original'):
+        referenced.update((image, original))
+    return [(name, size) for name, size in batch if name not in referenced]
+
+
+def find_orphaned_blobs(batch_size=1000, modified_before=None):
+    """Yield the (name, size) of each stored file under BLOB_DIR that no slide references, checking batch_size files per query."""
+    batch = []
+    for stored in iter_stored_blobs(modified_before):
+        batch.append(stored)
+        if len(batch) >= batch_size:
+            yield from _unreferenced(batch)
+            batch = []
+    yield from _unreferenced(batch)
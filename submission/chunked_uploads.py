@@ -0,0 +1,224 @@
+"""
+File: chunked_uploads.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Staging for chunked, resumable slide uploads. Chunks are checksummed and appended to a staging file in order, and completed uploads are referenced by token from the submission form, in upload_tokens fields. The submission page uses it when any selected slide is large. Like the form, the endpoints need the CSRF token, in an X-CSRFToken header; scripted clients get it, with its cookie, by loading the submission page first. Uploads expire after CHUNKED_UPLOAD_MAX_AGE and the total staged size is capped, so abandoned uploads cannot fill the disk.
+"""
+
+import hashlib
+import os
+import time
+import uuid
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import ChunkedUpload
+
+
+class ChunkedUploadError(Exception):
+    """Raised when a chunk or upload request cannot be accepted; status is the HTTP status to return."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class StagedUploadFile(File):
+    '''
+    A completed chunked upload opened from its staging file.
+    Exposes temporary_file_path() so file system storage moves the file into place instead of copying it.
+    '''
+
+    def __init__(self, upload):
+        self.path = staging_path(upload)
+        super().__init__(open(self.path, 'rb'), name=upload.filename)
+        self.sha256 = upload.sha256
+        self.token = upload.token
+
+    def temporary_file_path(self):
+        return str(self.path)
+
+
+def staging_path(upload):
+    """Return the path of the staging file for an upload."""
+    return Path(settings.CHUNKED_UPLOAD_DIR) / f"{upload.token}.part"
+
+
+def upload_state(upload):
+    """Return the JSON-serializable progress of an upload, used to resume it."""
+    return {
+        'token': str(upload.token),
+        'filename': upload.filename,
+        'size': upload.size,
+        'chunk_size': upload.chunk_size,
+        'received': upload.received,
+        'next_chunk': upload.next_chunk,
+        'complete': upload.is_complete,
+    }
+
+
+def expiry_cutoff():
+    """Return the creation time before which an upload has expired."""
+    return timezone.now() - timedelta(seconds=settings.CHUNKED_UPLOAD_MAX_AGE)
+
+
+def live_uploads():
+    """Return the uploads that have not expired."""
+    return ChunkedUpload.objects.filter(created_at__gte=expiry_cutoff())
+
+
+def start_upload(filename, size, sha256=''):
+    """
+    Create an upload and its empty staging file.
+    Refused while the unexpired uploads already claim CHUNKED_UPLOAD_MAX_STAGED_BYTES of staging space.
+    """
+    if size <= 0 or size > settings.CHUNKED_UPLOAD_MAX_SIZE:
+        raise ChunkedUploadError(f"File size must be between 1 and {settings.CHUNKED_UPLOAD_MAX_SIZE} bytes.")
+
+    # The sum and the insert share one write transaction, so concurrent starts cannot both slip under the cap
+    with transaction.atomic():
+        staged = live_uploads().aggregate(total=Sum('size'))['total'] or 0
+        if staged + size > settings.CHUNKED_UPLOAD_MAX_STAGED_BYTES:
+            raise ChunkedUploadError("Too many uploads are in progress; try again later.", status=503)
+        upload = ChunkedUpload.objects.create(
+            filename=filename,
+            size=size,
+            chunk_size=settings.CHUNKED_UPLOAD_CHUNK_SIZE,
+            sha256=sha256.lower(),
+        )
+    path = staging_path(upload)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.touch()
+    return upload
+
+
+def _file_sha256(path):
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as staged:
+        for block in iter(lambda: staged.read(1024 * 1024), b''):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+
+def _finish_upload(upload):
+    """Verify the whole-file digest of a fully received upload and mark it complete."""
+    digest = _file_sha256(staging_path(upload))
+    if upload.sha256 and upload.sha256 != digest:
+        # Start over rather than keep a corrupt file
+        ChunkedUpload.objects.filter(pk=upload.pk).update(received=0)
+        staging_path(upload).write_bytes(b'')
+        raise ChunkedUploadError("File checksum does not match; the upload has been restarted.")
+
+    upload.sha256 = digest
+    upload.completed_at = timezone.now()
+    upload.save(update_fields=['sha256', 'completed_at'])
+
+
+def write_chunk(upload, index, data, checksum):
+    """
+    Append chunk number index to the upload's staging file.
+    Chunks must arrive in order; resending a chunk that was already received is accepted and ignored.
+    """
+    if upload.created_at < expiry_cutoff():
+        raise ChunkedUploadError("This upload has expired; start it again.", status=410)
+    if upload.is_complete or index < upload.next_chunk:
+        return upload
+    if index > upload.next_chunk:
+        raise ChunkedUploadError(f"Expected chunk {upload.next_chunk}.", status=409)
+
+    if hashlib.sha256(data).hexdigest() != checksum.lower():
+        raise ChunkedUploadError("Chunk checksum does not match.")
+    expected_length = min(upload.chunk_size, upload.size - upload.received)
+    if len(data) != expected_length:
+        raise ChunkedUploadError(f"Chunk {index} must be {expected_length} bytes.")
+
+    with open(staging_path(upload), 'r+b') as staged:
+        staged.seek(upload.received)
+        staged.write(data)
+        staged.truncate()
+
+    updated = ChunkedUpload.objects.filter(pk=upload.pk, received=upload.received).update(
+        received=upload.received + len(data),
+    )
+    if not updated:
+        raise ChunkedUploadError("Another request wrote this chunk; fetch the upload state and resume.", status=409)
+    upload.received += len(data)
+
+    if upload.received == upload.size:
+        _finish_upload(upload)
+    return upload
+
+
+def _is_uuid(value):
+    try:
+        uuid.UUID(value)
+    except ValueError:
+        return False
+    return True
+
+
+def open_completed_uploads(tokens):
+    """
+    Open the staging files of completed uploads, in token order.
+    Returns the opened files and the tokens that are unknown, expired, not yet complete or whose staging
+    file is gone, such as one already moved into storage by a save that then failed.
+    """
+    valid_tokens = [token for token in tokens if _is_uuid(token)]
+    uploads = {
+        str(upload.token): upload
+        for upload in live_uploads().filter(token__in=valid_tokens, completed_at__isnull=False)
+    }
+    files = []
+    missing = []
+    for token in tokens:
+        upload = uploads.get(token)
+        if upload is None:
+            missing.append(token)
+            continue
+        try:
+            files.append(StagedUploadFile(upload))
+        except FileNotFoundError:
+            missing.append(token)
+    return files, missing
+
+
+def discard_uploads(tokens):
+    """Remove uploads and whatever is left of their staging files."""
+    for upload in ChunkedUpload.objects.filter(token__in=[token for token in tokens if _is_uuid(token)]):
+        staging_path(upload).unlink(missing_ok=True)
+        upload.delete()
+
+
+def expire_uploads():
+    """
+    Remove uploads older than CHUNKED_UPLOAD_MAX_AGE with their staging files, then any staging file
+    just as old that no upload owns. Returns the number of uploads and of stray files removed.
+    """
+    expired = 0
+    for upload in ChunkedUpload.objects.filter(created_at__lt=expiry_cutoff()).iterator():
+        staging_path(upload).unlink(missing_ok=True)
+        upload.delete()
+        expired += 1
+
+    stray = 0
+    cutoff = time.time() - settings.CHUNKED_UPLOAD_MAX_AGE
+    try:
+        with os.scandir(settings.CHUNKED_UPLOAD_DIR) as entries:
+            for entry in entries:
+                token = entry.name.removesuffix('.part')
+                if (
+                    entry.name.endswith('.part') and entry.is_file(follow_symlinks=False)
+                    and entry.stat(follow_symlinks=False).st_mtime < cutoff
+                    and not (_is_uuid(token) and ChunkedUpload.objects.filter(token=token).exists())
+                ):
+                    os.remove(entry.path)
+                    stray += 1
+    except FileNotFoundError:
+        pass
+    return expired, stray
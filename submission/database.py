@@ -0,0 +1,27 @@
+"""
+File: database.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Applies the SQLite connection profile from settings.SQLITE_PRAGMAS (WAL, synchronous, busy timeout, mmap) to every new database connection.
+"""
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """
+    Run the configured PRAGMA statements on a new SQLite connection:
+    busy_timeout - milliseconds a statement waits for another connection's lock before "database is locked";
+    journal_mode=WAL - readers no longer block the writer or each other; the mode persists in the file;
+    synchronous=NORMAL - fsync at checkpoints rather than every commit; safe under WAL, where a power
+    loss can only drop the last commits, never corrupt the database;
+    mmap_size - bytes of the file read through a memory map instead of read() calls.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    # Dict order is kept, so busy_timeout is set before journal_mode has to wait for a lock
+    for name, value in settings.SQLITE_PRAGMAS.items():
+        connection.connection.execute(f"PRAGMA {name} = {value}")
@@ -0,0 +1,84 @@
+"""
+File: deck_export.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Streams the slides of a service's announcements as one ZIP, read from storage chunk by chunk so memory stays flat however large the deck is. Entries are numbered in presentation order.
+"""
+
+import os
+import zipfile
+
+from django.utils import timezone
+from django.utils.text import slugify
+
+from .models import Submission, SubmissionSlide
+
+
+DECK_CHUNK_SIZE = 256 * 1024
+
+
+def deck_slides(submissions):
+    """Return the slides of the given announcements in presentation order: by start date, then upload order."""
+    return (
+        SubmissionSlide.objects
+        .filter(submission__in=submissions)
+        .select_related('submission')
+        .order_by('submission__start_date', 'submission_id', 'pk')
+    )
+
+
+def service_deck(day, service):
+    """Return the slides of every announcement for the service that is active on the given date."""
+    return deck_slides(Submission.objects.active_on(day).for_service(service))
+
+
+def deck_filename(service, day):
+    """Return the download name of a service's deck."""
+    return f"{service}-deck-{day.isoformat()}.zip"
+
+
+def deck_entry_name(position, slide):
+    """Return a slide's name inside the deck, numbered so presentation software sorts it into place."""
+    extension = os.path.splitext(slide.image.name)[1].lower()
+    title = slugify(slide.submission.title)[:60] or 'announcement'
+    return f"{position:03d}-{title}{extension}"
+
+
+class _ZipStream:
+    '''
+    Write-only file object that collects what ZipFile writes until the caller takes it.
+    It has no tell() or seek(), so ZipFile writes entries with data descriptors and never seeks back.
+    '''
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        """Return and forget everything written since the last call."""
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_deck(slides):
+    """Yield a ZIP of the slides piece by piece. Images are already compressed, so entries are stored as is."""
+    output = _ZipStream()
+    modified = timezone.localtime().timetuple()[:6]
+    with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for position, slide in enumerate(slides.iterator(chunk_size=100), start=1):
+            info = zipfile.ZipInfo(deck_entry_name(position, slide), date_time=modified)
+            with slide.image.storage.open(slide.image.name, 'rb') as source, archive.open(info, 'w') as entry:
+                for chunk in iter(lambda: source.read(DECK_CHUNK_SIZE), b''):
+                    entry.write(chunk)
+                    yield output.take()
+            # Data descriptor written when the entry closes
+            yield output.take()
+    # Central directory
+    yield output.take()
@@ -0,0 +1,40 @@
+"""
+File: downloads.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Signed, expiring download links for stored slides, used when slides are too large to attach to notification emails.
+"""
+
+import os
+
+from django.conf import settings
+from django.core import signing
+from django.urls import reverse
+
+
+SLIDE_LINK_SALT = 'submission.slide-download'
+
+
+def slide_download_token(slide):
+    """Return a signed token identifying the slide."""
+    return signing.TimestampSigner(salt=SLIDE_LINK_SALT).sign(str(slide.pk))
+
+
+def slide_id_from_token(token, max_age=None):
+    """
+    Return the slide id from a signed token.
+    Raises signing.SignatureExpired or signing.BadSignature if the token is expired or tampered with.
+    """
+    max_age = settings.SLIDE_LINK_MAX_AGE if max_age is None else max_age
+    return int(signing.TimestampSigner(salt=SLIDE_LINK_SALT).unsign(token, max_age=max_age))
+
+
+def slide_download_url(slide):
+    """Return an absolute, signed download URL for the slide."""
+    path = reverse('download_slide', args=[slide_download_token(slide)])
+    return f"{settings.SITE_URL.rstrip('/')}{path}"
+
+
+def slide_filename(slide):
+    """Return the file name a slide should be downloaded or attached as."""
+    return slide.original_name or os.path.basename(slide.image.name)
@@ -0,0 +1,117 @@
+"""
+File: feeds.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Cached JSON and RSS feeds of the announcements active today for chapel or praise, for display clients that poll. ETags come from a version read from the database, the count and latest update time of the active announcements, so every process agrees on it and a poll that finds nothing new costs one small indexed query and no rendering.
+"""
+
+import hashlib
+import json
+import mimetypes
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.feedgenerator import Enclosure, Rss201rev2Feed
+
+from .downloads import slide_download_url
+from .models import Submission, day_start
+
+
+FEED_FORMATS = {
+    'json': 'application/json',
+    'rss': 'application/rss+xml; charset=utf-8',
+}
+
+
+def feed_version(service, day):
+    """
+    Return the version of a service's feed for a day, from the number of active announcements and their
+    latest updated_at. Adding, removing or editing one, or one of its slides, changes it.
+    """
+    state = Submission.objects.active_on(day).for_service(service).aggregate(count=Count('pk'), updated=Max('updated_at'))
+    updated = state['updated'].timestamp() if state['updated'] else 0
+    return f"{state['count']}-{updated}"
+
+
+def feed_etag(service, fmt, day, version):
+    """
+    Return the strong ETag of a feed for a day at a version. It depends on the feed's content alone, not on the
+    deploy version, which defaults to each process's start time and would make processes disagree.
+    """
+    digest = hashlib.sha256(f"{version}:{day.isoformat()}:{service}:{fmt}".encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def seconds_until_tomorrow():
+    """Return the seconds left until the active announcements can next change by date alone."""
+    now = timezone.localtime()
+    return max(1, int((day_start(now.date() + timedelta(days=1)) - now).total_seconds()))
+
+
+def _active_announcements(service, day):
+    return (
+        Submission.objects.active_on(day)
+        .for_service(service)
+        .prefetch_related('slides')
+        .order_by('start_date', 'pk')
+    )
+
+
+def _render_json(service, day, announcements):
+    # Media is staff-only, so slides are linked through signed download URLs
+    return json.dumps({
+        'service': service,
+        'date': day.isoformat(),
+        'announcements': [
+            {
+                'id': announcement.pk,
+                'title': announcement.title,
+                'description': announcement.description or '',
+                'start_date': announcement.start_date.isoformat(),
+                'end_date': announcement.end_date.isoformat(),
+                'slides': [
+                    {'url': slide_download_url(slide), 'name': slide.original_name}
+                    for slide in sorted(announcement.slides.all(), key=lambda slide: slide.pk)
+                ],
+            }
+            for announcement in announcements
+        ],
+    })
+
+
+def _render_rss(service, day, announcements):
+    """One item per slide, since RSS allows a single enclosure per item."""
+    site_url = settings.SITE_URL.rstrip('/')
+    feed = Rss201rev2Feed(
+        title=f"{service.title()} announcements for {day.isoformat()}",
+        link=f"{site_url}/",
+        description=f"Announcements active at {service} on {day.isoformat()}.",
+    )
+    for announcement in announcements:
+        slides = sorted(announcement.slides.all(), key=lambda slide: slide.pk)
+        for number, slide in enumerate(slides, start=1):
+            url = slide_download_url(slide)
+            feed.add_item(
+                title=f"{announcement.title} ({number}/{len(slides)})",
+                link=url,
+                description=announcement.description or '',
+                unique_id=f"{site_url}/#slide-{slide.pk}",
+                unique_id_is_permalink=False,
+                pubdate=announcement.start_date,
+                enclosures=[Enclosure(url, str(slide.image.size), mimetypes.guess_type(slide.image.name)[0] or 'image/png')],
+            )
+    return feed.writeString('utf-8')
+
+
+def get_feed(service, fmt, day, version):
+    """Return the rendered feed body, cached until the version changes or the day ends."""
+    key = f"submission:feed:{version}:{day.isoformat()}:{service}:{fmt}"
+    body = cache.get(key)
+    if body is None:
+        announcements = _active_announcements(service, day)
+        body = _render_json(service, day, announcements) if fmt == 'json' else _render_rss(service, day, announcements)
+        cache.set(key, body, seconds_until_tomorrow())
+    return body
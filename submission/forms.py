@@ -11,20 +11,31 @@ from django import forms
 from django.core.exceptions import ValidationError
 from .models import Submission
 
+
+# Tailwind classes for the form's widgets, declared once here instead of per render in the template
+INPUT_CLASSES = "border border-gray-300 rounded px-3 py-2 w-full bg-white"
+CHECKBOX_CLASSES = "accent-concordia-sky w-5 h-5 rounded focus:ring-2 focus:ring-concordia-blue"
+
+
 class SubmissionForm(forms.ModelForm):
     '''
     Form for creating and updating Submission instances.
     Validates that at least one of 'chapel' or 'praise' is selected
     and ensures that the start date is before the end date.
+    Widget CSS classes are declared here, so templates render fields with {{ form.field }}.
     '''
 
     class Meta:
         model = Submission
         fields = ['title', 'email', 'description', 'start_date', 'end_date', 'is_chapel', 'is_praise']
         widgets = {
-            'start_date': forms.DateInput(attrs={'type': 'date'}),
-            'end_date': forms.DateInput(attrs={'type': 'date'}),
-            'description': forms.Textarea(attrs={'rows': 5}),
+            'title': forms.TextInput(attrs={'class': INPUT_CLASSES}),
+            'email': forms.EmailInput(attrs={'class': INPUT_CLASSES}),
+            'start_date': forms.DateInput(attrs={'type': 'date', 'class': INPUT_CLASSES}),
+            'end_date': forms.DateInput(attrs={'type': 'date', 'class': INPUT_CLASSES}),
+            'description': forms.Textarea(attrs={'rows': 5, 'class': INPUT_CLASSES}),
+            'is_chapel': forms.CheckboxInput(attrs={'class': CHECKBOX_CLASSES}),
+            'is_praise': forms.CheckboxInput(attrs={'class': CHECKBOX_CLASSES}),
         }
 
     def clean(self):
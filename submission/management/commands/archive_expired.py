@@ -0,0 +1,51 @@
+"""
+File: archive_expired.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Management command that archives announcements which ended more than ARCHIVE_AFTER_DAYS ago, a batch at a time. Safe to re-run after an interruption: a batch is either fully archived or left in place.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from submission.archive import archive_cutoff, archive_submissions, expired_batch
+from submission.models import Submission
+
+
+class Command(BaseCommand):
+    help = (
+        "Move announcements that ended more than --days ago into the archive table, pack their slides "
+        "into ZIPs under ARCHIVE_ROOT and delete them, one batch per transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.ARCHIVE_AFTER_DAYS, help="Archive announcements that ended this many days ago.")
+        parser.add_argument('--batch-size', type=int, default=settings.ARCHIVE_BATCH_SIZE)
+        parser.add_argument('--pause', type=float, default=0.2, help="Seconds to wait between batches, leaving the database to the site.")
+        parser.add_argument('--dry-run', action='store_true', help="Only report how many announcements would be archived.")
+
+    def handle(self, *args, **options):
+        if options['days'] < 0 or options['batch_size'] < 1:
+            raise CommandError("--days must be zero or more and --batch-size at least 1.")
+        cutoff = archive_cutoff(options['days'])
+
+        if options['dry_run']:
+            count = Submission.objects.expired(cutoff).count()
+            self.stdout.write(f"{count} announcements ended before {cutoff.isoformat()} and would be archived.")
+            return
+
+        archived = 0
+        while True:
+            batch = expired_batch(cutoff, options['batch_size'])
+            if not batch:
+                break
+            archive_file = archive_submissions(batch)
+            archived += len(batch)
+            self.stdout.write(f"Archived {len(batch)} announcements" + (f" into {archive_file}." if archive_file else "."))
+            if len(batch) < options['batch_size']:
+                break
+            time.sleep(options['pause'])
+
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} announcements that ended before {cutoff.isoformat()}."))
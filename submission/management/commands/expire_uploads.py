@@ -0,0 +1,22 @@
+"""
+File: expire_uploads.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Management command that removes chunked uploads which were never submitted within CHUNKED_UPLOAD_MAX_AGE, along with their staging files and any stray staging files. Meant to run from cron alongside gc_media.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from submission.chunked_uploads import expire_uploads
+
+
+class Command(BaseCommand):
+    help = "Remove chunked uploads older than CHUNKED_UPLOAD_MAX_AGE and their staging files."
+
+    def handle(self, *args, **options):
+        expired, stray = expire_uploads()
+        self.stdout.write(self.style.SUCCESS(
+            f"Removed {expired} expired uploads and {stray} stray staging files "
+            f"older than {settings.CHUNKED_UPLOAD_MAX_AGE} seconds."
+        ))
@@ -0,0 +1,37 @@
+"""
+File: export_deck.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Management command that writes the slide deck of a service's active announcements to a ZIP file.
+"""
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from submission.deck_export import deck_filename, service_deck, stream_deck
+from submission.models import SERVICES
+
+
+class Command(BaseCommand):
+    help = "Export every slide of the announcements active on a date for a service as one ZIP, in presentation order."
+
+    def add_arguments(self, parser):
+        parser.add_argument('service', choices=SERVICES)
+        parser.add_argument('--date', type=date.fromisoformat, help="Service date as YYYY-MM-DD. Defaults to today.")
+        parser.add_argument('-o', '--output', help="File to write. Defaults to <service>-deck-<date>.zip.")
+
+    def handle(self, *args, **options):
+        day = options['date'] or timezone.localdate()
+        slides = service_deck(day, options['service'])
+        count = slides.count()
+        if not count:
+            raise CommandError(f"No {options['service']} announcements with slides are active on {day.isoformat()}.")
+
+        output = options['output'] or deck_filename(options['service'], day)
+        with open(output, 'wb') as archive:
+            for chunk in stream_deck(slides):
+                archive.write(chunk)
+
+        self.stdout.write(self.style.SUCCESS(f"Wrote {count} slides to {output}."))
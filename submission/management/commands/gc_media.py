@@ -0,0 +1,48 @@
+"""
+File: gc_media.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Management command that finds stored slide files no SubmissionSlide references, for example left behind by an interrupted save or archive, and reports or removes them. The media tree is streamed and checked in batches, so memory use stays flat however many files there are.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from submission.blobs import BLOB_DIR, find_orphaned_blobs, release_blob
+
+
+class Command(BaseCommand):
+    help = f"Report or remove files under MEDIA_ROOT/{BLOB_DIR}/ that no slide references."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Only report orphaned files.")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Files checked against the database per query.")
+        parser.add_argument(
+            '--min-age', type=int, default=60 * 60,
+            help="Skip files modified less than this many seconds ago; a submission may still be saving them.",
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1 or options['min_age'] < 0:
+            raise CommandError("--batch-size must be at least 1 and --min-age zero or more.")
+
+        found = removed = freed = 0
+        for name, size in find_orphaned_blobs(options['batch_size'], time.time() - options['min_age']):
+            found += 1
+            if options['dry_run']:
+                freed += size
+                if options['verbosity'] >= 2:
+                    self.stdout.write(name)
+            # Checked again just before deleting, in case a new slide has started sharing the file
+            elif release_blob(name):
+                removed += 1
+                freed += size
+                if options['verbosity'] >= 2:
+                    self.stdout.write(f"Removed {name}")
+
+        mib = freed / (1024 * 1024)
+        if options['dry_run']:
+            self.stdout.write(f"Found {found} orphaned files ({mib:.1f} MiB). Nothing was removed.")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Removed {removed} of {found} orphaned files ({mib:.1f} MiB)."))
@@ -0,0 +1,201 @@
+"""
+File: loadtest.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Management command that load-tests the submission pipeline end to end. It posts synthetic 16:9 slides concurrently at submit_announcement against a throwaway database and media root, then reports latency percentiles, throughput, peak RSS and a per-stage breakdown.
+"""
+
+import io
+import os
+import shutil
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from submission.models import Contact
+from submission.notifications import send_outbox_batch
+from submission.stage_timing import collect_stage_timings
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+FORMATS = {'png': 'PNG', 'jpeg': 'JPEG'}
+CONTENT_TYPES = {'png': 'image/png', 'jpeg': 'image/jpeg'}
+
+
+def make_slide(width, height, fmt):
+    """Encode a synthetic slide: a gradient with some noise, so it compresses like a real one."""
+    gradient = Image.linear_gradient('L').resize((width, height))
+    noise = Image.effect_noise((width, height), 24)
+    image = Image.merge('RGB', (gradient, noise, Image.new('L', (width, height), 140)))
+    buffer = io.BytesIO()
+    image.save(buffer, format=FORMATS[fmt], **({'quality': 85} if fmt == 'jpeg' else {}))
+    return buffer.getvalue()
+
+
+def make_unique(data, fmt, nonce):
+    """
+    Return a copy of an encoded slide with a unique comment, so content-addressed storage cannot
+    share it with an earlier upload. The pixels, and the header the probe reads, are unchanged.
+    """
+    text = f'loadtest {nonce}'.encode()
+    if fmt == 'png':
+        chunk_type = b'tEXt'
+        payload = b'Comment\x00' + text
+        chunk = struct.pack('>I', len(payload)) + chunk_type + payload + struct.pack('>I', zlib.crc32(chunk_type + payload))
+        # After the 8-byte signature and the 25-byte IHDR chunk
+        return data[:33] + chunk + data[33:]
+    # JPEG COM segment right after SOI
+    return data[:2] + b'\xff\xfe' + struct.pack('>H', len(text) + 2) + text + data[2:]
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def peak_rss_mib():
+    """Return the peak resident set size of this process in MiB, or None where it is unavailable."""
+    if resource is None:
+        return None
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test submit_announcement with concurrent synthetic slide uploads against a throwaway "
+        "database and media root, and report latency, throughput, peak RSS and per-stage timings."
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=100, help="Submissions to post.")
+        parser.add_argument('--concurrency', type=int, default=8, help="Submissions in flight at once.")
+        parser.add_argument('--slides', type=int, default=3, help="Slides per submission.")
+        parser.add_argument(
+            '--sizes', default='1280x720,1920x1080,3840x2160',
+            help="Comma-separated 16:9 slide sizes, used in turn.",
+        )
+        parser.add_argument('--formats', default='png,jpeg', help="Comma-separated slide formats: png, jpeg.")
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [tuple(int(part) for part in size.split('x')) for size in options['sizes'].split(',')]
+        except ValueError:
+            raise CommandError("--sizes must look like 1920x1080,3840x2160.")
+        formats = options['formats'].split(',')
+        if not set(formats) <= set(FORMATS):
+            raise CommandError(f"--formats must be a comma-separated list of {', '.join(FORMATS)}.")
+
+        variants = [(width, height, fmt) for width, height in sizes for fmt in formats]
+        self.stdout.write(f"Encoding {len(variants)} slide variants...")
+        slides = {variant: make_slide(*variant) for variant in variants}
+
+        workdir = tempfile.mkdtemp(prefix='loadtest-')
+        old_name = connection.settings_dict['NAME']
+        connection.settings_dict['TEST'] = {**connection.settings_dict.get('TEST', {}), 'NAME': os.path.join(workdir, 'loadtest.sqlite3')}
+        try:
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            with override_settings(
+                DEBUG=False,
+                ALLOWED_HOSTS=['testserver'],
+                EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+                MEDIA_ROOT=os.path.join(workdir, 'media'),
+                CHUNKED_UPLOAD_DIR=os.path.join(workdir, 'upload_staging'),
+            ):
+                self._run(options, variants, slides)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def _run(self, options, variants, slides):
+        Contact.objects.create(name='Load test', email='loadtest@example.com', is_praise=True)
+        url = reverse('submit_announcement')
+        clients = threading.local()
+        today = timezone.localdate()
+
+        def submit(number):
+            if not hasattr(clients, 'client'):
+                clients.client = Client()
+            files = []
+            for index in range(options['slides']):
+                variant = variants[(number * options['slides'] + index) % len(variants)]
+                fmt = variant[2]
+                content = make_unique(slides[variant], fmt, f'{number}-{index}')
+                files.append(SimpleUploadedFile(f'slide-{number}-{index}.{fmt}', content, content_type=CONTENT_TYPES[fmt]))
+            data = {
+                'title': f'Load test {number}',
+                'start_date': today.isoformat(),
+                'end_date': (today + timedelta(days=7)).isoformat(),
+                'is_praise': 'on',
+                'slides': files,
+            }
+            with collect_stage_timings() as timings:
+                started = time.perf_counter()
+                response = clients.client.post(url, data)
+                elapsed = time.perf_counter() - started
+            return response.status_code == 302, elapsed, timings
+
+        self.stdout.write(
+            f"Posting {options['requests']} submissions of {options['slides']} slides, "
+            f"{options['concurrency']} at a time..."
+        )
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            results = list(executor.map(submit, range(options['requests'])))
+        wall = time.perf_counter() - started
+
+        email_started = time.perf_counter()
+        sent, failed = send_outbox_batch(batch_size=options['requests'], workers=4, max_attempts=1)
+        email_time = time.perf_counter() - email_started
+
+        self._report(options, results, wall, sent, failed, email_time)
+
+    def _report(self, options, results, wall, sent, failed, email_time):
+        ok = sum(1 for success, _, _ in results if success)
+        latencies = sorted(elapsed for _, elapsed, _ in results)
+        stages = {}
+        for _, _, timings in results:
+            for name, seconds in timings.items():
+                stages.setdefault(name, []).append(seconds)
+
+        self.stdout.write('')
+        self.stdout.write(f"Requests:    {len(results)} ({ok} succeeded, {len(results) - ok} failed)")
+        self.stdout.write(f"Wall time:   {wall:.2f}s")
+        self.stdout.write(f"Throughput:  {len(results) / wall:.1f} submissions/s, {len(results) * options['slides'] / wall:.1f} slides/s")
+        rss = peak_rss_mib()
+        self.stdout.write(f"Peak RSS:    {rss:.0f} MiB" if rss is not None else "Peak RSS:    unavailable on this platform")
+        self.stdout.write('')
+        self.stdout.write(f"{'stage':<10} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        rows = [(name, sorted(values)) for name, values in stages.items()] + [('total', latencies)]
+        for name, values in rows:
+            self.stdout.write(
+                f"{name:<10} {len(values):>6} {percentile(values, 50) * 1000:>9.1f} "
+                f"{percentile(values, 95) * 1000:>9.1f} {percentile(values, 99) * 1000:>9.1f}"
+            )
+        per_email = email_time / sent * 1000 if sent else 0.0
+        self.stdout.write('')
+        self.stdout.write(f"Outbox:      {sent} sent, {failed} failed through the locmem backend, {per_email:.1f} ms each")
+
+        if ok < len(results):
+            raise CommandError(f"{len(results) - ok} submissions failed.")
+
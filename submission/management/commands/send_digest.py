@@ -0,0 +1,37 @@
+"""
+File: send_digest.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Management command that batches the notifications held in digest mode into one email per recipient. Schedule it once per digest period, e.g. daily from cron.
+"""
+
+from django.core.management.base import BaseCommand
+
+from submission.notifications import queue_digests, send_outbox_batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Batch the notifications held since the last digest into one email per recipient and queue them "
+        "in the outbox. The send_outbox worker delivers them unless --send is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--send', action='store_true', help="Deliver the digests now instead of leaving them to send_outbox.")
+
+    def handle(self, *args, **options):
+        digests, announcements = queue_digests()
+        if not digests:
+            self.stdout.write("No announcements waiting for the digest.")
+            return
+        self.stdout.write(f"Queued {digests} digest emails covering {announcements} announcements.")
+
+        if options['send']:
+            total_sent = total_failed = 0
+            while True:
+                sent, failed = send_outbox_batch()
+                if not sent and not failed:
+                    break
+                total_sent += sent
+                total_failed += failed
+            self.stdout.write(self.style.SUCCESS(f"Outbox drained: {total_sent} sent, {total_failed} failed."))
@@ -0,0 +1,45 @@
+"""
+File: send_outbox.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Management command that drains queued notification emails, retrying failures with exponential backoff.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from submission.notifications import send_outbox_batch
+
+
+class Command(BaseCommand):
+    help = "Deliver queued notification emails. Runs until stopped unless --once is given."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Drain the emails that are currently due, then exit.")
+        parser.add_argument('--batch-size', type=int, default=settings.EMAIL_OUTBOX_BATCH_SIZE)
+        parser.add_argument('--workers', type=int, default=settings.EMAIL_OUTBOX_WORKERS, help="Concurrent sends per batch.")
+        parser.add_argument('--max-attempts', type=int, default=settings.EMAIL_OUTBOX_MAX_ATTEMPTS)
+        parser.add_argument('--poll-interval', type=float, default=5.0, help="Seconds to sleep when the outbox is empty.")
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+
+        while True:
+            sent, failed = send_outbox_batch(
+                batch_size=options['batch_size'],
+                workers=options['workers'],
+                max_attempts=options['max_attempts'],
+            )
+            total_sent += sent
+            total_failed += failed
+
+            if sent or failed:
+                self.stdout.write(f"Sent {sent}, failed {failed}.")
+                continue
+            if options['once']:
+                break
+            time.sleep(options['poll_interval'])
+
+        self.stdout.write(self.style.SUCCESS(f"Outbox drained: {total_sent} sent, {total_failed} failed."))
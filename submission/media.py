@@ -0,0 +1,146 @@
+"""
+File: media.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Serving stored media files with ETag, Range and conditional GET support. When a front proxy is configured, the response only names the file in an X-Accel-Redirect or X-Sendfile header and the proxy delivers it, ranges included. Otherwise whole files go out through FileResponse, which WSGI servers hand to sendfile. Under ASGI, Django would read a synchronous file iterator into memory before sending it, so files are streamed from a worker thread a chunk at a time instead, without sendfile.
+"""
+
+import mimetypes
+import os
+import posixpath
+import re
+from stat import S_ISREG
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date
+
+from .blobs import BLOB_DIR
+from .streaming import is_asgi_request, streaming_content
+
+
+MEDIA_CHUNK_SIZE = 256 * 1024
+
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+_BLOB_RE = re.compile(rf'^{re.escape(BLOB_DIR)}/[0-9a-f]{{2}}/([0-9a-f]{{64}})\.\w+$')
+
+
+def media_etag(name, stat):
+    """
+    Return a strong ETag for a stored file.
+    Content-addressed slide blobs are named by their SHA-256, which is used directly.
+    """
+    match = _BLOB_RE.match(name)
+    if match:
+        return f'"{match.group(1)}"'
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def parse_range(header, size):
+    """
+    Return the (start, end) byte positions, end inclusive, of a single-range Range header.
+    Returns None when the header should be ignored and the whole file sent,
+    or raises ValueError when the range cannot be satisfied.
+    """
+    match = _RANGE_RE.match(header.replace(' ', ''))
+    if not match or match.groups() == ('', ''):
+        # Malformed, or several ranges: answering with the whole file is allowed
+        return None
+    first, last = match.groups()
+    if not first:
+        length = int(last)
+        if length == 0:
+            raise ValueError("Empty suffix range.")
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("Range starts past the end of the file.")
+    return start, end
+
+
+def _iter_range(path, start, length):
+    """Yield a byte range of a file in chunks."""
+    with open(path, 'rb') as file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(MEDIA_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _proxy_response(name, path, content_type):
+    """Return an empty response that tells the front proxy which file to send, or None without a proxy."""
+    if settings.MEDIA_X_ACCEL_PREFIX:
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = quote(posixpath.join(settings.MEDIA_X_ACCEL_PREFIX, name))
+        return response
+    if settings.MEDIA_X_SENDFILE:
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = path
+        return response
+    return None
+
+
+def _file_response(request, path, size, etag, content_type):
+    """Return the whole file, or the single range the request asks for, streamed in a way the server will not buffer."""
+    byte_range = None
+    # A Range is only honoured while If-Range, if sent, still matches the current file
+    if 'Range' in request.headers and request.headers.get('If-Range', etag) == etag:
+        try:
+            byte_range = parse_range(request.headers['Range'], size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    if byte_range is None and not is_asgi_request(request):
+        return FileResponse(open(path, 'rb'), content_type=content_type)
+
+    start, end = byte_range or (0, size - 1)
+    length = end - start + 1
+    # Reading the file needs no database connection, so any worker thread can do it under ASGI
+    content = streaming_content(request, _iter_range(path, start, length), thread_sensitive=False)
+    response = StreamingHttpResponse(content, status=206 if byte_range else 200, content_type=content_type)
+    if byte_range:
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = str(length)
+    return response
+
+
+def serve_stored_file(request, name, as_attachment=False, filename=None, storage=default_storage):
+    """
+    Return a response for a file in file system storage, honouring If-None-Match, If-Modified-Since,
+    Range and If-Range. Returns None if there is no such file.
+    A configured front proxy always sends the file, ranges included. Without one, Django streams it;
+    under ASGI that takes a worker thread per chunk, so large files are best left to a proxy there.
+    """
+    try:
+        path = storage.path(name)
+        stat = os.stat(path)
+    except (SuspiciousFileOperation, FileNotFoundError, NotADirectoryError):
+        return None
+    if not S_ISREG(stat.st_mode):
+        return None
+
+    etag = media_etag(name, stat)
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+    response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if response is None:
+        response = _proxy_response(name, path, content_type)
+    if response is None:
+        response = _file_response(request, path, stat.st_size, etag, content_type)
+
+    if as_attachment or filename:
+        response['Content-Disposition'] = content_disposition_header(as_attachment, filename or os.path.basename(name))
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Accept-Ranges'] = 'bytes'
+    return response
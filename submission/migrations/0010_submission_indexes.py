@@ -0,0 +1,25 @@
+# Generated by Django 5.2.1 on 2026-10-17 22:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('submission', '0009_outboxemail'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['end_date', 'start_date'], name='submission__end_dat_7d240a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(condition=models.Q(('is_chapel', True)), fields=['end_date', 'start_date'], name='submission_chapel_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(condition=models.Q(('is_praise', True), models.Q(('is_chapel', False), ('is_praise', False)), _connector='OR'), fields=['end_date', 'start_date'], name='submission_praise_end_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.1 on 2026-10-17 22:17
+
+import os
+
+import submission.blobs
+from django.db import migrations, models
+
+
+def backfill_original_names(apps, schema_editor):
+    SubmissionSlide = apps.get_model('submission', 'SubmissionSlide')
+    for slide in SubmissionSlide.objects.filter(original_name='').only('pk', 'image'):
+        slide.original_name = os.path.basename(slide.image.name)
+        slide.save(update_fields=['original_name'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('submission', '0010_submission_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='submissionslide',
+            name='original_name',
+            field=models.CharField(blank=True, help_text='The file name the slide was uploaded with', max_length=255, verbose_name='Original File Name'),
+        ),
+        migrations.AlterField(
+            model_name='submissionslide',
+            name='image',
+            field=models.ImageField(upload_to=submission.blobs.slide_upload_to),
+        ),
+        migrations.RunPython(backfill_original_names, migrations.RunPython.noop),
+    ]
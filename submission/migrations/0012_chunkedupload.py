@@ -0,0 +1,28 @@
+# Generated by Django 5.2.1 on 2026-10-17 22:18
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('submission', '0011_content_addressed_slides'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChunkedUpload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.UUIDField(default=uuid.uuid4, editable=False, unique=True, verbose_name='Token')),
+                ('filename', models.CharField(max_length=255, verbose_name='File Name')),
+                ('size', models.PositiveBigIntegerField(verbose_name='Size')),
+                ('chunk_size', models.PositiveIntegerField(verbose_name='Chunk Size')),
+                ('received', models.PositiveBigIntegerField(default=0, verbose_name='Bytes Received')),
+                ('sha256', models.CharField(blank=True, help_text='Digest of the whole file, verified when the last chunk arrives', max_length=64, verbose_name='SHA-256')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('completed_at', models.DateTimeField(blank=True, null=True, verbose_name='Completed At')),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-17 22:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('submission', '0012_chunkedupload'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='outboxemail',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed'), ('held', 'Held for digest'), ('digested', 'Sent in digest')], default='pending', max_length=10, verbose_name='Status'),
+        ),
+    ]
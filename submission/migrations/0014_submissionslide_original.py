@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-17 22:43
+
+import submission.blobs
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('submission', '0013_outboxemail_digest_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='submissionslide',
+            name='original',
+            field=models.FileField(blank=True, help_text='The upload as received, kept when the slide was normalized and originals are kept', upload_to=submission.blobs.original_upload_to, verbose_name='Original Upload'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.1 on 2026-10-17 22:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('submission', '0014_submissionslide_original'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedSubmission',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('submission_id', models.BigIntegerField(unique=True, verbose_name='Submission ID')),
+                ('title', models.CharField(max_length=200, verbose_name='Title')),
+                ('email', models.EmailField(blank=True, max_length=254, verbose_name='Contact Email')),
+                ('description', models.TextField(blank=True, verbose_name='Description')),
+                ('start_date', models.DateTimeField(verbose_name='Start Date')),
+                ('end_date', models.DateTimeField(verbose_name='End Date')),
+                ('created_at', models.DateTimeField(verbose_name='Created At')),
+                ('is_chapel', models.BooleanField(default=False, verbose_name='Chapel')),
+                ('is_praise', models.BooleanField(default=False, verbose_name='Praise')),
+                ('slides', models.JSONField(default=list, help_text='Entry name in the archive, original file name and stored name of each slide', verbose_name='Slides')),
+                ('archive_file', models.CharField(blank=True, max_length=255, verbose_name='Archive File')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='Archived At')),
+            ],
+            options={
+                'verbose_name': 'Archived Submission',
+                'verbose_name_plural': 'Archived Submissions',
+                'ordering': ['-end_date'],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-17 22:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('submission', '0015_archivedsubmission'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='submission',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, help_text='The date and time when the announcement or one of its slides last changed', verbose_name='Updated At'),
+        ),
+    ]
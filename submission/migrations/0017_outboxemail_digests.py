@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-17 23:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('submission', '0016_submission_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxemail',
+            name='digests',
+            field=models.ManyToManyField(blank=True, help_text='Digest emails that include this held notification; it counts as sent once they all are', related_name='digested_emails', to='submission.outboxemail', verbose_name='Digests'),
+        ),
+        migrations.AlterField(
+            model_name='outboxemail',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed'), ('held', 'Held for digest'), ('digested', 'Included in digest')], default='pending', max_length=10, verbose_name='Status'),
+        ),
+    ]
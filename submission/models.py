@@ -6,7 +6,70 @@ Description: Django models for the Submission and SubmissionSlide
 """
 
 
+import os
+import uuid
+from datetime import datetime, time, timedelta
+
 from django.db import models
+from django.utils import timezone
+
+from .blobs import blob_name, file_digest, original_upload_to, slide_upload_to
+
+
+SERVICE_CHAPEL = 'chapel'
+SERVICE_PRAISE = 'praise'
+SERVICES = (SERVICE_CHAPEL, SERVICE_PRAISE)
+
+# Announcements that select neither service go to praise, as routing.get_recipients sends them
+PRAISE_Q = models.Q(is_praise=True) | models.Q(is_chapel=False, is_praise=False)
+
+
+def day_start(day):
+    """Return the aware datetime at which the given date starts in the current time zone."""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+class SubmissionQuerySet(models.QuerySet):
+    '''
+    QuerySet for announcements, with date and service filters that compare the raw
+    start_date/end_date columns against day boundaries so the indexes can be used.
+    '''
+
+    def _active_q(self, day):
+        start = day_start(day)
+        return models.Q(start_date__lt=start + timedelta(days=1), end_date__gte=start)
+
+    def active_on(self, day=None):
+        """Announcements running at any point on the given date (today by default)."""
+        return self.filter(self._active_q(day or timezone.localdate()))
+
+    def upcoming(self, window=None, day=None):
+        """Announcements starting after the given date, optionally only within window (a timedelta)."""
+        start = day_start(day or timezone.localdate()) + timedelta(days=1)
+        # An announcement ending before it starts is never shown; the end_date bound also lets the index answer this
+        queryset = self.filter(start_date__gte=start, end_date__gte=start)
+        if window is not None:
+            queryset = queryset.filter(start_date__lt=start + window)
+        return queryset
+
+    def expired(self, day=None):
+        """Announcements that ended before the given date."""
+        return self.filter(end_date__lt=day_start(day or timezone.localdate()))
+
+    def for_service(self, service):
+        """Announcements for the chapel or praise service."""
+        if service == SERVICE_CHAPEL:
+            return self.filter(is_chapel=True)
+        if service == SERVICE_PRAISE:
+            return self.filter(PRAISE_Q)
+        raise ValueError(f"Unknown service {service!r}; expected one of {', '.join(SERVICES)}.")
+
+    def with_active_flag(self, day=None):
+        """Annotate is_active_now, whether each announcement runs on the given date."""
+        return self.annotate(is_active_now=models.ExpressionWrapper(
+            self._active_q(day or timezone.localdate()),
+            output_field=models.BooleanField(),
+        ))
 
 class Submission(models.Model):
     '''
@@ -22,29 +85,58 @@ class Submission(models.Model):
     start_date = models.DateTimeField(verbose_name='Start Date', help_text='Enter the start date of the announcement')
     end_date = models.DateTimeField(verbose_name='End Date', help_text='Enter the end date of the announcement')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Created At', help_text='The date and time when the announcement was created')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Updated At', help_text='The date and time when the announcement or one of its slides last changed')
     is_chapel = models.BooleanField(default=False, verbose_name='Chapel', help_text='Indicates if the announcement is for chapel')
     is_praise = models.BooleanField(default=True, verbose_name='Praise', help_text='Indicates if the announcement is for praise')
 
+    objects = SubmissionQuerySet.as_manager()
+
     def __str__(self):
         return self.title
+
+    def is_active_on(self, day):
+        """Return True if the announcement runs at any point on the given date."""
+        if not self.start_date or not self.end_date:
+            return False
+        start = day_start(day)
+        return self.start_date < start + timedelta(days=1) and self.end_date >= start
     
     class Meta:
         verbose_name = 'Announcement'
         verbose_name_plural = 'Announcements'
         ordering = ['-start_date']
+        indexes = [
+            # Active and expired announcements are bounded by end_date; few rows end after a given day
+            models.Index(fields=['end_date', 'start_date']),
+            # Django tests booleans as a bare column, which SQLite can only match against a partial index
+            models.Index(fields=['end_date', 'start_date'], condition=models.Q(is_chapel=True), name='submission_chapel_end_idx'),
+            models.Index(fields=['end_date', 'start_date'], condition=PRAISE_Q, name='submission_praise_end_idx'),
+        ]
 
 class SubmissionSlide(models.Model):
     '''
     Model representing a slide associated with a submission.
     Contains a foreign key to the Submission model and an image field for the slide image.
+    Images are stored by content digest, so identical slides share one file.
     '''
 
     submission = models.ForeignKey('Submission', on_delete=models.CASCADE, related_name='slides')
-    image = models.ImageField(upload_to='announcements/')
+    image = models.ImageField(upload_to=slide_upload_to)
+    original_name = models.CharField(max_length=255, blank=True, verbose_name='Original File Name', help_text='The file name the slide was uploaded with')
+    original = models.FileField(upload_to=original_upload_to, blank=True, verbose_name='Original Upload', help_text='The upload as received, kept when the slide was normalized and originals are kept')
 
     def __str__(self):
         return f"Slide for {self.submission.title}"
 
+    def save(self, *args, **kwargs):
+        if self.image and not self.image._committed:
+            self.original_name = os.path.basename(self.image.name)
+            name = blob_name(file_digest(self.image.file), self.image.name)
+            if self.image.storage.exists(name):
+                # Identical contents are already stored; share the existing file
+                self.image = name
+        super().save(*args, **kwargs)
+
 
 class Contact(models.Model):
     """
@@ -57,4 +149,110 @@ class Contact(models.Model):
     is_praise = models.BooleanField(default=False, verbose_name='Praise Contact', help_text='Indicates if this contact is for praise announcements')
 
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
+
+
+class OutboxEmail(models.Model):
+    """
+    Model representing a notification email waiting to be delivered.
+    Rows are written in the same transaction as their Submission and drained by the send_outbox command.
+    """
+
+    STATUS_PENDING = 'pending'
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    # Digest mode: notifications are held, then batched into digest emails by the send_digest command
+    STATUS_HELD = 'held'
+    STATUS_DIGESTED = 'digested'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENDING, 'Sending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_FAILED, 'Failed'),
+        (STATUS_HELD, 'Held for digest'),
+        (STATUS_DIGESTED, 'Included in digest'),
+    ]
+
+    submission = models.ForeignKey('Submission', on_delete=models.SET_NULL, related_name='emails', blank=True, null=True)
+    subject = models.CharField(max_length=200, verbose_name='Subject')
+    body = models.TextField(verbose_name='Body')
+    from_email = models.EmailField(max_length=254, verbose_name='From')
+    recipients = models.JSONField(default=list, verbose_name='Recipients')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING, verbose_name='Status')
+    attempts = models.PositiveIntegerField(default=0, verbose_name='Attempts')
+    next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name='Next Attempt At')
+    locked_at = models.DateTimeField(blank=True, null=True, verbose_name='Locked At')
+    last_error = models.TextField(blank=True, verbose_name='Last Error')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Created At')
+    sent_at = models.DateTimeField(blank=True, null=True, verbose_name='Sent At')
+    digests = models.ManyToManyField(
+        'self', symmetrical=False, blank=True, related_name='digested_emails', verbose_name='Digests',
+        help_text='Digest emails that include this held notification; it counts as sent once they all are',
+    )
+
+    def __str__(self):
+        return f"{self.subject} ({self.status})"
+
+    class Meta:
+        verbose_name = 'Outbox Email'
+        verbose_name_plural = 'Outbox Emails'
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+
+class ArchivedSubmission(models.Model):
+    """
+    Model representing an expired announcement removed by the archive_expired command.
+    Keeps the announcement's details; its slides are packed in the ZIP under ARCHIVE_ROOT named by archive_file.
+    """
+
+    submission_id = models.BigIntegerField(unique=True, verbose_name='Submission ID')
+    title = models.CharField(max_length=200, verbose_name='Title')
+    email = models.EmailField(max_length=254, blank=True, verbose_name='Contact Email')
+    description = models.TextField(blank=True, verbose_name='Description')
+    start_date = models.DateTimeField(verbose_name='Start Date')
+    end_date = models.DateTimeField(verbose_name='End Date')
+    created_at = models.DateTimeField(verbose_name='Created At')
+    is_chapel = models.BooleanField(default=False, verbose_name='Chapel')
+    is_praise = models.BooleanField(default=False, verbose_name='Praise')
+    slides = models.JSONField(default=list, verbose_name='Slides', help_text='Entry name in the archive, original file name and stored name of each slide')
+    archive_file = models.CharField(max_length=255, blank=True, verbose_name='Archive File')
+    archived_at = models.DateTimeField(auto_now_add=True, verbose_name='Archived At')
+
+    def __str__(self):
+        return self.title
+
+    class Meta:
+        verbose_name = 'Archived Submission'
+        verbose_name_plural = 'Archived Submissions'
+        ordering = ['-end_date']
+
+
+class ChunkedUpload(models.Model):
+    """
+    Model representing a slide being uploaded in chunks.
+    Chunks are appended to a staging file in order; once complete, the token is referenced from the submission form.
+    """
+
+    token = models.UUIDField(default=uuid.uuid4, unique=True, editable=False, verbose_name='Token')
+    filename = models.CharField(max_length=255, verbose_name='File Name')
+    size = models.PositiveBigIntegerField(verbose_name='Size')
+    chunk_size = models.PositiveIntegerField(verbose_name='Chunk Size')
+    received = models.PositiveBigIntegerField(default=0, verbose_name='Bytes Received')
+    sha256 = models.CharField(max_length=64, blank=True, verbose_name='SHA-256', help_text='Digest of the whole file, verified when the last chunk arrives')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Created At')
+    completed_at = models.DateTimeField(blank=True, null=True, verbose_name='Completed At')
+
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size} bytes)"
+
+    @property
+    def next_chunk(self):
+        return self.received // self.chunk_size
+
+    @property
+    def is_complete(self):
+        return self.completed_at is not None
@@ -0,0 +1,124 @@
+"""
+File: normalization.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Optional normalization of validated slides before they are stored. Slides larger than the display resolution are downscaled, metadata is stripped and the image is re-encoded with optimized settings. The work runs in a process pool so decoding and encoding large images never holds up request threads.
+"""
+
+import hashlib
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+
+EXTENSIONS = {'PNG': '.png', 'JPEG': '.jpg', 'WEBP': '.webp'}
+
+
+def _save_options(fmt, quality):
+    if fmt == 'PNG':
+        return {'optimize': True}
+    if fmt == 'JPEG':
+        return {'quality': quality, 'optimize': True, 'progressive': True}
+    return {'quality': quality, 'method': 4}
+
+
+def normalize_image(data, size, fmt, quality):
+    """
+    Downscale an encoded slide to fit size, strip its metadata and re-encode it as fmt, or its own format if fmt is empty.
+    Runs in the normalization pool, so it only uses Pillow. Returns (data, format), or None when the
+    slide already fits and re-encoding would not make it smaller.
+    """
+    with Image.open(io.BytesIO(data)) as source:
+        source_format = source.format
+        icc_profile = source.info.get('icc_profile')
+        # Apply the EXIF orientation before the EXIF block is dropped
+        image = ImageOps.exif_transpose(source)
+
+    target_format = fmt or source_format
+    resized = image.width > size[0] or image.height > size[1]
+    if image.mode not in ('RGB', 'RGBA', 'L'):
+        image = image.convert('RGBA' if image.has_transparency_data else 'RGB')
+    if target_format == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    if resized:
+        image.thumbnail(size, Image.Resampling.LANCZOS)
+
+    # Keep only the colour profile: EXIF, XMP and text chunks are not written
+    image.info = {}
+    buffer = io.BytesIO()
+    image.save(buffer, format=target_format, icc_profile=icc_profile, **_save_options(target_format, quality))
+    normalized = buffer.getvalue()
+
+    if not resized and target_format == source_format and len(normalized) >= len(data):
+        return None
+    return normalized, target_format
+
+
+_normalize_executor = None
+_normalize_executor_lock = threading.Lock()
+
+
+def _get_normalize_executor():
+    """Return the process pool used to normalize slides, creating it on first use."""
+    global _normalize_executor
+    with _normalize_executor_lock:
+        if _normalize_executor is None:
+            # Spawned rather than forked: forking a process with live request threads is unsafe
+            _normalize_executor = ProcessPoolExecutor(
+                max_workers=settings.SLIDE_NORMALIZATION_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+    return _normalize_executor
+
+
+def _read(slide):
+    slide.seek(0)
+    data = slide.read()
+    slide.seek(0)
+    return data
+
+
+def normalize_slides(slides, skip_flags):
+    """
+    Normalize validated slides in the process pool, skipping those flagged in skip_flags.
+    Returns the files to store, in upload order; for each the upload to keep as its original,
+    None unless the slide was normalized and SLIDE_NORMALIZATION_KEEP_ORIGINALS is set; and the
+    error message of each slide Pillow could not decode, or None.
+    """
+    pending = [index for index, skip in enumerate(skip_flags) if not skip]
+    executor = _get_normalize_executor()
+    futures = {
+        index: executor.submit(
+            normalize_image,
+            _read(slides[index]),
+            settings.SLIDE_NORMALIZED_SIZE,
+            settings.SLIDE_NORMALIZED_FORMAT,
+            settings.SLIDE_NORMALIZED_QUALITY,
+        )
+        for index in pending
+    }
+
+    stored, originals, errors = list(slides), [None] * len(slides), [None] * len(slides)
+    for index, future in futures.items():
+        try:
+            result = future.result()
+        except (OSError, SyntaxError, ValueError, Image.DecompressionBombError):
+            # Headers can pass the probe while the pixel data is truncated, corrupt or too large to decode
+            errors[index] = f"{slides[index].name}: Uploaded file is not a valid image."
+            continue
+        if result is None:
+            continue
+        data, fmt = result
+        slide = slides[index]
+        normalized = ContentFile(data, name=os.path.splitext(slide.name)[0] + EXTENSIONS[fmt])
+        normalized.sha256 = hashlib.sha256(data).hexdigest()
+        stored[index] = normalized
+        if settings.SLIDE_NORMALIZATION_KEEP_ORIGINALS:
+            originals[index] = slide
+    return stored, originals, errors
@@ -0,0 +1,283 @@
+"""
+File: notifications.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Notification emails for new submissions. Emails are queued as OutboxEmail rows inside the submission's transaction and delivered later by the send_outbox command. In digest mode they are held instead, and send_digest batches them into one email per recipient.
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .downloads import slide_download_url, slide_filename
+from .models import OutboxEmail
+from .routing import get_recipients
+
+
+logger = logging.getLogger(__name__)
+
+
+def format_email_body(cleaned_data):
+    """Format the email body with submission details."""
+    start_date = cleaned_data.get("start_date")
+    end_date = cleaned_data.get("end_date")
+    formatted_start = start_date.strftime("%B %d, %Y") if start_date else "N/A"
+    formatted_end = end_date.strftime("%B %d, %Y") if end_date else "N/A"
+
+    return (
+        f"Title: {cleaned_data.get('title', '')}\n"
+        f"Contact Email: {cleaned_data.get('email', '')}\n"
+        f"Description: {cleaned_data.get('description', '')}\n"
+        f"Start Date: {formatted_start}\n"
+        f"End Date: {formatted_end}\n"
+    )
+
+
+def get_email_recipients(cleaned_data):
+    """Get email recipients based on chapel and praise selections."""
+    return get_recipients(cleaned_data.get("is_chapel"), cleaned_data.get("is_praise"))
+
+
+def queue_notification(submission, cleaned_data):
+    """
+    Queue the notification email for a new submission.
+    Call inside the transaction that saves the submission so both rows commit together.
+    """
+    return OutboxEmail.objects.create(
+        submission=submission,
+        subject="New Announcement",
+        body=f"A new announcement has been submitted:\n\n{format_email_body(cleaned_data)}",
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        recipients=get_email_recipients(cleaned_data),
+        status=OutboxEmail.STATUS_HELD if settings.EMAIL_DIGEST_MODE else OutboxEmail.STATUS_PENDING,
+    )
+
+
+def _digest_entry(submission):
+    """Format one announcement of a digest, with download links for its slides."""
+    text = format_email_body({
+        'title': submission.title,
+        'email': submission.email or '',
+        'description': submission.description or '',
+        'start_date': timezone.localtime(submission.start_date),
+        'end_date': timezone.localtime(submission.end_date),
+    })
+    for slide in submission.slides.all():
+        text += f"Slide {slide_filename(slide)}: {slide_download_url(slide)}\n"
+    return text
+
+
+def _digest_body(submissions):
+    days = settings.SLIDE_LINK_MAX_AGE // (24 * 60 * 60)
+    header = (
+        f"{len(submissions)} new announcement{'s were' if len(submissions) != 1 else ' was'} submitted "
+        f"since the last digest. Slide download links are valid for {days} days.\n\n"
+    )
+    return header + "\n".join(_digest_entry(submission) for submission in submissions)
+
+
+def queue_digests():
+    """
+    Batch the notifications held in digest mode into outbox emails, one per recipient, and mark them digested.
+    Recipients due the same announcements share a single email, so the send_outbox worker makes one
+    provider call for each group. Each held notification is linked to the digests that include it and
+    gets its sent_at once they have all been sent. Returns a (digests queued, announcements included) tuple.
+    """
+    with transaction.atomic():
+        held = list(
+            OutboxEmail.objects.filter(status=OutboxEmail.STATUS_HELD)
+            .select_related('submission')
+            .prefetch_related('submission__slides')
+            .order_by('created_at', 'pk')
+        )
+        if not held:
+            return 0, 0
+
+        # Announcements deleted since they were held have nothing left to announce
+        held_by_recipient = {}
+        for outbox_email in held:
+            if outbox_email.submission is None:
+                continue
+            for recipient in outbox_email.recipients:
+                held_by_recipient.setdefault(recipient, []).append(outbox_email)
+
+        groups = {}
+        for recipient, outbox_emails in held_by_recipient.items():
+            key = tuple(outbox_email.submission_id for outbox_email in outbox_emails)
+            groups.setdefault(key, (outbox_emails, []))[1].append(recipient)
+
+        digests = OutboxEmail.objects.bulk_create([
+            OutboxEmail(
+                subject=f"Announcement Digest ({len(outbox_emails)} new)",
+                body=_digest_body([outbox_email.submission for outbox_email in outbox_emails]),
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                recipients=recipients,
+            )
+            for outbox_emails, recipients in groups.values()
+        ])
+        OutboxEmail.digests.through.objects.bulk_create([
+            OutboxEmail.digests.through(from_outboxemail_id=outbox_email.pk, to_outboxemail_id=digest.pk)
+            for digest, (outbox_emails, _) in zip(digests, groups.values())
+            for outbox_email in outbox_emails
+        ])
+        OutboxEmail.objects.filter(pk__in=[outbox_email.pk for outbox_email in held]).update(
+            status=OutboxEmail.STATUS_DIGESTED,
+        )
+    return len(groups), len({pk for key in groups for pk in key})
+
+
+def _record_digested_sent(sent, now):
+    """Set sent_at on digested notifications whose digests have now all been sent."""
+    OutboxEmail.objects.filter(
+        status=OutboxEmail.STATUS_DIGESTED, sent_at__isnull=True, digests__in=sent,
+    ).exclude(
+        digests__status__in=[OutboxEmail.STATUS_PENDING, OutboxEmail.STATUS_SENDING, OutboxEmail.STATUS_FAILED],
+    ).update(sent_at=now)
+
+
+def _slide_links_text(slides):
+    """Format signed download links for slides that are not attached."""
+    days = settings.SLIDE_LINK_MAX_AGE // (24 * 60 * 60)
+    lines = [f"\n\nThe slides are too large to attach. Download links (valid for {days} days):"]
+    lines.extend(f"{slide_filename(slide)}: {slide_download_url(slide)}" for slide in slides)
+    return "\n".join(lines)
+
+
+def build_message(outbox_email):
+    """
+    Build the EmailMessage for a queued email from the submission's stored slides.
+    Slides are attached while their total size fits EMAIL_ATTACHMENT_BUDGET_BYTES;
+    larger decks are sent as signed, expiring download links instead.
+    """
+    slides = list(outbox_email.submission.slides.all()) if outbox_email.submission_id else []
+    total_size = sum(slide.image.size for slide in slides)
+    attach_slides = total_size <= settings.EMAIL_ATTACHMENT_BUDGET_BYTES
+
+    body = outbox_email.body
+    if slides and not attach_slides:
+        body += _slide_links_text(slides)
+
+    email = EmailMessage(
+        subject=outbox_email.subject,
+        body=body,
+        from_email=outbox_email.from_email,
+        to=outbox_email.recipients,
+    )
+
+    if attach_slides:
+        for slide in slides:
+            # Read straight from storage, one slide at a time
+            with slide.image.open('rb') as image_file:
+                email.attach(slide_filename(slide), image_file.read())
+
+    return email
+
+
+def _retry_delay(attempts):
+    """Exponential backoff for the given number of failed attempts."""
+    delay = settings.EMAIL_OUTBOX_BACKOFF_SECONDS * (2 ** max(attempts - 1, 0))
+    return timedelta(seconds=min(delay, settings.EMAIL_OUTBOX_MAX_BACKOFF_SECONDS))
+
+
+def claim_batch(batch_size):
+    """
+    Mark up to batch_size due emails as sending and return them.
+    Emails stuck in sending longer than the lease (e.g. a crashed worker) are claimed again.
+    """
+    now = timezone.now()
+    lease_expired = now - timedelta(seconds=settings.EMAIL_OUTBOX_LEASE_SECONDS)
+    due = (
+        Q(status=OutboxEmail.STATUS_PENDING, next_attempt_at__lte=now)
+        | Q(status=OutboxEmail.STATUS_SENDING, locked_at__lt=lease_expired)
+    )
+
+    candidates = list(
+        OutboxEmail.objects.filter(due).order_by('next_attempt_at').values_list('pk', flat=True)[:batch_size]
+    )
+    if not candidates:
+        return []
+
+    OutboxEmail.objects.filter(due, pk__in=candidates).update(
+        status=OutboxEmail.STATUS_SENDING,
+        locked_at=now,
+        attempts=F('attempts') + 1,
+    )
+    return list(
+        OutboxEmail.objects.filter(pk__in=candidates, status=OutboxEmail.STATUS_SENDING, locked_at=now)
+        .select_related('submission')
+    )
+
+
+def _describe_error(exc):
+    return f"{type(exc).__name__}: {exc}"
+
+
+def _send(message):
+    """Send a single message, returning the error text on failure."""
+    if isinstance(message, str):
+        # The message could not be built; carry the build error through
+        return message
+    try:
+        message.send()
+    except Exception as exc:
+        return _describe_error(exc)
+    return None
+
+
+def send_outbox_batch(batch_size=None, workers=None, max_attempts=None):
+    """
+    Claim and deliver one batch of queued emails, sending concurrently.
+    Messages are built and results recorded on the calling thread; worker threads only talk to the mail provider.
+    Returns a (sent, failed) tuple for the batch.
+    """
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    workers = workers or settings.EMAIL_OUTBOX_WORKERS
+    max_attempts = max_attempts or settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+
+    batch = claim_batch(batch_size)
+    if not batch:
+        return 0, 0
+
+    messages = []
+    for outbox_email in batch:
+        try:
+            messages.append(build_message(outbox_email))
+        except Exception as exc:
+            messages.append(_describe_error(exc))
+
+    # The worker runs outside any request, so it reports the send time itself rather than as a profiling stage
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=min(workers, len(batch))) as executor:
+        errors = list(executor.map(_send, messages))
+    logger.info("Sent outbox batch of %s in %.1f ms", len(batch), (time.perf_counter() - started) * 1000)
+
+    sent = failed = 0
+    now = timezone.now()
+    for outbox_email, error in zip(batch, errors):
+        if error is None:
+            outbox_email.status = OutboxEmail.STATUS_SENT
+            outbox_email.sent_at = now
+            outbox_email.last_error = ''
+            sent += 1
+        else:
+            logger.warning("Outbox email %s failed on attempt %s: %s", outbox_email.pk, outbox_email.attempts, error)
+            outbox_email.last_error = error
+            if outbox_email.attempts >= max_attempts:
+                outbox_email.status = OutboxEmail.STATUS_FAILED
+            else:
+                outbox_email.status = OutboxEmail.STATUS_PENDING
+                outbox_email.next_attempt_at = now + _retry_delay(outbox_email.attempts)
+            failed += 1
+        outbox_email.locked_at = None
+        outbox_email.save(update_fields=['status', 'sent_at', 'last_error', 'next_attempt_at', 'locked_at'])
+
+    if sent:
+        _record_digested_sent([outbox_email.pk for outbox_email, error in zip(batch, errors) if error is None], now)
+    return sent, failed
@@ -0,0 +1,68 @@
+"""
+File: renderers.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Form renderer that renders Django's simple input and textarea widget templates with precompiled Python functions instead of the template engine.
+"""
+
+from django.forms.renderers import DjangoTemplates
+from django.utils.html import conditional_escape
+
+
+def _format_value(value):
+    """Equivalent of {{ value|stringformat:'s' }} with autoescaping."""
+    return conditional_escape(value if isinstance(value, str) else '%s' % (value,))
+
+
+def _render_attrs(attrs):
+    """Equivalent of django/forms/widgets/attrs.html."""
+    parts = []
+    for name, value in attrs.items():
+        if value is False:
+            continue
+        if value is True:
+            parts.append(f' {conditional_escape(name)}')
+        else:
+            parts.append(f' {conditional_escape(name)}="{_format_value(value)}"')
+    return ''.join(parts)
+
+
+def _render_input(widget):
+    """Equivalent of django/forms/widgets/input.html."""
+    value = f' value="{_format_value(widget["value"])}"' if widget['value'] is not None else ''
+    return (
+        f'<input type="{conditional_escape(widget["type"])}" name="{conditional_escape(widget["name"])}"'
+        f'{value}{_render_attrs(widget["attrs"])}>'
+    )
+
+
+def _render_textarea(widget):
+    """Equivalent of django/forms/widgets/textarea.html."""
+    value = conditional_escape(widget['value']) if widget['value'] else ''
+    return f'<textarea name="{conditional_escape(widget["name"])}"{_render_attrs(widget["attrs"])}>\n{value}</textarea>'
+
+
+# Widget templates whose whole body is {% include "django/forms/widgets/input.html" %}
+_INPUT_TEMPLATES = [
+    'checkbox', 'color', 'date', 'datetime', 'email', 'hidden', 'input', 'number',
+    'password', 'search', 'tel', 'text', 'time', 'url',
+]
+
+COMPILED_WIDGET_TEMPLATES = {
+    **{f'django/forms/widgets/{name}.html': _render_input for name in _INPUT_TEMPLATES},
+    'django/forms/widgets/textarea.html': _render_textarea,
+}
+
+
+class PrecompiledFormRenderer(DjangoTemplates):
+    '''
+    Renders the built-in input and textarea widgets in Python, so a field render only fills in
+    its values and attributes. Every other template, including overridden widget templates
+    with other names, goes through the template engine as usual.
+    '''
+
+    def render(self, template_name, context, request=None):
+        compiled = COMPILED_WIDGET_TEMPLATES.get(template_name)
+        if compiled is not None:
+            return compiled(context['widget'])
+        return super().render(template_name, context, request=request)
@@ -0,0 +1,63 @@
+"""
+File: routing.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Cached routing table mapping the chapel and praise services to their Contact email addresses.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from .models import Contact, SERVICE_CHAPEL, SERVICE_PRAISE
+
+
+ROUTING_CACHE_KEY = 'submission:recipient-routing'
+
+
+def _build_routing_table():
+    """Load every chapel and praise contact in a single query."""
+    table = {SERVICE_CHAPEL: [], SERVICE_PRAISE: []}
+    contacts = (
+        Contact.objects.filter(Q(is_chapel=True) | Q(is_praise=True))
+        .order_by('pk')
+        .values_list('email', 'is_chapel', 'is_praise')
+    )
+    for email, is_chapel, is_praise in contacts:
+        if is_chapel:
+            table[SERVICE_CHAPEL].append(email)
+        if is_praise:
+            table[SERVICE_PRAISE].append(email)
+    return table
+
+
+def get_routing_table():
+    """Return the service to recipients table, loading it into the cache if needed."""
+    table = cache.get(ROUTING_CACHE_KEY)
+    if table is None:
+        table = _build_routing_table()
+        cache.set(ROUTING_CACHE_KEY, table, settings.RECIPIENT_ROUTING_CACHE_TIMEOUT)
+    return table
+
+
+def invalidate_routing_table():
+    """Drop the cached routing table so the next lookup reloads it."""
+    cache.delete(ROUTING_CACHE_KEY)
+
+
+def get_recipients(is_chapel, is_praise):
+    """
+    Return the de-duplicated recipients for the selected services.
+    Announcements that select neither service go to praise, matching Submission.is_praise's default.
+    """
+    services = [service for service, selected in ((SERVICE_CHAPEL, is_chapel), (SERVICE_PRAISE, is_praise)) if selected]
+    table = get_routing_table()
+
+    recipients = []
+    seen = set()
+    for service in services or [SERVICE_PRAISE]:
+        for email in table[service]:
+            if email.lower() not in seen:
+                seen.add(email.lower())
+                recipients.append(email)
+    return recipients
@@ -0,0 +1,51 @@
+"""
+File: signals.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Model signal handlers for the submission app, releasing unreferenced slide images and keeping the recipient routing table and announcement update times in step with the database.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .blobs import release_blob
+from .models import Contact, Submission, SubmissionSlide
+from .routing import invalidate_routing_table
+
+
+@receiver(pre_save, sender=SubmissionSlide)
+def release_replaced_image(sender, instance, **kwargs):
+    """Release the old image, and its thumbnail, when a slide's image is replaced."""
+    if not instance.pk:
+        return
+    old_name = SubmissionSlide.objects.filter(pk=instance.pk).values_list('image', flat=True).first()
+    if old_name and old_name != instance.image.name:
+        transaction.on_commit(lambda: release_blob(old_name))
+
+
+@receiver(post_delete, sender=SubmissionSlide)
+def release_deleted_image(sender, instance, **kwargs):
+    """Release a deleted slide's image, and any kept original, once no other slide shares them."""
+    image_name = instance.image.name
+    transaction.on_commit(lambda: release_blob(image_name))
+    if instance.original:
+        original_name = instance.original.name
+        transaction.on_commit(lambda: release_blob(original_name))
+
+
+@receiver(post_save, sender=Contact)
+@receiver(post_delete, sender=Contact)
+def invalidate_contact_routing(sender, **kwargs):
+    """Reload the recipient routing table after contacts change."""
+    invalidate_routing_table()
+    # Drop it again once committed, in case another request cached the old rows meanwhile
+    transaction.on_commit(invalidate_routing_table)
+
+
+@receiver(post_save, sender=SubmissionSlide)
+@receiver(post_delete, sender=SubmissionSlide)
+def touch_slide_submission(sender, instance, **kwargs):
+    """Mark the announcement updated when one of its slides changes, which moves its feed version on."""
+    Submission.objects.filter(pk=instance.submission_id).update(updated_at=timezone.now())
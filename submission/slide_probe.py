@@ -0,0 +1,124 @@
+"""
+File: slide_probe.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Header-only probing of uploaded slides. Reads the PNG IHDR chunk or the JPEG SOFn marker from the start of the upload to get the format and dimensions without building a PIL image. Pixel data is not read here: the slides normalization decodes report undecodable files as form errors, and thumbnails of damaged slides fall back to the full image.
+"""
+
+import struct
+from typing import NamedTuple
+from PIL import Image
+
+
+HEAD_BYTES = 4 * 1024
+PROBE_BYTES = 64 * 1024
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+JPEG_SOI = b'\xff\xd8'
+
+# SOF0-SOF15, minus DHT (0xC4), JPG (0xC8) and DAC (0xCC) which share the range.
+JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# Markers that are not followed by a length field: TEM, RST0-RST7, SOI.
+JPEG_STANDALONE_MARKERS = frozenset(range(0xD0, 0xD9)) | {0x01}
+
+
+class SlideInfo(NamedTuple):
+    '''
+    Format and pixel dimensions of a probed slide.
+    '''
+
+    format: str
+    width: int
+    height: int
+
+
+class SlideProbeError(ValueError):
+    """Raised when an upload is not a readable PNG or JPEG image."""
+
+
+def _probe_png(head):
+    """Read the dimensions from the IHDR chunk, which must directly follow the signature."""
+    if len(head) < 24 or head[12:16] != b'IHDR':
+        raise SlideProbeError("PNG is missing its IHDR chunk.")
+    width, height = struct.unpack('>II', head[16:24])
+    return SlideInfo('PNG', width, height)
+
+
+def _probe_jpeg(head):
+    """
+    Walk the JPEG marker segments in the header buffer until a SOFn marker is found.
+    Returns None when the frame header is not inside the buffer, e.g. behind a large EXIF block.
+    """
+    offset = 2
+    while offset + 4 <= len(head):
+        if head[offset] != 0xFF:
+            return None
+        marker = head[offset + 1]
+        if marker == 0xFF:
+            # Fill byte before the real marker
+            offset += 1
+            continue
+        if marker in JPEG_STANDALONE_MARKERS:
+            offset += 2
+            continue
+        if marker in (0xD9, 0xDA):
+            # EOI or start of scan before any frame header
+            return None
+        if marker in JPEG_SOF_MARKERS:
+            if offset + 9 > len(head):
+                return None
+            height, width = struct.unpack('>HH', head[offset + 5:offset + 9])
+            return SlideInfo('JPEG', width, height)
+        (length,) = struct.unpack('>H', head[offset + 2:offset + 4])
+        offset += 2 + length
+    return None
+
+
+def _probe_with_pillow(file):
+    """Fall back to Pillow's header parser for files the fast path cannot handle."""
+    try:
+        with Image.open(file) as img:
+            image_format = img.format
+            width, height = img.size
+    except Exception as exc:
+        raise SlideProbeError("Uploaded file is not a valid image.") from exc
+    finally:
+        file.seek(0)
+
+    if image_format not in ('PNG', 'JPEG'):
+        raise SlideProbeError(f"Unsupported image format: {image_format}.")
+    return SlideInfo(image_format, width, height)
+
+
+def probe_slide(file, probe_bytes=PROBE_BYTES):
+    """
+    Return a SlideInfo for an uploaded PNG or JPEG file.
+    Reads the first few KB, and at most probe_bytes for JPEGs with large metadata blocks;
+    the file position is reset afterwards.
+    Raises SlideProbeError if the file is not a PNG or JPEG image.
+    """
+    file.seek(0)
+    try:
+        head = file.read(HEAD_BYTES)
+        if head.startswith(PNG_SIGNATURE):
+            info = _probe_png(head)
+        elif head.startswith(JPEG_SOI):
+            info = _probe_jpeg(head)
+            if info is None and len(head) == HEAD_BYTES and probe_bytes > HEAD_BYTES:
+                head += file.read(probe_bytes - HEAD_BYTES)
+                info = _probe_jpeg(head)
+        else:
+            raise SlideProbeError("Uploaded file is not a PNG or JPEG image.")
+    finally:
+        file.seek(0)
+
+    if info is None:
+        info = _probe_with_pillow(file)
+
+    if info.width <= 0 or info.height <= 0:
+        raise SlideProbeError("Image has invalid dimensions.")
+    # The same decompression bomb limit Image.open applies
+    if Image.MAX_IMAGE_PIXELS and info.width * info.height > 2 * Image.MAX_IMAGE_PIXELS:
+        raise SlideProbeError("Image has too many pixels.")
+    return info
+
@@ -0,0 +1,38 @@
+"""
+File: stage_timing.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Lightweight per-request stage timing. Views mark their stages with stage(); whoever wants the numbers (the loadtest command, the profiling middleware) wraps the request in collect_stage_timings(). Outside a collection stage() does nothing.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+_timings = ContextVar('stage_timings', default=None)
+
+
+@contextmanager
+def collect_stage_timings():
+    """Collect the stages timed inside the block into the yielded dict of stage name to seconds."""
+    timings = {}
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+
+
+@contextmanager
+def stage(name):
+    """Time the block as the named stage of the current collection; repeated stages add up."""
+    timings = _timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - started
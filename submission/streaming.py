@@ -0,0 +1,41 @@
+"""
+File: streaming.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Helpers for streaming responses that work under both WSGI and ASGI. Under ASGI, Django collects a synchronous iterator into a list before sending any of it, so generators that read files or the database are advanced one chunk at a time in a worker thread instead.
+"""
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+
+
+_EXHAUSTED = object()
+
+
+async def iterate_in_thread(iterator, thread_sensitive=True):
+    """
+    Yield from a synchronous iterator, advancing it one item at a time in a worker thread.
+    By default that is Django's thread for sync code, the one the view's database work ran in, so
+    generators may keep using the database; iterators that only read files can run on any thread.
+    """
+    iterator = iter(iterator)
+    step = sync_to_async(next, thread_sensitive=thread_sensitive)
+    try:
+        while (chunk := await step(iterator, _EXHAUSTED)) is not _EXHAUSTED:
+            yield chunk
+    finally:
+        # Run the generator's cleanup, such as closing the file it reads, when the client goes away
+        if hasattr(iterator, 'close'):
+            await sync_to_async(iterator.close, thread_sensitive=thread_sensitive)()
+
+
+def is_asgi_request(request):
+    """Return True if the request is being served over ASGI."""
+    return isinstance(request, ASGIRequest)
+
+
+def streaming_content(request, iterator, thread_sensitive=True):
+    """Return the iterator to give a StreamingHttpResponse so that it streams under the request's server."""
+    if is_asgi_request(request):
+        return iterate_in_thread(iterator, thread_sensitive)
+    return iterator
@@ -5,16 +5,74 @@ Date: 2025-07-16
 Description: Tests for submitting announcements.
 """
 
+import hashlib
 import io
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+import gzip
+import json
+import pstats
+import tracemalloc
 from datetime import datetime, timedelta
-from django.test import TestCase, Client
-from django.urls import reverse
+from unittest import mock, skipUnless
+from asgiref.sync import sync_to_async
+from django.test import TestCase, Client, override_settings
+from django.conf import settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection, connections, transaction
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management import call_command
+from django.contrib.auth.models import User
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.utils import timezone
+from django.core.cache import cache
+from django.urls import reverse, path, include
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core import mail
 from django.core.exceptions import ValidationError
+from django import forms
+from django.forms.renderers import DjangoTemplates
 from PIL import Image
-from .models import Submission, SubmissionSlide
+from conf.staticfiles import brotli
+from .models import ArchivedSubmission, Submission, SubmissionSlide, Contact, OutboxEmail, ChunkedUpload
 from .forms import SubmissionForm
+from .slide_probe import PROBE_BYTES, probe_slide, SlideProbeError
+from .downloads import slide_download_token
+from .thumbnails import thumbnail_name, thumbnail_url
+from .routing import get_recipients
+from .renderers import PrecompiledFormRenderer
+from .normalization import normalize_image, normalize_slides
+from .blobs import find_orphaned_blobs, release_blob
+from .deck_export import DECK_CHUNK_SIZE, service_deck, stream_deck
+from .stage_timing import collect_stage_timings, stage
+from .management.commands.loadtest import make_slide, make_unique, percentile
+from . import views
+
+
+class TempMediaRootMixin:
+    """Runs each test against its own temporary MEDIA_ROOT, removed afterwards."""
+
+    def setUp(self):
+        super().setUp()
+        self.media_root = self.make_temp_dir()
+        self.enterContext(self.settings(MEDIA_ROOT=self.media_root))
+
+    def make_temp_dir(self):
+        """Helper method to create a temporary directory that is removed after the test."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        return directory
+
+
+def create_test_image(name='test_image.png', width=1920, height=1080, color='red'):
+    """Helper function to create a solid-colour PNG slide upload; 16:9 unless sized otherwise."""
+    image_io = io.BytesIO()
+    Image.new('RGB', (width, height), color=color).save(image_io, format='PNG')
+    return SimpleUploadedFile(name=name, content=image_io.getvalue(), content_type='image/png')
 
 
 class SubmissionModelTest(TestCase):
@@ -395,3 +453,2079 @@ class SubmissionViewTest(TestCase):
         )
 
 
+class SlideProbeTest(TestCase):
+    """Test cases for header-only slide probing."""
+
+    def test_probe_png(self):
+        """Test that PNG dimensions are read from the IHDR chunk."""
+        info = probe_slide(self._image_file(1920, 1080, 'PNG'))
+        self.assertEqual(info, ('PNG', 1920, 1080))
+
+    def test_probe_jpeg(self):
+        """Test that baseline and progressive JPEG dimensions are read from the SOFn marker."""
+        self.assertEqual(probe_slide(self._image_file(1600, 900, 'JPEG')), ('JPEG', 1600, 900))
+        progressive = self._image_file(1280, 720, 'JPEG', progressive=True)
+        self.assertEqual(probe_slide(progressive), ('JPEG', 1280, 720))
+
+    def test_probe_jpeg_with_large_exif_falls_back_to_pillow(self):
+        """Test that a JPEG whose frame header is past the probe window is still measured."""
+        exif = Image.Exif()
+        exif[0x010E] = 'x' * 8192
+        image_file = self._image_file(1920, 1080, 'JPEG', exif=exif)
+        self.assertEqual(probe_slide(image_file, probe_bytes=4096), ('JPEG', 1920, 1080))
+
+    def test_probe_rejects_other_formats(self):
+        """Test that GIFs and plain bytes are rejected."""
+        with self.assertRaises(SlideProbeError):
+            probe_slide(self._image_file(1920, 1080, 'GIF'))
+        with self.assertRaises(SlideProbeError):
+            probe_slide(io.BytesIO(b'This is not a valid image file'))
+
+    def test_probe_rejects_truncated_png(self):
+        """Test that a PNG signature without an IHDR chunk is rejected."""
+        with self.assertRaises(SlideProbeError):
+            probe_slide(io.BytesIO(b'\x89PNG\r\n\x1a\n'))
+
+    def test_probe_applies_pixel_limit(self):
+        """Test that a header declaring more pixels than Pillow's decompression bomb limit is rejected."""
+        image_file = self._image_file(160, 90, 'PNG')
+        with mock.patch.object(Image, 'MAX_IMAGE_PIXELS', 5000):
+            with self.assertRaises(SlideProbeError):
+                probe_slide(image_file)
+
+    def test_check_reads_only_the_header(self):
+        """Test that checking a slide reads its header and not the whole file."""
+        data = self._image_file(1920, 1080, 'PNG').getvalue() + b'\0' * (1024 * 1024)
+        upload = SimpleUploadedFile('large.png', data, content_type='image/png')
+        reads = []
+        original_read = upload.file.read
+        with mock.patch.object(upload.file, 'read', side_effect=lambda *args: reads.append(args) or original_read(*args)):
+            self.assertIsNone(views._check_slide(upload, False))
+
+        self.assertTrue(reads)
+        self.assertTrue(all(args and args[0] <= PROBE_BYTES for args in reads))
+
+    def test_probe_resets_file_position(self):
+        """Test that the file can be read from the start after probing."""
+        image_file = self._image_file(1920, 1080, 'PNG')
+        probe_slide(image_file)
+        self.assertEqual(image_file.tell(), 0)
+
+    def _image_file(self, width, height, image_format, **options):
+        """Helper method to create an in-memory image file."""
+        image_io = io.BytesIO()
+        Image.new('RGB', (width, height), color='red').save(image_io, format=image_format, **options)
+        image_io.seek(0)
+        return image_io
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class OutboxTest(TempMediaRootMixin, TestCase):
+    """Test cases for queued notification emails and the send_outbox worker."""
+
+    def setUp(self):
+        """Set up a temporary media root, a contact and form data."""
+        super().setUp()
+        cache.clear()
+
+        Contact.objects.create(name='Praise Team', email='praise@example.com', is_praise=True)
+        self.url = reverse('submit_announcement')
+        self.valid_data = {
+            'title': 'Test Announcement',
+            'email': 'test@example.com',
+            'description': 'This is a test announcement',
+            'start_date': '2025-07-16',
+            'end_date': '2025-07-23',
+            'is_praise': True,
+        }
+
+    def test_submission_queues_email_without_sending(self):
+        """Test that a submission writes an outbox row instead of sending inline."""
+        data = self.valid_data.copy()
+        data['slides'] = [create_test_image('test.png')]
+
+        response = self.client.post(self.url, data=data)
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(len(mail.outbox), 0)
+        outbox_email = OutboxEmail.objects.get()
+        self.assertEqual(outbox_email.status, OutboxEmail.STATUS_PENDING)
+        self.assertEqual(outbox_email.recipients, ['praise@example.com'])
+        self.assertEqual(outbox_email.submission.title, 'Test Announcement')
+
+    def test_rejected_submission_queues_nothing(self):
+        """Test that a submission with an invalid slide leaves no outbox row."""
+        data = self.valid_data.copy()
+        data['slides'] = [create_test_image('test.png', 1200, 900)]
+
+        response = self.client.post(self.url, data=data)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(OutboxEmail.objects.exists())
+
+    def test_worker_sends_queued_email(self):
+        """Test that send_outbox delivers queued emails with their stored slides attached."""
+        data = self.valid_data.copy()
+        data['slides'] = [create_test_image('test.png')]
+        self.client.post(self.url, data=data)
+
+        call_command('send_outbox', '--once', stdout=io.StringIO())
+
+        self.assertEqual(len(mail.outbox), 1)
+        email = mail.outbox[0]
+        self.assertEqual(email.subject, 'New Announcement')
+        self.assertEqual(email.to, ['praise@example.com'])
+        self.assertIn('Test Announcement', email.body)
+        self.assertEqual(len(email.attachments), 1)
+        outbox_email = OutboxEmail.objects.get()
+        self.assertEqual(outbox_email.status, OutboxEmail.STATUS_SENT)
+        self.assertIsNotNone(outbox_email.sent_at)
+
+    def test_worker_logs_send_time(self):
+        """Test that the worker reports how long each batch took to send."""
+        self.client.post(self.url, data=self.valid_data)
+
+        with self.assertLogs('submission.notifications', level='INFO') as logs:
+            call_command('send_outbox', '--once', stdout=io.StringIO())
+
+        self.assertRegex(logs.output[0], r'Sent outbox batch of 1 in [\d.]+ ms')
+
+    def test_worker_retries_with_backoff(self):
+        """Test that a failed send is rescheduled and eventually marked failed."""
+        self.client.post(self.url, data=self.valid_data)
+
+        with mock.patch('django.core.mail.EmailMessage.send', side_effect=ConnectionError('provider down')), \
+                self.assertLogs('submission.notifications', 'WARNING'):
+            call_command('send_outbox', '--once', '--max-attempts', '2', stdout=io.StringIO())
+            outbox_email = OutboxEmail.objects.get()
+            self.assertEqual(outbox_email.status, OutboxEmail.STATUS_PENDING)
+            self.assertEqual(outbox_email.attempts, 1)
+            self.assertIn('provider down', outbox_email.last_error)
+            self.assertGreater(outbox_email.next_attempt_at, outbox_email.created_at)
+
+            OutboxEmail.objects.update(next_attempt_at=outbox_email.created_at)
+            call_command('send_outbox', '--once', '--max-attempts', '2', stdout=io.StringIO())
+
+        outbox_email.refresh_from_db()
+        self.assertEqual(outbox_email.status, OutboxEmail.STATUS_FAILED)
+        self.assertEqual(outbox_email.attempts, 2)
+        self.assertEqual(len(mail.outbox), 0)
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend', SITE_URL='https://announcements.example.com')
+class AttachmentBudgetTest(TempMediaRootMixin, TestCase):
+    """Test cases for the email attachment budget and signed slide links."""
+
+    def setUp(self):
+        """Set up a temporary media root and a submission with two stored slides."""
+        super().setUp()
+
+        self.submission = Submission.objects.create(
+            title='Test Announcement',
+            start_date=timezone.now(),
+            end_date=timezone.now() + timedelta(days=7),
+        )
+        self.slides = [
+            SubmissionSlide.objects.create(submission=self.submission, image=create_test_image(name))
+            for name in ('first.png', 'second.png')
+        ]
+        OutboxEmail.objects.create(
+            submission=self.submission,
+            subject='New Announcement',
+            body='A new announcement has been submitted.',
+            from_email='from@example.com',
+            recipients=['praise@example.com'],
+        )
+
+    def test_slides_attached_under_budget(self):
+        """Test that slides are attached when they fit in the budget."""
+        call_command('send_outbox', '--once', stdout=io.StringIO())
+
+        email = mail.outbox[0]
+        self.assertEqual([attachment[0] for attachment in email.attachments], ['first.png', 'second.png'])
+        self.assertNotIn('/slides/', email.body)
+
+    @override_settings(EMAIL_ATTACHMENT_BUDGET_BYTES=1)
+    def test_links_sent_over_budget(self):
+        """Test that slides over the budget are sent as signed download links."""
+        call_command('send_outbox', '--once', stdout=io.StringIO())
+
+        email = mail.outbox[0]
+        self.assertEqual(email.attachments, [])
+        self.assertIn('https://announcements.example.com/slides/', email.body)
+        self.assertIn('first.png', email.body)
+        self.assertIn('second.png', email.body)
+
+    def test_signed_link_downloads_slide(self):
+        """Test that a signed link serves the stored slide."""
+        slide = self.slides[0]
+        response = self.client.get(reverse('download_slide', args=[slide_download_token(slide)]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('attachment; filename="first.png"', response['Content-Disposition'])
+        with slide.image.open('rb') as image_file:
+            self.assertEqual(b''.join(response.streaming_content), image_file.read())
+
+    def test_tampered_or_expired_link_rejected(self):
+        """Test that tampered and expired links return 404."""
+        token = slide_download_token(self.slides[0])
+        response = self.client.get(reverse('download_slide', args=[token + 'x']))
+        self.assertEqual(response.status_code, 404)
+
+        with override_settings(SLIDE_LINK_MAX_AGE=-1):
+            response = self.client.get(reverse('download_slide', args=[token]))
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class SlideProcessingTest(TempMediaRootMixin, TestCase):
+    """Test cases for concurrent slide validation and storage."""
+
+    def setUp(self):
+        """Set up a temporary media root and form data."""
+        super().setUp()
+
+        self.url = reverse('submit_announcement')
+        self.valid_data = {
+            'title': 'Test Announcement',
+            'start_date': '2025-07-16',
+            'end_date': '2025-07-23',
+            'is_praise': True,
+        }
+
+    def test_multiple_slides_stored(self):
+        """Test that every valid slide is stored with its file."""
+        data = self.valid_data.copy()
+        data['slides'] = [create_test_image(f'slide{index}.png') for index in range(6)]
+
+        response = self.client.post(self.url, data=data)
+
+        self.assertEqual(response.status_code, 302)
+        slides = Submission.objects.get().slides.all()
+        self.assertEqual(len(slides), 6)
+        for slide in slides:
+            self.assertTrue(slide.image.storage.exists(slide.image.name))
+
+    def test_errors_reported_in_upload_order(self):
+        """Test that validation errors keep the order the slides were uploaded in."""
+        data = self.valid_data.copy()
+        data['slides'] = [
+            SimpleUploadedFile('notes.txt', b'not an image', content_type='text/plain'),
+            create_test_image('good.png'),
+            create_test_image('square.png', 1200, 900),
+            SimpleUploadedFile('broken.png', b'not an image', content_type='image/png'),
+        ]
+
+        response = self.client.post(self.url, data=data)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['form'].non_field_errors(), [
+            'notes.txt: Slide must be a PNG or JPG image.',
+            'square.png: Slide must have a 16:9 aspect ratio.',
+            'broken.png: Uploaded file is not a valid image.',
+        ])
+        self.assertFalse(Submission.objects.exists())
+        self.assertFalse(SubmissionSlide.objects.exists())
+
+
+class ThumbnailTest(TempMediaRootMixin, TestCase):
+    """Test cases for cached slide thumbnails and the admin previews that use them."""
+
+    def setUp(self):
+        """Set up a temporary media root and a submission with one slide."""
+        super().setUp()
+
+        self.submission = Submission.objects.create(
+            title='Test Announcement',
+            start_date=timezone.now(),
+            end_date=timezone.now() + timedelta(days=7),
+        )
+        self.slide = SubmissionSlide.objects.create(
+            submission=self.submission,
+            image=create_test_image('slide.png'),
+        )
+
+    def test_thumbnail_generated_once(self):
+        """Test that the thumbnail is generated on first use, downscaled, and then reused."""
+        url = thumbnail_url(self.slide.image)
+        name = thumbnail_name(self.slide.image.name)
+
+        self.assertTrue(url.endswith(name))
+        storage = self.slide.image.storage
+        with storage.open(name) as thumbnail_file, Image.open(thumbnail_file) as img:
+            self.assertLessEqual(img.width, 320)
+            self.assertLessEqual(img.height, 180)
+
+        with mock.patch('submission.thumbnails.generate_thumbnail') as generate:
+            self.assertEqual(thumbnail_url(self.slide.image), url)
+        generate.assert_not_called()
+
+    def test_thumbnail_invalidated_when_image_replaced(self):
+        """Test that replacing a slide's image removes the old thumbnail."""
+        old_name = thumbnail_name(self.slide.image.name)
+        thumbnail_url(self.slide.image)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.slide.image = create_test_image('replacement.png', color='blue')
+            self.slide.save()
+
+        storage = self.slide.image.storage
+        self.assertFalse(storage.exists(old_name))
+        self.assertNotEqual(thumbnail_name(self.slide.image.name), old_name)
+
+    def test_thumbnail_removed_with_slide(self):
+        """Test that deleting a slide removes its thumbnail."""
+        name = thumbnail_name(self.slide.image.name)
+        thumbnail_url(self.slide.image)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.slide.delete()
+
+        self.assertFalse(self.slide.image.storage.exists(name))
+
+    def test_admin_changelist_uses_thumbnails(self):
+        """Test that the admin changelist previews link to thumbnails, not full-size slides."""
+        admin_user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(admin_user)
+
+        response = self.client.get(reverse('admin:submission_submission_changelist'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, f'<img src="/media/{thumbnail_name(self.slide.image.name)}"')
+        self.assertNotContains(response, f'<img src="{self.slide.image.url}"')
+
+
+class SubmissionAdminChangelistTest(TempMediaRootMixin, TestCase):
+    """Test cases for the Submission admin changelist queries and status filter."""
+
+    def setUp(self):
+        """Set up a temporary media root and a logged-in superuser."""
+        super().setUp()
+
+        admin_user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(admin_user)
+        self.url = reverse('admin:submission_submission_changelist')
+
+    def test_changelist_query_count_independent_of_page_size(self):
+        """Test that the changelist query count does not grow with the number of rows."""
+        self._create_submissions(2)
+        with CaptureQueriesContext(connection) as small_page:
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+
+        self._create_submissions(8)
+        with self.assertNumQueries(len(small_page)):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.context['cl'].result_list), 10)
+
+    def test_status_filter(self):
+        """Test that the status filter separates active, upcoming and expired announcements."""
+        now = timezone.now()
+        self._create_submission('Active', now - timedelta(days=1), now + timedelta(days=1))
+        self._create_submission('Upcoming', now + timedelta(days=3), now + timedelta(days=5))
+        self._create_submission('Expired', now - timedelta(days=5), now - timedelta(days=3))
+
+        for status, title in (('active', 'Active'), ('upcoming', 'Upcoming'), ('expired', 'Expired')):
+            response = self.client.get(self.url, {'status': status})
+            self.assertEqual([obj.title for obj in response.context['cl'].result_list], [title])
+
+    def test_sort_by_active(self):
+        """Test that the changelist can be ordered by the annotated active flag."""
+        now = timezone.now()
+        self._create_submission('Active', now - timedelta(days=1), now + timedelta(days=1))
+        self._create_submission('Expired', now - timedelta(days=5), now - timedelta(days=3))
+
+        response = self.client.get(self.url, {'o': '6'})
+        results = response.context['cl'].result_list
+        self.assertEqual([obj.title for obj in results], ['Expired', 'Active'])
+        self.assertEqual([obj.is_active_now for obj in results], [False, True])
+
+    def _create_submissions(self, count):
+        """Helper method to create active submissions with two slides each."""
+        now = timezone.now()
+        for index in range(count):
+            submission = self._create_submission(f'Announcement {index}', now, now + timedelta(days=7))
+            for _ in range(2):
+                SubmissionSlide.objects.create(submission=submission, image=create_test_image('slide.png', 160, 90))
+
+    def _create_submission(self, title, start_date, end_date):
+        """Helper method to create a submission."""
+        return Submission.objects.create(title=title, start_date=start_date, end_date=end_date)
+
+
+class SubmissionQuerySetTest(TestCase):
+    """Test cases for the active/upcoming/service announcement queries."""
+
+    def setUp(self):
+        """Set up announcements around a fixed day."""
+        self.day = timezone.localdate()
+        now = timezone.now()
+        self.active_praise = self._create_submission('Active praise', now - timedelta(days=2), now + timedelta(days=2), praise=True)
+        self.active_chapel = self._create_submission('Active chapel', now, now, chapel=True, praise=False)
+        self.next_week = self._create_submission('Next week', now + timedelta(days=5), now + timedelta(days=8), praise=True)
+        self.next_month = self._create_submission('Next month', now + timedelta(days=30), now + timedelta(days=32), praise=True)
+        self.expired = self._create_submission('Expired', now - timedelta(days=9), now - timedelta(days=3), praise=True)
+
+    def test_active_on(self):
+        """Test that active_on returns announcements running on the given date."""
+        self.assertCountEqual(Submission.objects.active_on(self.day), [self.active_praise, self.active_chapel])
+        self.assertCountEqual(
+            Submission.objects.active_on(self.day + timedelta(days=6)), [self.next_week]
+        )
+
+    def test_upcoming(self):
+        """Test that upcoming is limited to announcements starting within the window."""
+        self.assertCountEqual(Submission.objects.upcoming(timedelta(days=7)), [self.next_week])
+        self.assertCountEqual(Submission.objects.upcoming(), [self.next_week, self.next_month])
+
+    def test_for_service(self):
+        """Test that for_service filters on the chapel and praise flags."""
+        self.assertEqual(list(Submission.objects.active_on(self.day).for_service('chapel')), [self.active_chapel])
+        self.assertEqual(list(Submission.objects.active_on(self.day).for_service('praise')), [self.active_praise])
+        with self.assertRaises(ValueError):
+            Submission.objects.for_service('vespers')
+
+    def test_queries_use_indexes(self):
+        """Test that the date and service queries search an end_date index rather than scan the table."""
+        querysets = [
+            (Submission.objects.active_on(self.day), 'submission__end_dat_7d240a_idx (end_date>?)'),
+            (Submission.objects.active_on(self.day).for_service('chapel'), 'submission_chapel_end_idx (end_date>?)'),
+            (Submission.objects.upcoming(timedelta(days=7)).for_service('praise'), 'submission_praise_end_idx (end_date>?)'),
+            (Submission.objects.expired(self.day), 'submission__end_dat_7d240a_idx (end_date<?)'),
+        ]
+        for queryset, search in querysets:
+            plan = queryset.explain()
+            self.assertIn(f'SEARCH submission_submission USING INDEX {search}', plan)
+            self.assertNotIn('SCAN submission_submission', plan)
+
+    def _create_submission(self, title, start_date, end_date, chapel=False, praise=False):
+        """Helper method to create a submission."""
+        return Submission.objects.create(
+            title=title, start_date=start_date, end_date=end_date, is_chapel=chapel, is_praise=praise
+        )
+
+
+class RecipientRoutingTest(TestCase):
+    """Test cases for the cached chapel/praise recipient routing table."""
+
+    def setUp(self):
+        """Set up chapel and praise contacts with an empty cache."""
+        cache.clear()
+        Contact.objects.create(name='Chaplain', email='chapel@example.com', is_chapel=True)
+        Contact.objects.create(name='Worship Leader', email='praise@example.com', is_praise=True)
+        Contact.objects.create(name='Tech Volunteer', email='tech@example.com', is_chapel=True, is_praise=True)
+        Contact.objects.create(name='Alumni Office', email='alumni@example.com')
+
+    def test_routes_by_service(self):
+        """Test that chapel and praise announcements go to their own contacts."""
+        self.assertEqual(get_recipients(True, False), ['chapel@example.com', 'tech@example.com'])
+        self.assertEqual(get_recipients(False, True), ['praise@example.com', 'tech@example.com'])
+
+    def test_both_services_deduplicated(self):
+        """Test that a contact on both services only receives one copy."""
+        self.assertEqual(
+            get_recipients(True, True),
+            ['chapel@example.com', 'tech@example.com', 'praise@example.com'],
+        )
+
+    def test_no_service_defaults_to_praise(self):
+        """Test that an announcement with no service selected goes to praise."""
+        self.assertEqual(get_recipients(False, False), ['praise@example.com', 'tech@example.com'])
+
+    def test_cached_after_first_lookup(self):
+        """Test that the table is loaded with one query and then served from the cache."""
+        with self.assertNumQueries(1):
+            get_recipients(True, True)
+        with self.assertNumQueries(0):
+            get_recipients(True, False)
+            get_recipients(False, True)
+
+    def test_invalidated_when_contacts_change(self):
+        """Test that saving or deleting a contact refreshes the routing table."""
+        get_recipients(True, False)
+
+        contact = Contact.objects.create(name='New Chaplain', email='new@example.com', is_chapel=True)
+        self.assertIn('new@example.com', get_recipients(True, False))
+
+        contact.delete()
+        self.assertNotIn('new@example.com', get_recipients(True, False))
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class ContentAddressedSlideTest(TempMediaRootMixin, TestCase):
+    """Test cases for content-addressed slide storage and shared-file reference counting."""
+
+    def setUp(self):
+        """Set up a temporary media root, form data and one slide image."""
+        super().setUp()
+
+        self.url = reverse('submit_announcement')
+        self.valid_data = {
+            'title': 'Test Announcement',
+            'start_date': '2025-07-16',
+            'end_date': '2025-07-23',
+            'is_praise': True,
+        }
+        image_io = io.BytesIO()
+        Image.new('RGB', (1920, 1080), color='red').save(image_io, format='PNG')
+        self.content = image_io.getvalue()
+        self.digest = hashlib.sha256(self.content).hexdigest()
+
+    def test_slide_stored_under_content_digest(self):
+        """Test that an uploaded slide is stored under the SHA-256 of its contents."""
+        self._submit('Chapel Choir', 'choir.png')
+
+        slide = SubmissionSlide.objects.get()
+        self.assertEqual(slide.image.name, f'announcements/{self.digest[:2]}/{self.digest}.png')
+        self.assertEqual(slide.original_name, 'choir.png')
+        self.assertTrue(os.path.exists(slide.image.path))
+
+    def test_upload_hashed_once_by_its_handler(self):
+        """Test that in-memory and temporary-file uploads are each hashed once, as they stream in."""
+        for max_memory_size in (settings.FILE_UPLOAD_MAX_MEMORY_SIZE, 1024):
+            hashed = []
+
+            def counting_sha256():
+                digest = hashlib.sha256()
+                return mock.Mock(
+                    update=lambda data: (hashed.append(len(data)), digest.update(data))[1],
+                    hexdigest=digest.hexdigest,
+                )
+
+            with (
+                self.subTest(max_memory_size=max_memory_size),
+                self.settings(FILE_UPLOAD_MAX_MEMORY_SIZE=max_memory_size),
+                mock.patch('submission.uploadhandlers.hashlib', mock.Mock(sha256=counting_sha256)),
+                mock.patch('submission.blobs.hashlib') as reread,
+            ):
+                self._submit(f'Upload {max_memory_size}', 'slide.png')
+                self.assertEqual(sum(hashed), len(self.content))
+                reread.sha256.assert_not_called()
+
+    def test_repeat_upload_shares_file_and_skips_validation(self):
+        """Test that resubmitting identical slides stores one file and skips the image probe."""
+        self._submit('First', 'slide.png')
+        with mock.patch('submission.views.probe_slide') as probe:
+            self._submit('Second', 'slide-copy.png', 'slide-again.png')
+        probe.assert_not_called()
+
+        names = set(SubmissionSlide.objects.values_list('image', flat=True))
+        self.assertEqual(SubmissionSlide.objects.count(), 3)
+        self.assertEqual(len(names), 1)
+        self.assertEqual(os.listdir(os.path.join(self.media_root, 'announcements', self.digest[:2])), [f'{self.digest}.png'])
+
+    def test_model_save_shares_existing_file(self):
+        """Test that saving a slide outside the form, e.g. in the admin, reuses an existing file."""
+        self._submit('First', 'slide.png')
+        submission = Submission.objects.get()
+
+        slide = SubmissionSlide.objects.create(
+            submission=submission,
+            image=SimpleUploadedFile('admin-upload.png', self.content, content_type='image/png'),
+        )
+
+        self.assertEqual(slide.image.name, SubmissionSlide.objects.first().image.name)
+        self.assertEqual(slide.original_name, 'admin-upload.png')
+
+    def test_shared_file_removed_with_last_reference(self):
+        """Test that a shared file is only deleted once no slide references it."""
+        self._submit('First', 'slide.png')
+        self._submit('Second', 'slide.png')
+        path = SubmissionSlide.objects.first().image.path
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Submission.objects.get(title='First').delete()
+        self.assertTrue(os.path.exists(path))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Submission.objects.get(title='Second').delete()
+        self.assertFalse(os.path.exists(path))
+
+    def test_unreferenced_stored_file_shared(self):
+        """Test that a file on disk no slide references is reused rather than stored under a second name."""
+        path = os.path.join(self.media_root, 'announcements', self.digest[:2], f'{self.digest}.png')
+        os.makedirs(os.path.dirname(path))
+        with open(path, 'wb') as orphan:
+            orphan.write(self.content)
+
+        self._submit('First', 'slide.png')
+
+        self.assertEqual(SubmissionSlide.objects.get().image.path, path)
+        self.assertEqual(os.listdir(os.path.dirname(path)), [f'{self.digest}.png'])
+
+    def test_partial_stored_file_replaced(self):
+        """Test that a truncated file left under a slide's name is replaced by the full upload."""
+        path = os.path.join(self.media_root, 'announcements', self.digest[:2], f'{self.digest}.png')
+        os.makedirs(os.path.dirname(path))
+        with open(path, 'wb') as partial:
+            partial.write(self.content[:100])
+
+        self._submit('First', 'slide.png')
+
+        self.assertEqual(SubmissionSlide.objects.get().image.path, path)
+        with open(path, 'rb') as stored:
+            self.assertEqual(stored.read(), self.content)
+
+    def _submit(self, title, *names):
+        """Helper method to post a submission with copies of the test slide."""
+        data = self.valid_data.copy()
+        data['title'] = title
+        data['slides'] = [SimpleUploadedFile(name, self.content, content_type='image/png') for name in names]
+        response = self.client.post(self.url, data=data)
+        self.assertEqual(response.status_code, 302)
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend', CHUNKED_UPLOAD_CHUNK_SIZE=4096)
+class ChunkedUploadTest(TempMediaRootMixin, TestCase):
+    """Test cases for the chunked, resumable slide upload API."""
+
+    def setUp(self):
+        """Set up temporary media and staging directories and one slide image."""
+        super().setUp()
+        self.staging_dir = self.make_temp_dir()
+        self.enterContext(self.settings(CHUNKED_UPLOAD_DIR=self.staging_dir))
+
+        image_io = io.BytesIO()
+        Image.frombytes('RGB', (320, 180), os.urandom(320 * 180 * 3)).save(image_io, format='PNG')
+        self.content = image_io.getvalue()
+        self.chunks = [self.content[offset:offset + 4096] for offset in range(0, len(self.content), 4096)]
+        self.assertGreater(len(self.chunks), 2)
+
+    def test_upload_and_submit_by_token(self):
+        """Test that a chunked upload can be referenced by token from the submission form."""
+        token = self._start(sha256=hashlib.sha256(self.content).hexdigest())
+        for index, chunk in enumerate(self.chunks):
+            response = self._put_chunk(token, index, chunk)
+            self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['complete'])
+
+        data = {
+            'title': 'Chunked Announcement',
+            'start_date': '2025-07-16',
+            'end_date': '2025-07-23',
+            'is_praise': True,
+            'upload_tokens': [token],
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('submit_announcement'), data=data)
+
+        self.assertEqual(response.status_code, 302)
+        slide = SubmissionSlide.objects.get()
+        self.assertEqual(slide.original_name, 'slide.png')
+        with slide.image.open('rb') as image_file:
+            self.assertEqual(image_file.read(), self.content)
+        self.assertFalse(ChunkedUpload.objects.exists())
+        self.assertEqual(os.listdir(self.staging_dir), [])
+
+    def test_resume_after_interruption(self):
+        """Test that the status endpoint reports where to resume and resent chunks are ignored."""
+        token = self._start()
+        self._put_chunk(token, 0, self.chunks[0])
+        self._put_chunk(token, 1, self.chunks[1])
+
+        state = self.client.get(reverse('upload_status', args=[token])).json()
+        self.assertEqual(state['next_chunk'], 2)
+        self.assertEqual(state['received'], 8192)
+
+        self.assertEqual(self._put_chunk(token, 1, self.chunks[1]).json()['received'], 8192)
+        skipped = self._put_chunk(token, 3, self.chunks[3])
+        self.assertEqual(skipped.status_code, 409)
+        self.assertEqual(skipped.json()['next_chunk'], 2)
+
+    def test_chunk_checksum_verified(self):
+        """Test that a chunk whose checksum does not match is rejected."""
+        token = self._start()
+        response = self._put_chunk(token, 0, self.chunks[0], checksum=hashlib.sha256(b'other').hexdigest())
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['received'], 0)
+
+    def test_file_checksum_mismatch_restarts_upload(self):
+        """Test that a completed file that does not match its declared digest is restarted."""
+        token = self._start(sha256=hashlib.sha256(b'something else').hexdigest())
+        for index, chunk in enumerate(self.chunks):
+            response = self._put_chunk(token, index, chunk)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['received'], 0)
+        self.assertFalse(response.json()['complete'])
+
+    def test_incomplete_upload_rejected_by_form(self):
+        """Test that the form rejects tokens for uploads that have not finished."""
+        token = self._start()
+        self._put_chunk(token, 0, self.chunks[0])
+        data = {
+            'title': 'Chunked Announcement',
+            'start_date': '2025-07-16',
+            'end_date': '2025-07-23',
+            'is_praise': True,
+            'upload_tokens': [token, 'not-a-token'],
+        }
+
+        response = self.client.post(reverse('submit_announcement'), data=data)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['form'].non_field_errors()), 2)
+        self.assertFalse(Submission.objects.exists())
+
+    def test_token_without_staging_file_rejected_by_form(self):
+        """Test that a completed upload whose staging file is gone is a form error, not a server error."""
+        token = self._start()
+        for index, chunk in enumerate(self.chunks):
+            self._put_chunk(token, index, chunk)
+        os.remove(os.path.join(self.staging_dir, f'{token}.part'))
+        data = {
+            'title': 'Chunked Announcement',
+            'start_date': '2025-07-16',
+            'end_date': '2025-07-23',
+            'is_praise': True,
+            'upload_tokens': [token],
+        }
+
+        response = self.client.post(reverse('submit_announcement'), data=data)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['form'].non_field_errors()), 1)
+        self.assertFalse(Submission.objects.exists())
+
+    def test_rejects_non_image_file_names(self):
+        """Test that uploads must be named as PNG or JPG images."""
+        response = self.client.post(reverse('create_upload'), {'filename': 'notes.txt', 'size': 10})
+        self.assertEqual(response.status_code, 400)
+
+    def test_staged_bytes_capped(self):
+        """Test that new uploads are refused while unexpired uploads claim the staging space."""
+        with override_settings(CHUNKED_UPLOAD_MAX_STAGED_BYTES=len(self.content) * 2):
+            self._start()
+            self._start()
+            response = self.client.post(reverse('create_upload'), {'filename': 'slide.png', 'size': len(self.content)})
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(ChunkedUpload.objects.count(), 2)
+
+    def test_expired_upload_not_resumed_or_submitted(self):
+        """Test that an expired upload accepts no more chunks and its token no longer counts as uploaded."""
+        token = self._start()
+        for index, chunk in enumerate(self.chunks[:-1]):
+            self._put_chunk(token, index, chunk)
+        ChunkedUpload.objects.update(created_at=timezone.now() - timedelta(seconds=settings.CHUNKED_UPLOAD_MAX_AGE + 60))
+
+        response = self._put_chunk(token, len(self.chunks) - 1, self.chunks[-1])
+
+        self.assertEqual(response.status_code, 410)
+        self.assertFalse(response.json()['complete'])
+
+    def test_expire_command_removes_uploads_and_stray_files(self):
+        """Test that expire_uploads removes old uploads and orphaned staging files but keeps recent ones."""
+        old_token, recent_token = self._start(), self._start()
+        ChunkedUpload.objects.filter(token=old_token).update(created_at=timezone.now() - timedelta(days=2))
+        stray = os.path.join(self.staging_dir, '00000000-0000-0000-0000-000000000000.part')
+        with open(stray, 'wb') as stray_file:
+            stray_file.write(b'partial')
+        os.utime(stray, (time.time() - 2 * 24 * 60 * 60,) * 2)
+
+        call_command('expire_uploads', stdout=io.StringIO())
+
+        self.assertEqual([str(upload.token) for upload in ChunkedUpload.objects.all()], [recent_token])
+        self.assertEqual(os.listdir(self.staging_dir), [f'{recent_token}.part'])
+
+    def _start(self, sha256=''):
+        """Helper method to start an upload and return its token."""
+        response = self.client.post(
+            reverse('create_upload'),
+            {'filename': 'slide.png', 'size': len(self.content), 'sha256': sha256},
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.json()['token']
+
+    def _put_chunk(self, token, index, chunk, checksum=None):
+        """Helper method to upload one chunk."""
+        return self.client.put(
+            reverse('upload_chunk', args=[token, index]),
+            data=chunk,
+            content_type='application/octet-stream',
+            headers={'X-Chunk-SHA256': checksum or hashlib.sha256(chunk).hexdigest()},
+        )
+
+
+@override_settings(DEPLOY_VERSION='test-deploy')
+class PageCacheTest(TestCase):
+    """Test cases for cached FAQ and empty-form pages with conditional GET."""
+
+    def setUp(self):
+        """Start each test with an empty page cache."""
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client = Client(enforce_csrf_checks=True)
+
+    def test_page_rendered_once(self):
+        """Test that repeat GETs are served from the cache without rendering."""
+        self.client.get(reverse('faq'))
+        with mock.patch('submission.page_cache.render_to_string') as render_to_string:
+            response = self.client.get(reverse('faq'))
+
+        render_to_string.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+        self.assertIn('no-cache', response['Cache-Control'])
+
+    def test_cached_form_has_working_csrf_token(self):
+        """Test that the cached form carries a per-request CSRF token that passes the CSRF check."""
+        response = self.client.get(reverse('submit_announcement'))
+        self.client.get(reverse('submit_announcement'))
+
+        self.assertNotContains(response, 'csrf_token_placeholder')
+        token = response.content.decode().split('name="csrfmiddlewaretoken" value="')[1].split('"')[0]
+        post = self.client.post(reverse('submit_announcement'), {'csrfmiddlewaretoken': token, 'title': ''})
+        self.assertEqual(post.status_code, 200)
+
+    def test_not_modified_with_matching_etag(self):
+        """Test that a client with the current ETag and a CSRF cookie gets a 304."""
+        etag = self.client.get(reverse('submit_announcement'))['ETag']
+
+        response = self.client.get(reverse('submit_announcement'), headers={'If-None-Match': etag})
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_full_page_without_csrf_cookie(self):
+        """Test that a client without a CSRF cookie always gets a fresh token, even with a matching ETag."""
+        etag = self.client.get(reverse('submit_announcement'))['ETag']
+
+        response = Client().get(reverse('submit_announcement'), headers={'If-None-Match': etag})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'csrfmiddlewaretoken')
+
+    def test_new_deploy_changes_etag(self):
+        """Test that a new deploy version renders a new page with a new ETag."""
+        etag = self.client.get(reverse('faq'))['ETag']
+        with override_settings(DEPLOY_VERSION='next-deploy'):
+            response = self.client.get(reverse('faq'), headers={'If-None-Match': etag})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+class PrecompiledFormRendererTest(TestCase):
+    def assertSameRendering(self, make_form):
+        expected = make_form(DjangoTemplates())
+        actual = make_form(PrecompiledFormRenderer())
+        for name in expected.fields:
+            self.assertEqual(str(actual[name]), str(expected[name]))
+
+    def test_unbound_form(self):
+        """Test that an empty form renders exactly as with the template engine."""
+        self.assertSameRendering(lambda renderer: SubmissionForm(renderer=renderer))
+
+    def test_bound_form_with_errors_and_escaping(self):
+        """Test that submitted values, errors and checked boxes render exactly as with the template engine."""
+        data = {
+            'title': '"Quoted" <b>title</b> & more',
+            'email': 'not-an-email',
+            'description': '</textarea><script>alert(1)</script>',
+            'start_date': '2025-07-16',
+            'end_date': '2025-07-23',
+            'is_chapel': 'on',
+        }
+
+        def make_form(renderer):
+            form = SubmissionForm(data=data, renderer=renderer)
+            form.is_valid()
+            return form
+
+        self.assertSameRendering(make_form)
+        self.assertIn('aria-invalid="true"', str(make_form(PrecompiledFormRenderer())['email']))
+
+    def test_other_templates_use_template_engine(self):
+        """Test that widgets without a compiled template still render through the template engine."""
+        class ChoiceForm(forms.Form):
+            choice = forms.ChoiceField(choices=[('a', 'A & B'), ('b', 'B')])
+
+        self.assertEqual(
+            str(ChoiceForm(renderer=PrecompiledFormRenderer())['choice']),
+            str(ChoiceForm(renderer=DjangoTemplates())['choice']),
+        )
+
+
+class SQLiteConnectionProfileTest(TestCase):
+    WRITERS = 16
+    SUBMISSIONS_PER_WRITER = 8
+    SLIDES_PER_SUBMISSION = 3
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        # The test database is in memory, so the writers share a real database file instead
+        self.settings_dict = {**connection.settings_dict, 'NAME': os.path.join(directory, 'stress.sqlite3')}
+
+        self.use_stress_connection()
+        self.addCleanup(self.release_stress_connection)
+        with connections['stress'].schema_editor() as editor:
+            editor.create_model(Submission)
+            editor.create_model(SubmissionSlide)
+
+    def use_stress_connection(self):
+        """Give the current thread its own connection to the stress database, under the 'stress' alias."""
+        connections['stress'] = DatabaseWrapper(self.settings_dict, alias='stress')
+
+    def release_stress_connection(self):
+        connections['stress'].close()
+        del connections['stress']
+
+    def write_submissions(self, writer):
+        """Save submissions with their slides the way the submission view does."""
+        self.use_stress_connection()
+        try:
+            for number in range(self.SUBMISSIONS_PER_WRITER):
+                with transaction.atomic(using='stress'):
+                    # Read before writing, like the form's validation and the blob lookup
+                    Submission.objects.using('stress').filter(title__startswith='Writer').exists()
+                    submission = Submission.objects.using('stress').create(
+                        title=f'Writer {writer} #{number}',
+                        start_date=timezone.now(),
+                        end_date=timezone.now() + timedelta(days=7),
+                    )
+                    SubmissionSlide.objects.using('stress').bulk_create([
+                        SubmissionSlide(submission=submission, image=f'announcements/{writer}-{number}-{slide}.png')
+                        for slide in range(self.SLIDES_PER_SUBMISSION)
+                    ])
+        finally:
+            self.release_stress_connection()
+
+    def test_pragmas_applied_to_new_connections(self):
+        """Test that the connection_created hook applies the configured profile."""
+        with connections['stress'].cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            self.assertEqual(cursor.fetchone()[0], 'wal')
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], settings.SQLITE_PRAGMAS['busy_timeout'])
+
+    def test_parallel_writers_do_not_lock(self):
+        """Test that many concurrent submission writers all commit without "database is locked" errors."""
+        with ThreadPoolExecutor(max_workers=self.WRITERS) as executor:
+            list(executor.map(self.write_submissions, range(self.WRITERS)))
+
+        submissions = self.WRITERS * self.SUBMISSIONS_PER_WRITER
+        self.assertEqual(Submission.objects.using('stress').count(), submissions)
+        self.assertEqual(SubmissionSlide.objects.using('stress').count(), submissions * self.SLIDES_PER_SUBMISSION)
+
+
+class AsyncSubmissionURLs:
+    """URL configuration that routes submissions to the async view."""
+    urlpatterns = [
+        path('', views.submit_announcement_async, name='submit_announcement'),
+        path('', include('submission.urls')),
+    ]
+
+
+@override_settings(ROOT_URLCONF=AsyncSubmissionURLs)
+class AsyncSubmissionViewTest(TempMediaRootMixin, TestCase):
+    """Test cases for the async submission view."""
+
+    def setUp(self):
+        """Set up a temporary media root and form data."""
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+        Contact.objects.create(name='Praise Contact', email='praise@example.com', is_praise=True)
+        self.valid_data = {
+            'title': 'Async Announcement',
+            'start_date': '2025-07-16',
+            'end_date': '2025-07-23',
+            'is_praise': True,
+        }
+
+    async def test_get_renders_form(self):
+        """Test that the async view serves the empty form."""
+        response = await self.async_client.get('/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'csrfmiddlewaretoken')
+
+    async def test_submission_with_slides(self):
+        """Test that a valid submission stores its slides and queues the notification."""
+        data = self.valid_data.copy()
+        data['slides'] = [create_test_image(f'slide{index}.png') for index in range(3)]
+
+        response = await self.async_client.post('/', data=data)
+
+        self.assertEqual(response.status_code, 302)
+        submission = await Submission.objects.aget()
+        self.assertEqual(await submission.slides.acount(), 3)
+        email = await OutboxEmail.objects.aget()
+        self.assertEqual(email.submission_id, submission.pk)
+        self.assertEqual(email.recipients, ['praise@example.com'])
+
+    async def test_invalid_slide_writes_nothing(self):
+        """Test that slide errors are reported and nothing is saved."""
+        data = self.valid_data.copy()
+        data['slides'] = [
+            create_test_image('good.png'),
+            create_test_image('square.png', 1200, 900),
+        ]
+
+        response = await self.async_client.post('/', data=data)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'square.png: Slide must have a 16:9 aspect ratio.')
+        self.assertFalse(await Submission.objects.aexists())
+        self.assertFalse(await SubmissionSlide.objects.aexists())
+        self.assertFalse(await OutboxEmail.objects.aexists())
+
+    async def test_invalid_form_rerendered(self):
+        """Test that form errors are rendered without saving anything."""
+        response = await self.async_client.post('/', data={'title': ''})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'This field is required.')
+        self.assertFalse(await Submission.objects.aexists())
+
+
+class DeckExportTest(TempMediaRootMixin, TestCase):
+    """Test cases for the streaming slide deck export."""
+
+    def setUp(self):
+        """Set up a temporary media root and announcements for both services."""
+        super().setUp()
+
+        now = timezone.now()
+        self.later = self._create_submission('Bake Sale', now - timedelta(days=1), is_chapel=True)
+        self.earlier = self._create_submission('Choir Tour', now - timedelta(days=3), is_chapel=True)
+        self._create_submission('Praise Night', now - timedelta(days=2), is_praise=True)
+        self._create_submission('Old News', now - timedelta(days=30), is_chapel=True, days=7)
+
+    def test_deck_in_presentation_order(self):
+        """Test that the ZIP holds the service's active slides, numbered by start date then upload order."""
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(stream_deck(service_deck(timezone.localdate(), 'chapel')))))
+
+        self.assertEqual(archive.namelist(), [
+            '001-choir-tour.png', '002-choir-tour.png', '003-bake-sale.png', '004-bake-sale.png',
+        ])
+        first_slide = self.earlier.slides.order_by('pk').first()
+        with first_slide.image.open('rb') as image:
+            self.assertEqual(archive.read('001-choir-tour.png'), image.read())
+        self.assertIsNone(archive.testzip())
+
+    def test_stream_yields_bounded_chunks(self):
+        """Test that no piece of the stream holds more than one read from storage plus ZIP headers."""
+        SubmissionSlide.objects.create(submission=self.later, image=SimpleUploadedFile(
+            'noise.png', os.urandom(3 * DECK_CHUNK_SIZE), content_type='image/png',
+        ))
+
+        chunks = list(stream_deck(service_deck(timezone.localdate(), 'chapel')))
+
+        self.assertLessEqual(max(len(chunk) for chunk in chunks), DECK_CHUNK_SIZE + 1024)
+        self.assertEqual(len(zipfile.ZipFile(io.BytesIO(b''.join(chunks))).namelist()), 5)
+
+    def test_admin_action_streams_selected(self):
+        """Test that the admin action streams a ZIP of the selected announcements."""
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+
+        response = self.client.post(reverse('admin:submission_submission_changelist'), {
+            'action': 'export_deck',
+            '_selected_action': [self.later.pk],
+        })
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(archive.namelist(), ['001-bake-sale.png', '002-bake-sale.png'])
+
+    def test_admin_deck_for_service_date(self):
+        """Test that the admin deck view exports the service's deck for the requested date."""
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        day = (timezone.now() - timedelta(days=28)).date()
+
+        response = self.client.get(reverse('admin:submission_submission_deck'), {'service': 'chapel', 'date': day.isoformat()})
+
+        self.assertEqual(response['Content-Disposition'], f'attachment; filename="chapel-deck-{day.isoformat()}.zip"')
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(archive.namelist(), ['001-old-news.png', '002-old-news.png'])
+
+    def test_admin_deck_rejects_bad_date(self):
+        """Test that the admin deck view sends the user back to the changelist on an invalid date."""
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+
+        response = self.client.get(reverse('admin:submission_submission_deck'), {'service': 'chapel', 'date': 'soon'})
+
+        self.assertRedirects(response, reverse('admin:submission_submission_changelist'))
+
+    async def test_admin_deck_streams_under_asgi(self):
+        """Test that under ASGI the deck is an async stream rather than a generator Django would buffer."""
+        user = await sync_to_async(User.objects.create_superuser)('admin', 'admin@example.com', 'password')
+        await self.async_client.aforce_login(user)
+
+        response = await self.async_client.get(reverse('admin:submission_submission_deck'), {'service': 'chapel'})
+
+        self.assertTrue(response.is_async)
+        chunks = [chunk async for chunk in response.streaming_content]
+        self.assertGreater(len(chunks), 1)
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(chunks)))
+        self.assertEqual(archive.namelist(), [
+            '001-choir-tour.png', '002-choir-tour.png', '003-bake-sale.png', '004-bake-sale.png',
+        ])
+
+    def test_export_command(self):
+        """Test that the export_deck command writes the service's deck for the given date."""
+        output = os.path.join(self.media_root, 'praise.zip')
+
+        call_command('export_deck', 'praise', '--date', timezone.localdate().isoformat(), '-o', output, stdout=io.StringIO())
+
+        self.assertEqual(zipfile.ZipFile(output).namelist(), ['001-praise-night.png', '002-praise-night.png'])
+
+    def _create_submission(self, title, start_date, days=10, **flags):
+        """Helper method to create an announcement with two slides."""
+        submission = Submission.objects.create(
+            title=title, start_date=start_date, end_date=start_date + timedelta(days=days),
+            is_praise=flags.get('is_praise', False), is_chapel=flags.get('is_chapel', False),
+        )
+        for index in range(2):
+            SubmissionSlide.objects.create(submission=submission, image=create_test_image(
+                f'{title}-{index}.png', 160, 90, color=(index * 100, len(title), 50),
+            ))
+        return submission
+
+
+@override_settings(SITE_URL='https://announcements.example.com')
+class AnnouncementFeedTest(TempMediaRootMixin, TestCase):
+    """Test cases for the cached announcement feeds."""
+
+    def setUp(self):
+        """Set up a temporary media root, a clean cache and an active chapel announcement."""
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+        now = timezone.now()
+        self.submission = Submission.objects.create(
+            title='Choir Tour', start_date=now - timedelta(days=1), end_date=now + timedelta(days=6),
+            is_chapel=True, is_praise=False,
+        )
+        self.slide = SubmissionSlide.objects.create(submission=self.submission, image=create_test_image('tour.png', 160, 90))
+        Submission.objects.create(title='Old News', start_date=now - timedelta(days=9), end_date=now - timedelta(days=2), is_chapel=True)
+        self.url = reverse('announcement_feed', args=['chapel', 'json'])
+
+    def test_form_submission_without_service_is_praise(self):
+        """Test that an announcement from the form, which hides the service boxes, is in the praise feed and deck."""
+        today = timezone.localdate()
+        response = self.client.post(reverse('submit_announcement'), {
+            'title': 'Bake Sale',
+            'start_date': (today - timedelta(days=1)).isoformat(),
+            'end_date': (today + timedelta(days=1)).isoformat(),
+            'slides': [create_test_image('bake.png', 160, 90)],
+        })
+        self.assertEqual(response.status_code, 302)
+        submission = Submission.objects.get(title='Bake Sale')
+        self.assertFalse(submission.is_chapel or submission.is_praise)
+
+        self.assertEqual(list(Submission.objects.active_on(today).for_service('praise')), [submission])
+        feed = self.client.get(reverse('announcement_feed', args=['praise', 'json'])).json()
+        self.assertEqual([announcement['title'] for announcement in feed['announcements']], ['Bake Sale'])
+        self.assertEqual([slide.submission for slide in service_deck(today, 'praise')], [submission])
+        self.assertNotIn(submission, Submission.objects.active_on(today).for_service('chapel'))
+
+    def test_json_feed_lists_active_announcements(self):
+        """Test that the JSON feed lists the active announcements with absolute slide URLs."""
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['service'], 'chapel')
+        self.assertEqual([announcement['title'] for announcement in data['announcements']], ['Choir Tour'])
+        slides = data['announcements'][0]['slides']
+        self.assertEqual([slide['name'] for slide in slides], ['tour.png'])
+        self.assertTrue(slides[0]['url'].startswith('https://announcements.example.com/slides/'))
+        download = self.client.get(slides[0]['url'].removeprefix('https://announcements.example.com'))
+        self.assertEqual(download.status_code, 200)
+        self.assertFalse(response['ETag'].startswith('W/'))
+
+    def test_rss_feed_has_slide_enclosures(self):
+        """Test that the RSS feed has one item per slide with the image as enclosure."""
+        response = self.client.get(reverse('announcement_feed', args=['chapel', 'rss']))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '<title>Choir Tour (1/1)</title>')
+        self.assertContains(response, 'type="image/png" url="https://announcements.example.com/slides/')
+
+    def test_unchanged_feed_answered_from_version(self):
+        """Test that polling with the current ETag gets a 304 from the version query alone."""
+        etag = self.client.get(self.url)['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, headers={'If-None-Match': etag})
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_shared_across_processes(self):
+        """Test that processes started at different times, without DEPLOY_VERSION, agree on the ETag."""
+        etag = self.client.get(self.url)['ETag']
+
+        with mock.patch('submission.page_cache._PROCESS_VERSION', 'another-process'):
+            response = self.client.get(self.url, headers={'If-None-Match': etag})
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_cached_body_reused(self):
+        """Test that a new client gets the cached feed without rendering it again."""
+        first = self.client.get(self.url)
+
+        with self.assertNumQueries(1):
+            second = self.client.get(self.url)
+
+        self.assertEqual(second.content, first.content)
+
+    def test_model_change_replaces_feed(self):
+        """Test that changing an announcement changes the ETag and the feed."""
+        etag = self.client.get(self.url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.submission.title = 'Choir Tour 2026'
+            self.submission.save()
+
+        response = self.client.get(self.url, headers={'If-None-Match': etag})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['announcements'][0]['title'], 'Choir Tour 2026')
+
+    def test_change_from_another_process_replaces_feed(self):
+        """Test that a change made without this process's signals or cache still changes the ETag."""
+        etag = self.client.get(self.url)['ETag']
+        # A queryset update sends no signals and leaves the cache alone, like a write from another worker
+        Submission.objects.filter(pk=self.submission.pk).update(
+            title='Choir Tour 2026', updated_at=timezone.now() + timedelta(seconds=1),
+        )
+
+        response = self.client.get(self.url, headers={'If-None-Match': etag})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['announcements'][0]['title'], 'Choir Tour 2026')
+
+    def test_slide_removal_replaces_feed(self):
+        """Test that removing a slide changes the ETag."""
+        etag = self.client.get(self.url)['ETag']
+        self.slide.delete()
+
+        response = self.client.get(self.url, headers={'If-None-Match': etag})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['announcements'][0]['slides'], [])
+
+    def test_new_day_replaces_feed(self):
+        """Test that the ETag changes when the date moves on, even without model changes."""
+        etag = self.client.get(self.url)['ETag']
+        tomorrow = timezone.localdate() + timedelta(days=1)
+
+        with mock.patch('submission.views.timezone.localdate', return_value=tomorrow):
+            response = self.client.get(self.url, headers={'If-None-Match': etag})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['date'], tomorrow.isoformat())
+
+    def test_unknown_service_or_format(self):
+        """Test that unknown services and formats are not found."""
+        self.assertEqual(self.client.get(reverse('announcement_feed', args=['vespers', 'json'])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('announcement_feed', args=['chapel', 'xml'])).status_code, 404)
+
+
+class StaticAssetTest(TestCase):
+    """Test cases for fingerprinted, precompressed static files and how they are served."""
+
+    def setUp(self):
+        """Collect static files into a temporary static root."""
+        self.static_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.static_root, ignore_errors=True)
+        static_override = override_settings(
+            STATIC_ROOT=self.static_root,
+            # Only the project's own assets; collecting the admin's would just slow the test down
+            STATICFILES_FINDERS=['django.contrib.staticfiles.finders.FileSystemFinder'],
+        )
+        static_override.enable()
+        self.addCleanup(static_override.disable)
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+        call_command('collectstatic', interactive=False, verbosity=0)
+        self.css_url = staticfiles_storage.url('styles.css')
+        with open(settings.BASE_DIR / 'static' / 'styles.css', 'rb') as css:
+            self.css = css.read()
+
+    def test_collectstatic_fingerprints_and_compresses(self):
+        """Test that collectstatic writes a fingerprinted stylesheet with a smaller gzip copy."""
+        self.assertRegex(self.css_url, r'^/static/styles\.[0-9a-f]{12}\.css$')
+        compressed_path = os.path.join(self.static_root, self.css_url.removeprefix('/static/') + '.gz')
+        with open(compressed_path, 'rb') as compressed:
+            data = compressed.read()
+        self.assertLess(len(data), len(self.css) / 2)
+        self.assertEqual(gzip.decompress(data), self.css)
+        self.assertFalse(os.path.exists(os.path.join(self.static_root, 'logo.png.gz')))
+
+    def test_pages_link_fingerprinted_assets(self):
+        """Test that rendered pages reference the fingerprinted file names."""
+        response = self.client.get(reverse('faq'))
+
+        self.assertContains(response, self.css_url)
+
+    def test_fingerprinted_file_served_compressed_and_immutable(self):
+        """Test that a fingerprinted file is served from its gzip copy with far-future caching."""
+        response = self.client.get(self.css_url, headers={'Accept-Encoding': 'gzip, deflate'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), self.css)
+
+    @skipUnless(brotli, "brotli is not installed")
+    def test_brotli_preferred_when_accepted(self):
+        """Test that clients accepting brotli get the brotli copy over the gzip one."""
+        response = self.client.get(self.css_url, headers={'Accept-Encoding': 'gzip, deflate, br'})
+
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(b''.join(response.streaming_content)), self.css)
+
+    def test_identity_when_compression_not_accepted(self):
+        """Test that clients that do not accept gzip get the original bytes."""
+        response = self.client.get(self.css_url, headers={'Accept-Encoding': 'gzip;q=0'})
+
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(b''.join(response.streaming_content), self.css)
+
+    def test_unfingerprinted_file_revalidates(self):
+        """Test that a file requested by its plain name must be revalidated and supports If-Modified-Since."""
+        response = self.client.get('/static/styles.css')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=0, must-revalidate')
+
+        cached = self.client.get('/static/styles.css', headers={'If-Modified-Since': response['Last-Modified']})
+        self.assertEqual(cached.status_code, 304)
+
+    def test_outside_static_root_not_found(self):
+        """Test that paths escaping the static root are not served."""
+        self.assertEqual(self.client.get('/static/../conf/settings.py').status_code, 404)
+        self.assertEqual(self.client.get('/static/missing.css').status_code, 404)
+
+
+class MediaServingTest(TempMediaRootMixin, TestCase):
+    """Test cases for the staff media view and signed slide downloads."""
+
+    def setUp(self):
+        """Set up a temporary media root, a stored slide and a logged-in staff user."""
+        super().setUp()
+
+        self.content = os.urandom(1000)
+        submission = Submission.objects.create(
+            title='Media', start_date=timezone.now(), end_date=timezone.now() + timedelta(days=7),
+        )
+        self.slide = SubmissionSlide.objects.create(submission=submission, image=SimpleUploadedFile(
+            'deck.png', self.content, content_type='image/png',
+        ))
+        self.url = self.slide.image.url
+        self.client.force_login(User.objects.create_user('staff', 'staff@example.com', 'password', is_staff=True))
+
+    def test_staff_only(self):
+        """Test that media is not served to anonymous visitors."""
+        response = Client().get(self.url)
+
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(reverse('admin:login'), response['Location'])
+
+    def test_full_file_with_content_etag(self):
+        """Test that a whole file is served with an ETag taken from its content digest."""
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        self.assertEqual(response['ETag'], f'"{hashlib.sha256(self.content).hexdigest()}"')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Content-Type'], 'image/png')
+
+    async def test_streamed_under_asgi(self):
+        """Test that under ASGI whole files and ranges are async streams rather than iterators Django would buffer."""
+        await self.async_client.aforce_login(await User.objects.aget(username='staff'))
+
+        response = await self.async_client.get(self.url)
+        partial = await self.async_client.get(self.url, headers={'Range': 'bytes=100-199'})
+
+        self.assertTrue(response.is_async)
+        self.assertEqual(b''.join([chunk async for chunk in response.streaming_content]), self.content)
+        self.assertEqual(response['Content-Length'], '1000')
+        self.assertEqual(partial.status_code, 206)
+        self.assertTrue(partial.is_async)
+        self.assertEqual(b''.join([chunk async for chunk in partial.streaming_content]), self.content[100:200])
+
+    def test_if_none_match(self):
+        """Test that a matching If-None-Match gets a 304."""
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(self.url, headers={'If-None-Match': etag})
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_range_requests(self):
+        """Test byte ranges, suffix ranges, unsatisfiable ranges and If-Range."""
+        response = self.client.get(self.url, headers={'Range': 'bytes=100-199'})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 100-199/1000')
+        self.assertEqual(b''.join(response.streaming_content), self.content[100:200])
+
+        response = self.client.get(self.url, headers={'Range': 'bytes=-50'})
+        self.assertEqual(b''.join(response.streaming_content), self.content[-50:])
+
+        response = self.client.get(self.url, headers={'Range': 'bytes=5000-'})
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */1000')
+
+        response = self.client.get(self.url, headers={'Range': 'bytes=0-9', 'If-Range': '"stale"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+
+    def test_front_proxy_headers(self):
+        """Test that a configured front proxy is handed the file instead of the body."""
+        with override_settings(MEDIA_X_ACCEL_PREFIX='/protected-media/'):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.slide.image.name}')
+        self.assertEqual(response.content, b'')
+
+        with override_settings(MEDIA_X_SENDFILE=True):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Sendfile'], self.slide.image.path)
+
+        # Ranges are left to the proxy too
+        with override_settings(MEDIA_X_SENDFILE=True):
+            response = self.client.get(self.url, headers={'Range': 'bytes=0-99'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Sendfile'], self.slide.image.path)
+
+    def test_missing_and_outside_files(self):
+        """Test that missing files and paths outside the media root are not found."""
+        self.assertEqual(self.client.get('/media/announcements/missing.png').status_code, 404)
+        self.assertEqual(self.client.get('/media/../conf/settings.py').status_code, 404)
+
+    def test_signed_download_supports_ranges(self):
+        """Test that signed slide downloads use the same serving path."""
+        url = reverse('download_slide', args=[slide_download_token(self.slide)])
+
+        response = Client().get(url, headers={'Range': 'bytes=0-9'})
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), self.content[:10])
+        self.assertIn('attachment; filename="deck.png"', response['Content-Disposition'])
+
+
+class LoadTestSupportTest(TempMediaRootMixin, TestCase):
+    """Test cases for stage timing and the loadtest command's helpers."""
+
+    def test_submission_stages_recorded(self):
+        """Test that a submission records its pipeline stages while timings are being collected."""
+        data = {
+            'title': 'Timed',
+            'start_date': '2025-07-16',
+            'end_date': '2025-07-23',
+            'is_praise': True,
+            'slides': [SimpleUploadedFile('slide.png', make_slide(320, 180, 'png'), content_type='image/png')],
+        }
+
+        with collect_stage_timings() as timings:
+            response = self.client.post(reverse('submit_announcement'), data)
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(set(timings), {'parse', 'slides', 'save', 'queue'})
+        self.assertTrue(all(seconds >= 0 for seconds in timings.values()))
+
+    def test_stage_outside_collection_is_ignored(self):
+        """Test that stages only record inside a collection, and repeated stages add up."""
+        with stage('parse'):
+            pass
+        with collect_stage_timings() as timings:
+            with stage('save'):
+                pass
+            with stage('save'):
+                pass
+        self.assertEqual(list(timings), ['save'])
+
+    def test_unique_slides_stay_valid(self):
+        """Test that unique copies of synthetic slides differ in content but probe to the same size."""
+        for fmt in ('png', 'jpeg'):
+            base = make_slide(320, 180, fmt)
+            first, second = make_unique(base, fmt, 1), make_unique(base, fmt, 2)
+            self.assertNotEqual(hashlib.sha256(first).digest(), hashlib.sha256(second).digest())
+            for data in (first, second):
+                info = probe_slide(io.BytesIO(data))
+                self.assertEqual((info.width, info.height), (320, 180))
+                with Image.open(io.BytesIO(data)) as image:
+                    image.load()
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles."""
+        values = [index / 100 for index in range(1, 101)]
+        self.assertEqual(percentile(values, 50), 0.5)
+        self.assertEqual(percentile(values, 99), 0.99)
+        self.assertEqual(percentile([0.2], 95), 0.2)
+
+
+class ProfilingMiddlewareTest(TempMediaRootMixin, TestCase):
+    """Test cases for the opt-in request profiling middleware."""
+
+    def setUp(self):
+        """Set up a temporary media root and dump directory, with the middleware enabled."""
+        super().setUp()
+        self.enterContext(self.settings(
+            MIDDLEWARE=['conf.profiling.ProfilingMiddleware', *settings.MIDDLEWARE],
+            PROFILING_DUMP_DIR=os.path.join(self.media_root, 'profiles'),
+            PROFILING_SAMPLER='',
+        ))
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+        Contact.objects.create(name='Praise Contact', email='praise@example.com', is_praise=True)
+        self.valid_data = {
+            'title': 'Profiled',
+            'start_date': '2025-07-16',
+            'end_date': '2025-07-23',
+            'is_praise': True,
+        }
+
+    def _server_timing(self, response):
+        metrics = {}
+        for metric in response['Server-Timing'].split(', '):
+            name, *params = metric.split(';')
+            metrics[name] = dict(param.split('=', 1) for param in params)
+        return metrics
+
+    def test_server_timing_and_log_line(self):
+        """Test that a submission reports its wall time, queries and stages in the header and the log."""
+        data = self.valid_data.copy()
+        data['slides'] = [SimpleUploadedFile('slide.png', make_slide(320, 180, 'png'), content_type='image/png')]
+
+        with self.assertLogs('conf.profiling', 'INFO') as logs:
+            response = self.client.post(reverse('submit_announcement'), data)
+
+        self.assertEqual(response.status_code, 302)
+        metrics = self._server_timing(response)
+        self.assertEqual(list(metrics)[:2], ['total', 'db'])
+        self.assertTrue({'parse', 'slides', 'save', 'queue'} <= set(metrics))
+        self.assertGreater(float(metrics['total']['dur']), 0)
+
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['method'], 'POST')
+        self.assertEqual(record['status'], 302)
+        self.assertGreater(record['db_queries'], 0)
+        self.assertEqual(metrics['db']['desc'], f'"{record["db_queries"]} queries"')
+        self.assertEqual(set(record['stages_ms']), {'parse', 'slides', 'save', 'queue'})
+
+    def test_query_count_matches_queries_made(self):
+        """Test that the reported query count is exactly the queries the request made."""
+        data = self.valid_data.copy()
+        data['slides'] = [SimpleUploadedFile('slide.png', make_slide(320, 180, 'png'), content_type='image/png')]
+
+        with self.assertLogs('conf.profiling', 'INFO') as logs, CaptureQueriesContext(connection) as queries:
+            self.client.post(reverse('submit_announcement'), data)
+            self.client.get(reverse('faq'))
+
+        first, second = (json.loads(record.getMessage()) for record in logs.records)
+        self.assertEqual(first['db_queries'] + second['db_queries'], len(queries))
+        self.assertEqual(second['db_queries'], 0)
+
+    def test_slow_request_dumps_cprofile(self):
+        """Test that a sampled request over the threshold leaves a loadable cProfile dump."""
+        with override_settings(PROFILING_SAMPLER='cprofile', PROFILING_SAMPLE_RATE=1.0, PROFILING_SLOW_REQUEST_MS=0):
+            with self.assertLogs('conf.profiling', 'WARNING') as logs:
+                self.client.get(reverse('faq'))
+
+        record = json.loads(logs.records[0].getMessage())
+        self.assertTrue(os.path.isfile(record['profile']))
+        stats = pstats.Stats(record['profile'])
+        self.assertGreater(stats.total_calls, 0)
+
+    def test_slow_request_dumps_tracemalloc(self):
+        """Test that the tracemalloc sampler writes a snapshot and stops tracing afterwards."""
+        with override_settings(PROFILING_SAMPLER='tracemalloc', PROFILING_SAMPLE_RATE=1.0, PROFILING_SLOW_REQUEST_MS=0):
+            with self.assertLogs('conf.profiling', 'WARNING') as logs:
+                self.client.get(reverse('faq'))
+
+        record = json.loads(logs.records[0].getMessage())
+        self.assertIsInstance(tracemalloc.Snapshot.load(record['profile']), tracemalloc.Snapshot)
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_fast_request_keeps_no_dump(self):
+        """Test that a sampled request under the threshold writes nothing."""
+        with override_settings(PROFILING_SAMPLER='cprofile', PROFILING_SAMPLE_RATE=1.0, PROFILING_SLOW_REQUEST_MS=60000):
+            with self.assertLogs('conf.profiling', 'INFO') as logs:
+                self.client.get(reverse('faq'))
+
+        self.assertNotIn('profile', json.loads(logs.records[0].getMessage()))
+        self.assertFalse(os.path.exists(settings.PROFILING_DUMP_DIR))
+
+    async def test_async_view_profiled(self):
+        """Test that the middleware also wraps the async submission view."""
+        data = self.valid_data.copy()
+        data['slides'] = [SimpleUploadedFile('slide.png', make_slide(320, 180, 'png'), content_type='image/png')]
+
+        with override_settings(ROOT_URLCONF=AsyncSubmissionURLs):
+            response = await self.async_client.post('/', data=data)
+
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue({'total', 'db', 'parse', 'slides', 'save', 'queue'} <= set(self._server_timing(response)))
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend', EMAIL_DIGEST_MODE=True, SITE_URL='https://announcements.example.com')
+class DigestModeTest(TempMediaRootMixin, TestCase):
+    """Test cases for holding notifications and batching them into digests."""
+
+    def setUp(self):
+        """Set up a temporary media root and chapel and praise contacts."""
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+        Contact.objects.create(name='Praise Team', email='praise@example.com', is_praise=True)
+        Contact.objects.create(name='Worship Leader', email='leader@example.com', is_praise=True)
+        Contact.objects.create(name='Chapel Office', email='chapel@example.com', is_chapel=True)
+
+    def _submit(self, title, is_chapel=False, is_praise=True, slides=1):
+        data = {
+            'title': title,
+            'start_date': '2025-07-16',
+            'end_date': '2025-07-23',
+            'slides': [
+                SimpleUploadedFile(f'{title}-{index}.png', make_unique(make_slide(320, 180, 'png'), 'png', f'{title}-{index}'), content_type='image/png')
+                for index in range(slides)
+            ],
+        }
+        if is_chapel:
+            data['is_chapel'] = 'on'
+        if is_praise:
+            data['is_praise'] = 'on'
+        response = self.client.post(reverse('submit_announcement'), data)
+        self.assertEqual(response.status_code, 302)
+
+    def test_notifications_held_until_digest(self):
+        """Test that digest mode holds notifications back from the send_outbox worker."""
+        self._submit('First')
+
+        call_command('send_outbox', '--once', stdout=io.StringIO())
+
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboxEmail.objects.get().status, OutboxEmail.STATUS_HELD)
+
+    def test_one_digest_per_recipient_group(self):
+        """Test that each recipient gets one digest, shared by recipients due the same announcements."""
+        self._submit('First', slides=2)
+        self._submit('Second')
+        self._submit('Chapel Only', is_chapel=True, is_praise=False)
+
+        out = io.StringIO()
+        call_command('send_digest', '--send', stdout=out)
+
+        self.assertIn('Queued 2 digest emails covering 3 announcements.', out.getvalue())
+        self.assertEqual(len(mail.outbox), 2)
+        by_recipients = {tuple(sorted(email.to)): email for email in mail.outbox}
+        praise = by_recipients[('leader@example.com', 'praise@example.com')]
+        chapel = by_recipients[('chapel@example.com',)]
+        self.assertIn('First', praise.body)
+        self.assertIn('Second', praise.body)
+        self.assertNotIn('Chapel Only', praise.body)
+        self.assertEqual(praise.body.count('https://announcements.example.com/slides/'), 3)
+        self.assertEqual(praise.attachments, [])
+        self.assertIn('Chapel Only', chapel.body)
+        self.assertEqual(
+            set(OutboxEmail.objects.filter(submission__isnull=False).values_list('status', flat=True)),
+            {OutboxEmail.STATUS_DIGESTED},
+        )
+
+    def test_held_notification_sent_with_its_last_digest(self):
+        """Test that a digested notification only gets sent_at once every digest including it is sent."""
+        self._submit('Both', is_chapel=True)
+        call_command('send_digest', stdout=io.StringIO())
+        held = OutboxEmail.objects.get(submission__isnull=False)
+        self.assertEqual(held.status, OutboxEmail.STATUS_DIGESTED)
+        self.assertIsNone(held.sent_at)
+        self.assertEqual(held.digests.count(), 1)
+
+        with mock.patch('submission.notifications._send', side_effect=['mail server down']), \
+                self.assertLogs('submission.notifications', 'WARNING'):
+            call_command('send_outbox', '--once', stdout=io.StringIO())
+        held.refresh_from_db()
+        self.assertIsNone(held.sent_at)
+
+        OutboxEmail.objects.filter(status=OutboxEmail.STATUS_PENDING).update(next_attempt_at=timezone.now())
+        call_command('send_outbox', '--once', stdout=io.StringIO())
+        held.refresh_from_db()
+        self.assertIsNotNone(held.sent_at)
+
+    def test_digest_runs_once_per_period(self):
+        """Test that digested notifications are not sent again by the next run."""
+        self._submit('First')
+        call_command('send_digest', stdout=io.StringIO())
+
+        out = io.StringIO()
+        call_command('send_digest', stdout=out)
+
+        self.assertIn('No announcements waiting', out.getvalue())
+        self.assertEqual(OutboxEmail.objects.filter(status=OutboxEmail.STATUS_PENDING).count(), 1)
+
+    def test_deleted_announcement_left_out(self):
+        """Test that an announcement deleted while held is not included."""
+        self._submit('Kept')
+        self._submit('Withdrawn')
+        Submission.objects.get(title='Withdrawn').delete()
+
+        call_command('send_digest', '--send', stdout=io.StringIO())
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('Kept', mail.outbox[0].body)
+        self.assertNotIn('Withdrawn', mail.outbox[0].body)
+        self.assertFalse(OutboxEmail.objects.filter(status=OutboxEmail.STATUS_HELD).exists())
+
+
+@override_settings(SLIDE_NORMALIZATION=True, SLIDE_NORMALIZED_SIZE=(640, 360))
+class SlideNormalizationTest(TempMediaRootMixin, TestCase):
+    """Test cases for normalizing slides in the process pool."""
+
+    def setUp(self):
+        """Set up a temporary media root and form data."""
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+        Contact.objects.create(name='Praise Contact', email='praise@example.com', is_praise=True)
+        self.valid_data = {
+            'title': 'Normalized',
+            'start_date': '2025-07-16',
+            'end_date': '2025-07-23',
+            'is_praise': True,
+        }
+
+    def _with_exif(self, width, height):
+        image = Image.new('RGB', (width, height), color='blue')
+        exif = Image.Exif()
+        exif[0x010F] = 'Test Camera'
+        buffer = io.BytesIO()
+        image.save(buffer, format='JPEG', exif=exif.tobytes())
+        return buffer.getvalue()
+
+    def test_downscales_and_strips_metadata(self):
+        """Test that a large slide is downscaled to fit and loses its EXIF block."""
+        data, fmt = normalize_image(self._with_exif(1280, 720), (640, 360), '', 85)
+
+        self.assertEqual(fmt, 'JPEG')
+        with Image.open(io.BytesIO(data)) as image:
+            self.assertEqual(image.size, (640, 360))
+            self.assertNotIn('exif', image.info)
+
+    def test_small_optimized_slide_kept(self):
+        """Test that a slide that fits and cannot be made smaller is left alone."""
+        buffer = io.BytesIO()
+        Image.new('RGB', (320, 180), color='red').save(buffer, format='PNG', optimize=True)
+
+        self.assertIsNone(normalize_image(buffer.getvalue(), (640, 360), '', 85))
+
+    def test_submission_stores_normalized_slide(self):
+        """Test that a submitted slide is stored downscaled and the upload is not kept."""
+        data = self.valid_data.copy()
+        data['slides'] = [SimpleUploadedFile('big.png', make_slide(1280, 720, 'png'), content_type='image/png')]
+
+        response = self.client.post(reverse('submit_announcement'), data)
+
+        self.assertEqual(response.status_code, 302)
+        slide = SubmissionSlide.objects.get()
+        self.assertEqual(slide.original_name, 'big.png')
+        self.assertFalse(slide.original)
+        with Image.open(slide.image.path) as image:
+            self.assertEqual(image.size, (640, 360))
+        with slide.image.open('rb') as image_file:
+            self.assertIn(hashlib.sha256(image_file.read()).hexdigest(), slide.image.name)
+
+    def test_undecodable_slide_reported(self):
+        """Test that a slide the pool cannot decode becomes an error for that slide alone."""
+        truncated = make_slide(1280, 720, 'png')
+        slides = [
+            SimpleUploadedFile('truncated.png', truncated[:len(truncated) // 2], content_type='image/png'),
+            SimpleUploadedFile('good.png', make_slide(1280, 720, 'png'), content_type='image/png'),
+        ]
+
+        stored, _, errors = normalize_slides(slides, [False, False])
+
+        self.assertEqual(errors, ["truncated.png: Uploaded file is not a valid image.", None])
+        self.assertIs(stored[0], slides[0])
+
+    def test_truncated_slide_rejected_without_writes(self):
+        """Test that a truncated PNG is reported as a form error and nothing is saved."""
+        truncated = make_slide(1280, 720, 'png')
+        data = self.valid_data.copy()
+        data['slides'] = [SimpleUploadedFile('truncated.png', truncated[:len(truncated) // 2], content_type='image/png')]
+
+        response = self.client.post(reverse('submit_announcement'), data)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'truncated.png: Uploaded file is not a valid image.')
+        self.assertFalse(Submission.objects.exists())
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, 'announcements')))
+
+    @override_settings(SLIDE_NORMALIZED_FORMAT='WEBP', SLIDE_NORMALIZATION_KEEP_ORIGINALS=True)
+    def test_original_kept_by_policy(self):
+        """Test that the upload is kept alongside a re-encoded slide, and both are released with it."""
+        data = self.valid_data.copy()
+        data['slides'] = [SimpleUploadedFile('big.png', make_slide(1280, 720, 'png'), content_type='image/png')]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('submit_announcement'), data)
+
+        slide = SubmissionSlide.objects.get()
+        self.assertTrue(slide.image.name.endswith('.webp'))
+        self.assertEqual(slide.original_name, 'big.webp')
+        with Image.open(slide.original.path) as original:
+            self.assertEqual(original.size, (1280, 720))
+        paths = [slide.image.path, slide.original.path]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            slide.submission.delete()
+
+        self.assertFalse(any(os.path.exists(path) for path in paths))
+
+    async def test_async_view_normalizes(self):
+        """Test that the async submission view normalizes slides too."""
+        data = self.valid_data.copy()
+        data['slides'] = [SimpleUploadedFile('big.png', make_slide(1280, 720, 'png'), content_type='image/png')]
+
+        with override_settings(ROOT_URLCONF=AsyncSubmissionURLs):
+            response = await self.async_client.post('/', data=data)
+
+        self.assertEqual(response.status_code, 302)
+        slide = await SubmissionSlide.objects.aget()
+        with Image.open(slide.image.path) as image:
+            self.assertEqual(image.size, (640, 360))
+
+
+class ArchiveExpiredTest(TempMediaRootMixin, TestCase):
+    """Test cases for archiving expired announcements."""
+
+    def setUp(self):
+        """Set up temporary media and archive roots with expired and current announcements."""
+        super().setUp()
+        self.archive_root = os.path.join(self.media_root, 'archive')
+        self.enterContext(self.settings(ARCHIVE_ROOT=self.archive_root))
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+        now = timezone.now()
+        self.expired = []
+        for index in range(3):
+            submission = Submission.objects.create(
+                title=f'Old {index}',
+                start_date=now - timedelta(days=420),
+                end_date=now - timedelta(days=400),
+            )
+            SubmissionSlide.objects.create(submission=submission, image=self._slide(f'old-{index}.png', index))
+            self.expired.append(submission)
+        self.current = Submission.objects.create(title='Current', start_date=now, end_date=now + timedelta(days=7))
+        SubmissionSlide.objects.create(submission=self.current, image=self._slide('current.png', 99))
+
+    def _slide(self, name, seed):
+        return SimpleUploadedFile(name, make_unique(make_slide(320, 180, 'png'), 'png', seed), content_type='image/png')
+
+    def test_archives_expired_in_batches(self):
+        """Test that expired announcements are recorded, their slides packed and their files released."""
+        paths = [submission.slides.get().image.path for submission in self.expired]
+        out = io.StringIO()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('archive_expired', '--days', '365', '--batch-size', '2', '--pause', '0', stdout=out)
+
+        self.assertIn('Archived 3 announcements', out.getvalue())
+        self.assertEqual(list(Submission.objects.values_list('title', flat=True)), ['Current'])
+        self.assertEqual(SubmissionSlide.objects.count(), 1)
+        self.assertFalse(any(os.path.exists(path) for path in paths))
+
+        archived = ArchivedSubmission.objects.get(submission_id=self.expired[0].pk)
+        self.assertEqual(archived.title, 'Old 0')
+        self.assertEqual(archived.slides[0]['original_name'], 'old-0.png')
+        with zipfile.ZipFile(os.path.join(self.archive_root, archived.archive_file)) as archive:
+            self.assertIn(archived.slides[0]['entry'], archive.namelist())
+            self.assertEqual(archive.read(archived.slides[0]['entry'])[:8], b'\x89PNG\r\n\x1a\n')
+        self.assertEqual(len(set(ArchivedSubmission.objects.values_list('archive_file', flat=True))), 2)
+
+    def test_shared_slide_file_kept(self):
+        """Test that a file shared with a current announcement stays in storage."""
+        shared = self.expired[0].slides.get().image.name
+        SubmissionSlide.objects.create(submission=self.current, image=shared)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('archive_expired', '--days', '365', '--pause', '0', stdout=io.StringIO())
+
+        self.assertTrue(os.path.exists(os.path.join(self.media_root, shared)))
+
+    def test_dry_run_changes_nothing(self):
+        """Test that a dry run only reports."""
+        out = io.StringIO()
+        call_command('archive_expired', '--days', '365', '--dry-run', stdout=out)
+
+        self.assertIn('3 announcements', out.getvalue())
+        self.assertEqual(Submission.objects.count(), 4)
+        self.assertFalse(ArchivedSubmission.objects.exists())
+
+    def test_rerun_after_interruption(self):
+        """Test that a batch interrupted before its transaction is archived once on the next run."""
+        with mock.patch('submission.archive.ArchivedSubmission.objects.bulk_create', side_effect=RuntimeError('killed')):
+            with self.assertRaises(RuntimeError):
+                call_command('archive_expired', '--days', '365', '--pause', '0', stdout=io.StringIO())
+        self.assertEqual(Submission.objects.count(), 4)
+
+        call_command('archive_expired', '--days', '365', '--pause', '0', stdout=io.StringIO())
+
+        self.assertEqual(ArchivedSubmission.objects.count(), 3)
+        self.assertEqual(os.listdir(self.archive_root), [ArchivedSubmission.objects.first().archive_file])
+
+
+class OrphanedMediaGCTest(TempMediaRootMixin, TestCase):
+    """Test cases for the gc_media command."""
+
+    def setUp(self):
+        """Set up a temporary media root with a referenced slide and orphaned files."""
+        super().setUp()
+
+        submission = Submission.objects.create(
+            title='Kept',
+            start_date=timezone.now(),
+            end_date=timezone.now() + timedelta(days=7),
+        )
+        self.slide = SubmissionSlide.objects.create(
+            submission=submission,
+            image=SimpleUploadedFile('kept.png', make_slide(320, 180, 'png'), content_type='image/png'),
+        )
+        self.orphans = [self._write(f'{index:064x}.png', age=2 * 60 * 60) for index in range(5)]
+        self.fresh = self._write(f'{99:064x}.png', age=0)
+        os.utime(self.slide.image.path, (0, 0))
+
+    def _write(self, filename, age):
+        name = f'announcements/{filename[:2]}/{filename}'
+        path = os.path.join(self.media_root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as file:
+            file.write(b'orphan')
+        mtime = time.time() - age
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def test_dry_run_reports_only(self):
+        """Test that a dry run lists orphans older than the minimum age and removes nothing."""
+        out = io.StringIO()
+        call_command('gc_media', '--dry-run', '--verbosity', '2', stdout=out)
+
+        self.assertIn('Found 5 orphaned files', out.getvalue())
+        self.assertNotIn(self.slide.image.name, out.getvalue())
+        self.assertTrue(all(os.path.exists(path) for path in self.orphans + [self.fresh]))
+
+    def test_removes_orphans_in_batches(self):
+        """Test that orphans are removed batch by batch while referenced and recent files stay."""
+        out = io.StringIO()
+        with CaptureQueriesContext(connection) as queries:
+            call_command('gc_media', '--batch-size', '2', stdout=out)
+
+        self.assertIn('Removed 5 of 5 orphaned files', out.getvalue())
+        self.assertFalse(any(os.path.exists(path) for path in self.orphans))
+        self.assertTrue(os.path.exists(self.fresh))
+        self.assertTrue(os.path.exists(self.slide.image.path))
+        # Six scanned files in three batches, plus a reference check before each removal in its own transaction
+        selects = [query for query in queries if query['sql'].startswith('SELECT')]
+        self.assertEqual(len(selects), 3 + 5)
+
+    def test_newly_shared_file_not_removed(self):
+        """Test that a file referenced after the scan found it is kept."""
+        name = os.path.relpath(self.orphans[0], self.media_root)
+        orphans = list(find_orphaned_blobs(batch_size=10, modified_before=time.time() - 60))
+        SubmissionSlide.objects.create(submission=self.slide.submission, image=name)
+
+        self.assertEqual(sum(release_blob(orphan) for orphan, _ in orphans), 4)
+        self.assertTrue(os.path.exists(self.orphans[0]))
+
+
+class ValidateBeforeWriteTest(TempMediaRootMixin, TestCase):
+    """Test cases for validating every slide before the submission is written."""
+
+    def setUp(self):
+        """Set up a temporary media root and form data."""
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+        Contact.objects.create(name='Praise Contact', email='praise@example.com', is_praise=True)
+        self.valid_data = {
+            'title': 'Two Phase',
+            'start_date': '2025-07-16',
+            'end_date': '2025-07-23',
+            'is_praise': True,
+        }
+
+    def _stored_files(self):
+        return [name for root, _, files in os.walk(self.media_root) for name in files]
+
+    def test_rejected_submission_writes_nothing(self):
+        """Test that a submission with one bad slide among good ones makes no database or file writes."""
+        data = self.valid_data.copy()
+        data['slides'] = [
+            SimpleUploadedFile('good.png', make_slide(320, 180, 'png'), content_type='image/png'),
+            SimpleUploadedFile('square.png', make_slide(300, 300, 'png'), content_type='image/png'),
+        ]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('submit_announcement'), data)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'square.png: Slide must have a 16:9 aspect ratio.')
+        writes = [query['sql'] for query in queries if query['sql'].split()[0].upper() in ('INSERT', 'UPDATE', 'DELETE')]
+        self.assertEqual(writes, [])
+        self.assertEqual(self._stored_files(), [])
+
+    def test_failed_commit_removes_written_files(self):
+        """Test that slide files written by a save that rolls back are removed again."""
+        data = self.valid_data.copy()
+        data['slides'] = [SimpleUploadedFile('good.png', make_slide(320, 180, 'png'), content_type='image/png')]
+
+        with mock.patch('submission.views.queue_notification', side_effect=RuntimeError('database went away')):
+            with self.assertRaises(RuntimeError):
+                self.client.post(reverse('submit_announcement'), data)
+
+        self.assertFalse(Submission.objects.exists())
+        self.assertFalse(SubmissionSlide.objects.exists())
+        self.assertEqual(self._stored_files(), [])
+
+    def test_failed_commit_keeps_shared_files(self):
+        """Test that a rolled-back save leaves files shared with existing slides in place."""
+        content = make_slide(320, 180, 'png')
+        data = self.valid_data.copy()
+        data['slides'] = [SimpleUploadedFile('first.png', content, content_type='image/png')]
+        self.client.post(reverse('submit_announcement'), data)
+        stored = SubmissionSlide.objects.get().image.path
+
+        data['slides'] = [SimpleUploadedFile('again.png', content, content_type='image/png')]
+        with mock.patch('submission.views.queue_notification', side_effect=RuntimeError('database went away')):
+            with self.assertRaises(RuntimeError):
+                self.client.post(reverse('submit_announcement'), data)
+
+        self.assertEqual(Submission.objects.count(), 1)
+        self.assertTrue(os.path.exists(stored))
+
+    def test_failed_commit_keeps_files_it_did_not_write(self):
+        """Test that a rolled-back save only removes files it wrote, not stored files it was going to share."""
+        content = make_slide(320, 180, 'png')
+        digest = hashlib.sha256(content).hexdigest()
+        stored = os.path.join(self.media_root, 'announcements', digest[:2], f'{digest}.png')
+        os.makedirs(os.path.dirname(stored))
+        with open(stored, 'wb') as file:
+            file.write(content)
+        data = self.valid_data.copy()
+        data['slides'] = [
+            SimpleUploadedFile('stored.png', content, content_type='image/png'),
+            SimpleUploadedFile('new.png', make_slide(640, 360, 'png'), content_type='image/png'),
+        ]
+
+        with mock.patch('submission.views.queue_notification', side_effect=RuntimeError('database went away')):
+            with self.assertRaises(RuntimeError):
+                self.client.post(reverse('submit_announcement'), data)
+
+        self.assertEqual(self._stored_files(), [f'{digest}.png'])
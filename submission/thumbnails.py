@@ -0,0 +1,77 @@
+"""
+File: thumbnails.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Small preview thumbnails for slides, generated on first request and cached in media storage alongside the originals.
+"""
+
+import hashlib
+import io
+import logging
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, features
+
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_DIR = 'thumbnails'
+
+
+def _thumbnail_format():
+    """Return the configured thumbnail format, falling back to JPEG if Pillow lacks WebP support."""
+    image_format = settings.SLIDE_THUMBNAIL_FORMAT.upper()
+    if image_format == 'WEBP' and not features.check('webp'):
+        return 'JPEG'
+    return image_format
+
+
+def thumbnail_name(image_name):
+    """
+    Return the storage name of the thumbnail for a stored image.
+    Names are derived from the image name, so a replaced image never reuses a stale thumbnail.
+    """
+    width, height = settings.SLIDE_THUMBNAIL_SIZE
+    image_format = _thumbnail_format()
+    digest = hashlib.sha1(image_name.encode()).hexdigest()
+    extension = 'jpg' if image_format == 'JPEG' else image_format.lower()
+    return f"{THUMBNAIL_DIR}/{digest[:2]}/{digest}_{width}x{height}.{extension}"
+
+
+def generate_thumbnail(image_field, name):
+    """Render and store the thumbnail for image_field under name."""
+    image_format = _thumbnail_format()
+    with image_field.open('rb') as image_file, Image.open(image_file) as img:
+        # Let the JPEG decoder downscale while decoding instead of after
+        img.draft('RGB', settings.SLIDE_THUMBNAIL_SIZE)
+        img.thumbnail(settings.SLIDE_THUMBNAIL_SIZE)
+        output = io.BytesIO()
+        img.convert('RGB').save(output, format=image_format, quality=80)
+
+    saved_name = default_storage.save(name, ContentFile(output.getvalue()))
+    if saved_name != name:
+        # Another request generated the same thumbnail first
+        default_storage.delete(saved_name)
+
+
+def thumbnail_url(image_field):
+    """
+    Return the URL of the thumbnail for image_field, generating it on first use.
+    Falls back to the full-size image URL if the thumbnail cannot be generated.
+    """
+    name = thumbnail_name(image_field.name)
+    if not default_storage.exists(name):
+        try:
+            generate_thumbnail(image_field, name)
+        except Exception:
+            logger.warning("Could not generate thumbnail for %s", image_field.name, exc_info=True)
+            return image_field.url
+    return default_storage.url(name)
+
+
+def delete_thumbnail(image_name):
+    """Remove the cached thumbnail for a stored image, if any."""
+    if image_name:
+        default_storage.delete(thumbnail_name(image_name))
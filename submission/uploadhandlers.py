@@ -0,0 +1,50 @@
+"""
+File: uploadhandlers.py
+Author: Reagan Zierke
+Date: 2026-10-17
+Description: Upload handlers that compute each uploaded file's SHA-256 digest as its chunks stream in, so content-addressed storage never rereads the file.
+"""
+
+import hashlib
+
+from django.core.files.uploadhandler import MemoryFileUploadHandler, TemporaryFileUploadHandler
+
+
+class HashingUploadMixin:
+    '''
+    Mixin for Django upload handlers that hashes file data as it is received
+    and sets the hex digest on the finished file as ``sha256``.
+    '''
+
+    def new_file(self, *args, **kwargs):
+        # Set up the hash first: the memory handler raises StopFutureHandlers from new_file
+        self.sha256 = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        self.sha256.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        if file is not None:
+            file.sha256 = self.sha256.hexdigest()
+        return file
+
+
+class HashingMemoryFileUploadHandler(HashingUploadMixin, MemoryFileUploadHandler):
+    '''
+    In-memory upload handler for small files that also records the SHA-256 digest.
+    '''
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.activated:
+            # Too large to keep in memory: the data goes on to the temporary-file handler, which hashes it
+            return raw_data
+        return super().receive_data_chunk(raw_data, start)
+
+
+class HashingTemporaryFileUploadHandler(HashingUploadMixin, TemporaryFileUploadHandler):
+    '''
+    Temporary-file upload handler for large files that also records the SHA-256 digest.
+    '''
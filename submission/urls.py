@@ -5,10 +5,20 @@ Date: 2025-07-16
 Description: Django URL configuration for the submission app, including the path for submitting announcements.
 """
 
+from django.conf import settings
 from django.urls import path
 from . import views
 
 urlpatterns = [
-    path('', views.submit_announcement, name='submit_announcement'),
+    path(
+        '',
+        views.submit_announcement_async if settings.ASYNC_SUBMISSIONS else views.submit_announcement,
+        name='submit_announcement',
+    ),
     path('faq/', views.faq, name='faq'),
+    path('slides/<str:token>/', views.download_slide, name='download_slide'),
+    path('feed/<str:service>.<str:fmt>', views.announcement_feed, name='announcement_feed'),
+    path('uploads/', views.create_upload, name='create_upload'),
+    path('uploads/<uuid:token>/', views.upload_status, name='upload_status'),
+    path('uploads/<uuid:token>/chunks/<int:index>/', views.upload_chunk, name='upload_chunk'),
 ]
\ No newline at end of file
@@ -2,14 +2,38 @@
 File: views.py
 Author: Reagan Zierke
 Date: 2025-07-16
-Description: Django views for handling submission of announcements, including form validation, image processing, and email notifications.
+Description: Django views for handling submission of announcements, including form validation, image processing, and queueing email notifications.
 """
 
-from django.shortcuts import render, redirect
-from django.core.mail import EmailMessage
-from PIL import Image
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.shortcuts import render, redirect, get_object_or_404
+from django.http import Http404, HttpResponse, JsonResponse
+from django.views.decorators.http import require_GET, require_http_methods, require_POST, require_safe
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core import signing
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
 from .forms import SubmissionForm
-from .models import SubmissionSlide, Contact
+from .blobs import blob_name, blob_write_lock, file_digest, release_blob
+from .models import ChunkedUpload, SubmissionSlide, SERVICES
+from .chunked_uploads import (
+    ChunkedUploadError, discard_uploads, open_completed_uploads, start_upload, upload_state, write_chunk,
+)
+from .downloads import slide_id_from_token, slide_filename
+from .feeds import FEED_FORMATS, feed_etag, feed_version, get_feed
+from .media import serve_stored_file
+from .normalization import normalize_slides
+from .notifications import queue_notification
+from .page_cache import cached_page
+from .slide_probe import probe_slide, SlideProbeError
+from .stage_timing import stage
 
 
 def _validate_slide_extension(slide_name):
@@ -18,121 +42,380 @@ def _validate_slide_extension(slide_name):
     return any(str(slide_name).lower().endswith(ext) for ext in valid_extensions)
 
 
-def _validate_slide_aspect_ratio(image):
+def _validate_slide_aspect_ratio(width, height):
     """Validate that the slide has a 16:9 aspect ratio."""
-    width, height = image.size
     aspect_ratio = width / height
     expected_ratio = 16 / 9
     return abs(aspect_ratio - expected_ratio) < 0.05
 
 
-def _process_slides(request, form, submission):
-    """Process uploaded slides with validation and save them."""
-    error_found = False
-    
-    for slide in request.FILES.getlist('slides'):
-        if not _validate_slide_extension(slide.name):
-            form.add_error(None, f"{slide.name}: Slide must be a PNG or JPG image.")
-            error_found = True
-            continue
-            
-        try:
-            img = Image.open(slide)
-        except Exception:
-            form.add_error(None, f"{slide.name}: Uploaded file is not a valid image.")
-            error_found = True
-            continue
-            
-        if not _validate_slide_aspect_ratio(img):
-            form.add_error(None, f"{slide.name}: Slide must have a 16:9 aspect ratio.")
-            error_found = True
-            continue
-            
-        SubmissionSlide.objects.create(submission=submission, image=slide)
-    
-    return error_found
+def _check_slide(slide, already_stored=False):
+    """
+    Validate a single uploaded slide, returning an error message or None if it is valid.
+    Slides whose contents are already stored were validated when first uploaded and skip the probe.
+    """
+    if not _validate_slide_extension(slide.name):
+        return f"{slide.name}: Slide must be a PNG or JPG image."
 
+    if already_stored:
+        return None
 
-def _format_email_body(cleaned_data):
-    """Format the email body with submission details."""
-    start_date = cleaned_data.get("start_date")
-    end_date = cleaned_data.get("end_date")
-    formatted_start = start_date.strftime("%B %d, %Y") if start_date else "N/A"
-    formatted_end = end_date.strftime("%B %d, %Y") if end_date else "N/A"
-    
-    return (
-        f"Title: {cleaned_data.get('title', '')}\n"
-        f"Contact Email: {cleaned_data.get('email', '')}\n"
-        f"Description: {cleaned_data.get('description', '')}\n"
-        f"Start Date: {formatted_start}\n"
-        f"End Date: {formatted_end}\n"
+    try:
+        info = probe_slide(slide)
+    except SlideProbeError:
+        return f"{slide.name}: Uploaded file is not a valid image."
+
+    if not _validate_slide_aspect_ratio(info.width, info.height):
+        return f"{slide.name}: Slide must have a 16:9 aspect ratio."
+
+    return None
+
+
+_slide_executor = None
+_slide_executor_lock = threading.Lock()
+
+
+def _get_slide_executor():
+    """Return the process-wide thread pool used to validate slides, creating it on first use."""
+    global _slide_executor
+    with _slide_executor_lock:
+        if _slide_executor is None:
+            _slide_executor = ThreadPoolExecutor(
+                max_workers=settings.SLIDE_VALIDATION_WORKERS,
+                thread_name_prefix='slide-validation',
+            )
+    return _slide_executor
+
+
+def _check_slides(slides, stored_flags):
+    """Validate slides concurrently, returning one error message or None per slide in upload order."""
+    if len(slides) <= 1:
+        return [_check_slide(slide, stored) for slide, stored in zip(slides, stored_flags)]
+    return list(_get_slide_executor().map(_check_slide, slides, stored_flags))
+
+
+async def _check_slides_async(slides, stored_flags):
+    """Validate slides on the slide validation pool without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    executor = _get_slide_executor()
+    return await asyncio.gather(*(
+        loop.run_in_executor(executor, _check_slide, slide, stored)
+        for slide, stored in zip(slides, stored_flags)
+    ))
+
+
+def _process_slides(request, form):
+    """
+    Validate the uploaded slides, including completed chunked uploads, then save the submission with them.
+    Nothing is written unless every slide is valid. Returns True if any errors were added to the form.
+    """
+    tokens = request.POST.getlist('upload_tokens')
+    staged_files, missing_tokens = open_completed_uploads(tokens)
+    try:
+        return _save_slides(request.FILES.getlist('slides') + staged_files, missing_tokens, form, tokens)
+    finally:
+        for staged_file in staged_files:
+            staged_file.close()
+
+
+def _slide_names(slides):
+    """Return the content-addressed blob name of each slide."""
+    return [blob_name(file_digest(slide), slide.name) for slide in slides]
+
+
+def _prepare_slides(slides):
+    """
+    Return the blob name of each slide and the set of those names that existing slides use.
+    Only used to skip checking slides already on file; _build_slides decides again before writing.
+    """
+    names = _slide_names(slides)
+    stored_names = set(SubmissionSlide.objects.filter(image__in=names).values_list('image', flat=True))
+    return names, stored_names
+
+
+def _slide_errors(check_results, missing_tokens):
+    """Return the slide validation errors, followed by one error per chunked upload that was not found."""
+    errors = [error for error in check_results if error]
+    errors.extend(
+        "An uploaded slide could not be found or did not finish uploading. Please upload it again."
+        for _ in missing_tokens
     )
+    return errors
 
 
-def _get_email_recipients(cleaned_data):
-    """Get email recipients based on chapel and praise selections."""
-    recipients = []
-    # if cleaned_data.get("is_chapel"):
-    #     chapel_people = Contact.objects.filter(is_chapel=True)
-    #     recipients.extend([person.email for person in chapel_people])
-    # if cleaned_data.get("is_praise"):
-    #     praise_people = Contact.objects.filter(is_praise=True)
-    #     recipients.extend([person.email for person in praise_people])
-    praise_people = Contact.objects.filter(is_praise=True)
-    recipients.extend([person.email for person in praise_people])
-    return recipients
-
-
-def _send_notification_email(cleaned_data, request):
-    """Send email notification with submission details and attachments."""
-    form_data = _format_email_body(cleaned_data)
-    recipients = _get_email_recipients(cleaned_data)
+def _save_slides(slides, missing_tokens, form, tokens):
+    """
+    Validate slides, then save the submission with them in one transaction.
+    Returns True, having written nothing, if any errors were added to the form.
+    """
+    with stage('slides'):
+        names, stored_names = _prepare_slides(slides)
+        stored_flags = [name in stored_names for name in names]
+        errors = _slide_errors(_check_slides(slides, stored_flags), missing_tokens)
     
-    email = EmailMessage(
-        subject="New Announcement",
-        body=f"A new announcement has been submitted:\n\n{form_data}",
-        from_email="reaganzierke@gmail.com",
-        to=recipients,
-    )
+    for error in errors:
+        form.add_error(None, error)
+    
+    if errors:
+        return True
     
-    for slide in request.FILES.getlist('slides'):
-        slide.open()
-        email.attach(slide.name, slide.read(), slide.content_type)
+    originals = None
+    if settings.SLIDE_NORMALIZATION:
+        with stage('normalize'):
+            slides, originals, errors = normalize_slides(slides, stored_flags)
+            errors = [error for error in errors if error]
+            for error in errors:
+                form.add_error(None, error)
+            if errors:
+                return True
+            names = _slide_names(slides)
     
-    email.send()
+    _save_submission(form, slides, names, tokens, originals)
+    return False
+
+
+def _is_stored(name, file, referenced, written):
+    """
+    Return True if the contents stored under name can be shared, otherwise record name as one to write.
+    A file no slide references yet is shared too when its size matches, so writing again does not
+    leave storage to pick an alternative name; one of another size is a partial write and is replaced.
+    """
+    if name in referenced or name in written:
+        return True
+    if default_storage.exists(name):
+        if default_storage.size(name) == file.size:
+            return True
+        default_storage.delete(name)
+    written.append(name)
+    return False
+
+
+def _build_slides(slides, names, originals=None):
+    """
+    Return unsaved SubmissionSlides for validated slides and the storage names saving them will write.
+    originals holds, per slide, the upload to keep alongside a normalized slide, or None.
+    Call it holding blob_write_lock, inside the save's transaction, so no file it shares is released meanwhile.
+    """
+    originals = originals or [None] * len(slides)
+    kept_names = [blob_name(file_digest(original), original.name) if original is not None else None for original in originals]
+    candidates = names + [name for name in kept_names if name]
+    referenced = set()
+    for image, original in SubmissionSlide.objects.filter(Q(image__in=candidates) | Q(original__in=candidates)).values_list('image', 'original'):
+        referenced.update((image, original))
+
+    new_slides = []
+    written = []
+    for slide, name, original, kept_name in zip(slides, names, originals, kept_names):
+        # Identical contents already stored are shared rather than written again
+        image = name if _is_stored(name, slide, referenced, written) else slide
+        if original is not None and _is_stored(kept_name, original, referenced, written):
+            original = kept_name
+        new_slides.append(SubmissionSlide(image=image, original=original, original_name=slide.name))
+    return new_slides, written
 
 
 def submit_announcement(request):
     """
     Handle announcement submission with form validation, image processing, and email notifications.
+    Every slide is validated before anything is written, so a rejected submission costs no database writes.
     """
     template_name = 'submission/submission.html'
     
     if request.method == 'POST':
-        form = SubmissionForm(request.POST, request.FILES)
+        with stage('parse'):
+            form = SubmissionForm(request.POST, request.FILES)
+            is_valid = form.is_valid()
         
-        if form.is_valid():
-            submission = form.save()
-            
-            # Process and validate slides
-            error_found = _process_slides(request, form, submission)
-            
-            if error_found:
-                submission.delete()
-                return render(request, template_name, {'form': form})
-            
-            # Send notification email
-            _send_notification_email(form.cleaned_data, request)
-            
+        if is_valid and not _process_slides(request, form):
             return redirect('/')
     else:
-        form = SubmissionForm()
+        # The empty form is the same for everyone; serve it from the page cache
+        return cached_page(request, template_name, lambda: {'form': SubmissionForm()})
     
-    return render(request, template_name, {'form': form})
+    with stage('render'):
+        return render(request, template_name, {'form': form})
+
+
+def _bind_submission_form(request):
+    """Parse the request body and validate the submission form."""
+    form = SubmissionForm(request.POST, request.FILES)
+    form.is_valid()
+    return form
+
+
+def _save_submission(form, slides, names, tokens, originals=None):
+    """
+    Save a submission with its validated slides and queue its notification in one transaction.
+    Slide files are written as their rows are inserted and removed again if the transaction fails.
+    blob_write_lock also queues the async view's concurrent saves, which is much cheaper than
+    letting them retry in SQLite's busy handler.
+    """
+    written = []
+    with blob_write_lock:
+        try:
+            with transaction.atomic():
+                with stage('save'):
+                    new_slides, written = _build_slides(slides, names, originals)
+                    submission = form.save()
+                    for slide in new_slides:
+                        slide.submission = submission
+                    SubmissionSlide.objects.bulk_create(new_slides)
+                # The send_outbox worker delivers the email
+                with stage('queue'):
+                    queue_notification(submission, form.cleaned_data)
+                if tokens:
+                    # Staged files have been copied into storage; drop them once the slides are committed
+                    transaction.on_commit(lambda: discard_uploads(tokens))
+        except Exception:
+            # After the rollback nothing references the files this save wrote
+            for name in written:
+                release_blob(name)
+            raise
+
+
+async def submit_announcement_async(request):
+    """
+    Async version of submit_announcement, routed when the site is served over ASGI.
+    Body parsing, database work and storage writes run in worker threads and slide checks on the
+    slide validation pool, so the event loop keeps serving other uploads while they run.
+    Slides are validated before anything is written.
+    """
+    template_name = 'submission/submission.html'
+
+    if request.method != 'POST':
+        return await sync_to_async(cached_page)(request, template_name, lambda: {'form': SubmissionForm()})
+
+    with stage('parse'):
+        form = await sync_to_async(_bind_submission_form)(request)
+    if form.is_valid():
+        tokens = request.POST.getlist('upload_tokens')
+        staged_files, missing_tokens = await sync_to_async(open_completed_uploads)(tokens)
+        try:
+            slides = request.FILES.getlist('slides') + staged_files
+            with stage('slides'):
+                names, stored_names = await sync_to_async(_prepare_slides)(slides)
+                stored_flags = [name in stored_names for name in names]
+                check_results = await _check_slides_async(slides, stored_flags)
+                errors = _slide_errors(check_results, missing_tokens)
+            originals = None
+            if not errors and settings.SLIDE_NORMALIZATION:
+                with stage('normalize'):
+                    # Only waits on the process pool, so it needs no database thread
+                    slides, originals, errors = await sync_to_async(normalize_slides, thread_sensitive=False)(slides, stored_flags)
+                    errors = [error for error in errors if error]
+                    if not errors:
+                        names = await sync_to_async(_slide_names, thread_sensitive=False)(slides)
+            if not errors:
+                await sync_to_async(_save_submission)(form, slides, names, tokens, originals)
+        finally:
+            for staged_file in staged_files:
+                staged_file.close()
+
+        if not errors:
+            return redirect('/')
+        for error in errors:
+            form.add_error(None, error)
+
+    with stage('render'):
+        return await sync_to_async(render)(request, template_name, {'form': form})
 
 
 def faq(request):
     """
     Render the FAQ page.
     """
-    return render(request, 'submission/faq.html')
\ No newline at end of file
+    return cached_page(request, 'submission/faq.html')
+
+
+def download_slide(request, token):
+    """
+    Serve a stored slide from a signed, expiring link sent in a notification email.
+    """
+    try:
+        slide_id = slide_id_from_token(token)
+    except signing.BadSignature:
+        raise Http404("Download link is invalid or has expired.")
+
+    slide = get_object_or_404(SubmissionSlide, pk=slide_id)
+    response = serve_stored_file(request, slide.image.name, as_attachment=True, filename=slide_filename(slide))
+    if response is None:
+        raise Http404("Slide file is missing.")
+    return response
+
+
+@require_safe
+@staff_member_required
+def serve_media(request, path):
+    """
+    Serve uploaded media (slides and thumbnails) to admin staff, with Range and conditional GET support.
+    Behind a front proxy configured with MEDIA_X_ACCEL_PREFIX or MEDIA_X_SENDFILE, the proxy sends the file;
+    without one, ASGI deployments stream it from a worker thread rather than with sendfile.
+    """
+    response = serve_stored_file(request, path)
+    if response is None:
+        raise Http404("Media file not found.")
+    return response
+
+
+@require_GET
+def announcement_feed(request, service, fmt):
+    """
+    Serve the announcements active today for chapel or praise as JSON or RSS, with slide URLs.
+    Clients that send back the ETag get a 304 until announcements change or the day ends.
+    """
+    if service not in SERVICES or fmt not in FEED_FORMATS:
+        raise Http404("Unknown feed.")
+
+    day = timezone.localdate()
+    version = feed_version(service, day)
+    etag = feed_etag(service, fmt, day, version)
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(get_feed(service, fmt, day, version), content_type=FEED_FORMATS[fmt])
+    response['ETag'] = etag
+    # Clients revalidate on every poll, which costs one aggregate query when nothing changed
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+@require_POST
+def create_upload(request):
+    """
+    Start a chunked slide upload from its file name, total size in bytes and optional SHA-256.
+    Returns the upload token and the chunk size to use.
+    """
+    filename = request.POST.get('filename', '')
+    if not _validate_slide_extension(filename):
+        return JsonResponse({'error': "Slide must be a PNG or JPG image."}, status=400)
+    try:
+        size = int(request.POST.get('size', ''))
+        upload = start_upload(filename, size, request.POST.get('sha256', ''))
+    except ValueError:
+        return JsonResponse({'error': "Size must be a whole number of bytes."}, status=400)
+    except ChunkedUploadError as exc:
+        return JsonResponse({'error': str(exc)}, status=exc.status)
+    return JsonResponse(upload_state(upload), status=201)
+
+
+@require_GET
+def upload_status(request, token):
+    """
+    Report how much of a chunked upload has been received, so the client can resume it.
+    """
+    upload = get_object_or_404(ChunkedUpload, token=token)
+    return JsonResponse(upload_state(upload))
+
+
+@require_http_methods(['PUT'])
+def upload_chunk(request, token, index):
+    """
+    Receive one chunk of a chunked upload. The X-Chunk-SHA256 header must hold the chunk's SHA-256.
+    """
+    upload = get_object_or_404(ChunkedUpload, token=token)
+    try:
+        write_chunk(upload, index, request.body, request.headers.get('X-Chunk-SHA256', ''))
+    except ChunkedUploadError as exc:
+        upload.refresh_from_db()
+        return JsonResponse({'error': str(exc), **upload_state(upload)}, status=exc.status)
+    return JsonResponse(upload_state(upload))